@@ -4,6 +4,7 @@ import argparse
 from typing import List, Dict
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
+from utils.graphml_files import select_graphml_files, strip_graphml_suffix
 
 try:
     from PIL import Image
@@ -149,7 +150,7 @@ def iter_site_dirs(base_path: str) -> List[str]:
 def find_valid_triplets(site_dir: str) -> List[Dict[str, str]]:
     """
     For each site dir, find:
-      <basename>.graphml
+      <basename>.graphml (or .graphml.gz)
       <basename>.png
       <basename>.cookies.json
     Returns list of dicts: {graphml, png, cookies}
@@ -163,10 +164,10 @@ def find_valid_triplets(site_dir: str) -> List[Dict[str, str]]:
         return valid
 
     files = [f for f in items if os.path.isfile(os.path.join(site_dir, f))]
-    graphml_files = [f for f in files if f.endswith(".graphml")]
+    graphml_files = select_graphml_files(files)
 
     for g in graphml_files:
-        base = g[:-8]  # remove .graphml
+        base = strip_graphml_suffix(g)
         png = base + ".png"
         cookies = base + ".cookies.json"
 
@@ -5,6 +5,8 @@ import random
 import subprocess
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
+from utils.graphml_files import list_graphml_in_dir
+from utils.pg_query_client import daemon_enabled, query_daemon
 
 load_dotenv()
 
@@ -32,19 +34,11 @@ def list_immediate_subdirs(path: str):
     return out
 
 
-def list_graphml_in_dir(path: str):
-    if not os.path.isdir(path):
-        return []
-    files = []
-    for name in os.listdir(path):
-        if name.endswith(".graphml"):
-            files.append(os.path.join(path, name))
-    return sorted(files)
-
-
 def run_pg(command, graphml_path, extra_args=None):
     if extra_args is None:
         extra_args = []
+    if daemon_enabled():
+        return query_daemon(command, graphml_path, extra_args)
 
     cmd = ["python3", PG_QUERY_RUN_PATH, command, graphml_path] + extra_args
 
@@ -101,29 +95,13 @@ def extract_elements_from_html(html_obj: dict):
     return kept
 
 
-def find_parent_from_elem(elem_obj: dict):
-
-    incoming_edges = elem_obj["report"]["incoming edges"]
-    if not isinstance(incoming_edges, list):
-        return (-1, -1)
-
-    for edge in incoming_edges:
-        if not isinstance(edge, dict):
-            continue
-        if edge["type"] == "create node":
-            incoming_node = edge["incoming node"]
-            parent_id = incoming_node["id"]
-            parent_type = incoming_node["type"]
-            return (parent_id if parent_id is not None else -1,
-                    parent_type if parent_type is not None else -1)
-
-    return (-1, -1)
-
-
 def process_graphml(site_name, graphml_path):
 
     rows = []
-    html_stdout = run_pg("html", graphml_path)
+    # --tags filters the elements in the query itself, and --creators adds
+    # each element's creator (the "create node" parent) and resolved URL.
+    html_stdout = run_pg("html", graphml_path,
+                         ["--tags", ",".join(sorted(KEEP_TAGS)), "--creators"])
     html_obj = safe_json_load(html_stdout)
 
 
@@ -135,27 +113,22 @@ def process_graphml(site_name, graphml_path):
         tag = el["tag"]
         attrs = el.get("attrs", {})
 
-        if tag == "SCRIPT":
-            src = attrs.get("src", '') 
-
-        elif tag == "LINK":
+        if tag == "LINK":
             src = attrs.get("href", '') 
-        
-
-        elem_stdout = run_pg("elm", graphml_path, [el_id])
-        elem_obj = safe_json_load(elem_stdout)
-        parent_id, parent_type = find_parent_from_elem(elem_obj)
+        else:
+            src = attrs.get("src", '') 
 
         rows.append(
             {
                 "site": site_name,
                 "url": url,
                 "src": src,
+                "resolved_src": el.get("url", ''),
                 "attrs": attrs,
                 "tag": tag,
                 "id": el_id,
-                "parent_id": parent_id,
-                "parent_type": parent_type,
+                "parent_id": el.get("creator id", -1),
+                "parent_type": el.get("creator type", -1),
             }
         )
 
@@ -173,7 +146,7 @@ def process_one_site(site_dir: str):
     graphml_files = list_graphml_in_dir(site_dir)
     all_rows = []
     for g in graphml_files:
-        print(f"[{site_name}] html+elm: {os.path.basename(g)}")
+        print(f"[{site_name}] html: {os.path.basename(g)}")
         rows = process_graphml(site_name, g)
         all_rows.extend(rows)
 
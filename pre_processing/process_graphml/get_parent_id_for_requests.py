@@ -5,6 +5,8 @@ import hashlib
 import random
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
+from utils.graphml_files import list_graphml_in_dir
+from utils.pg_query_client import daemon_enabled, query_daemon
 
 load_dotenv()
  
@@ -34,20 +36,11 @@ def list_immediate_subdirs(path):
 #    return sorted(out, reverse = True)
 
 
-def list_graphml_in_dir(path: str):
-    """Only *.graphml directly inside `path` (non-recursive)."""
-    if not os.path.isdir(path):
-        return []
-    files = []
-    for name in os.listdir(path):
-        if name.endswith(".graphml"):
-            files.append(os.path.join(path, name))
-    return sorted(files)
-
-
 def run_pg(command: str, graphml_path: str, extra_args=None):
     if extra_args is None:
         extra_args = []
+    if daemon_enabled():
+        return query_daemon(command, graphml_path, extra_args)
     cmd = ["python3", PG_QUERY_RUN_PATH, command, graphml_path] + extra_args
     res = subprocess.run(
         cmd,
@@ -70,21 +63,6 @@ def safe_json_load(s: str):
         raise
 
 
-def extract_script_id_from_elm(elm_obj: dict):
-    """
-    Extract script node id from elm output.
-    Assumes this format:
-      elm_obj["report"]["incoming node"]["id"]
-    """
-    try:
-        return elm_obj["report"]["incoming node"]["id"]
-    except KeyError as e:
-        raise KeyError(
-            f"Missing report→incoming node→id in elm output.\n"
-            f"Top-level keys: {list(elm_obj.keys())}"
-        )
-
-
 def get_request_data(graph_url, req_item):
 
 #    print('1')
@@ -137,13 +115,13 @@ def get_request_data(graph_url, req_item):
 def process_graphml(graphml_path: str):
     """
     Sequential per-graphml:
-      - run requests
-      - for each request: run elm
+      - run requests-with-initiator, which reports each request along with
+        the node (script, HTML element, parser, ...) that started it
     Returns: (graph_url, [entries...])
     """
 
         
-    requests_stdout = run_pg("requests", graphml_path)
+    requests_stdout = run_pg("requests-with-initiator", graphml_path)
     requests_obj = json.loads(requests_stdout)
     graph_url = requests_obj["meta"]["url"]
     report = requests_obj["report"]
@@ -155,37 +133,13 @@ def process_graphml(graphml_path: str):
 
     print('number of requests:', len(report))
 
-#    if len(report) >100:
-#        raise RuntimeError(
-#            f"Too long"
-#           ) 
-
-    cpt = 0
     for req_item in report:
-        #print(cpt)
-        cpt+=1
-
-#            if cpt <= 220: 
-#                continue 
-
-#            print('build entry')
         entry = get_request_data(graph_url, req_item)
-#            print('entry done')
-        request_edge_id = entry["request_edge_id"]
-#            print('request_edge_id done')
-        
-        elm_stdout = run_pg("elm", graphml_path, [request_edge_id])
-#            print('elm_stdout done')
-
-        elm_obj = safe_json_load(elm_stdout)
-#            print('elm_obj done')
-
-        entry["script_id"] = extract_script_id_from_elm(elm_obj)
-#            print('script_id done')
-
-        entry["elm_raw"] = elm_obj            
+        initiator = req_item["initiator"]
+        entry["script_id"] = initiator["id"]
+        entry["initiator_type"] = initiator["type"]
+        entry["initiator_hash"] = initiator.get("hash", "")
         entries.append(entry)
-#            print('entries appended')
 
     return (graph_url, entries)
 
@@ -4,6 +4,8 @@ import subprocess
 import hashlib
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
+from utils.graphml_files import list_graphml_in_dir
+from utils.pg_query_client import daemon_enabled, query_daemon
 from typing import Optional, Any, Dict, List, Tuple
 
 load_dotenv()
@@ -32,20 +34,11 @@ def list_immediate_subdirs(path: str) -> List[str]:
     return sorted(out, reverse=True)
 
 
-def list_graphml_in_dir(path: str) -> List[str]:
-    """Only *.graphml directly inside `path` (non-recursive)."""
-    if not os.path.isdir(path):
-        return []
-    files = []
-    for name in os.listdir(path):
-        if name.endswith(".graphml"):
-            files.append(os.path.join(path, name))
-    return sorted(files)
-
-
 def run_pg(command: str, graphml_path: str, extra_args: Optional[List[str]] = None) -> str:
     if extra_args is None:
         extra_args = []
+    if daemon_enabled():
+        return query_daemon(command, graphml_path, extra_args)
     cmd = ["python3", PG_QUERY_RUN_PATH, command, graphml_path] + extra_args
     res = subprocess.run(
         cmd,
@@ -85,59 +78,46 @@ def write_json(path: str, data: Any) -> None:
 
 def get_script_data(graph_url: str, script_item: Dict[str, Any]) -> Dict[str, Any]:
     """
-    script_item is one element from `scripts` report:
-      { "script": {...}, "frame": {...} }
+    script_item is one element from `script-tree` report:
+      { "script": {...}, "loaders": [{...}, ...] }
+    where "loaders" starts with the script's direct loader (the element or
+    script that executed it) and ends at the parser.
+
+    parent_script_id keeps its original rule: the node that ran the script
+    through an "execute" edge, else -1. Scripts run from an event handler
+    attribute ("execute from attribute") get -1, though their executing
+    element is still the first entry of loader_chain.
     """
     s = script_item["script"]
+    loaders = script_item["loaders"]
+
+    if loaders and script_item.get("execute edge type") == "execute":
+        parent_script_id = loaders[0]['id']
+    else:
+        parent_script_id = -1
 
     return {
         "page_url": graph_url,
         "script_id": s['id'],
-        "script_type": s['type'],
+        "script_type": s['script type'],
         "script_hash": s['hash'],
+        "parent_script_id": parent_script_id,
+        "loader_chain": [loader['id'] for loader in loaders],
     }
 
 
-def extract_loader_script_id_from_script_elm(elm_obj: Dict[str, Any]) -> Any:
-    """
-    From script-elm output:
-      look in report -> incoming edges
-      if edge.type == "create node": return edge["incoming node"]["id"]
-      else -1
-    """
-    report = elm_obj["report"]
-    incoming_edges = report["incoming edges"]
-
-    for e in incoming_edges:
-        if e["type"] == "create node":
-            incoming_node = e["incoming node"]
-            loader_id = incoming_node["id"]
-            if loader_id:
-                return loader_id 
-
-    for e in incoming_edges:
-        if e["type"] == "execute":
-            incoming_node = e["incoming node"]
-            loader_id = incoming_node["id"]
-            if loader_id:
-                return loader_id
-
-    return -1
-
-
 def process_graphml_scripts(graphml_path: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
     """
     Sequential per-graphml:
-      - run scripts
-      - for each script: run elm(graphml, script_id)
-      - extract loader_script_id from incoming 'create node' edge, else -1
+      - run script-tree, which reports each script's loaders (the element
+        or script that executed it, what created that, ...) up to the parser
     Returns: (graph_url, [entries...])
     """
-    scripts_stdout = run_pg("scripts", graphml_path)
-    scripts_obj = safe_json_load(scripts_stdout)
+    tree_stdout = run_pg("script-tree", graphml_path)
+    tree_obj = safe_json_load(tree_stdout)
 
-    graph_url = scripts_obj["meta"]["url"]
-    report = scripts_obj["report"]
+    graph_url = tree_obj["meta"]["url"]
+    report = tree_obj["report"]
 
     entries = []
     if len(report) == 0:
@@ -148,6 +128,11 @@ def process_graphml_scripts(graphml_path: str) -> Tuple[Optional[str], List[Dict
     print("number of scripts:", len(report))
 
     for script_item in report:
+        # Scripts that were never executed have no loaders, and weren't
+        # included by the `scripts` command either.
+        if not script_item["loaders"]:
+            continue
+
         entry = get_script_data(graph_url, script_item)
         sid = entry["script_id"]
 
@@ -156,13 +141,6 @@ def process_graphml_scripts(graphml_path: str) -> Tuple[Optional[str], List[Dict
                 f"Script ID not found"
             ) 
 
-        elm_stdout = run_pg("elm", graphml_path, [sid])
-        elm_obj = safe_json_load(elm_stdout)
-
-  
-        entry["parent_script_id"] = extract_loader_script_id_from_script_elm(elm_obj)
-       # entry["elm_raw"] = elm_obj 
-
         entries.append(entry)
 
     return (graph_url, entries)
@@ -1,6 +1,8 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed, ProcessPoolExecutor
 from utils.extract_gz_files import extract_gz_files_parallel
 from utils.build_results_json_file import build_results_json_for_each_etld_parallel, combine_all_etld_jsons
+from utils.graphml_files import select_graphml_files, strip_graphml_suffix
+from utils.pg_query_client import daemon_enabled, query_daemon
 from dotenv import load_dotenv
 import subprocess, json, os, hashlib
 import glob
@@ -8,6 +10,9 @@ import glob
 load_dotenv()
 
 NUM_THREADS = int(os.getenv("NUM_THREADS_PREPROCESSING", 1))  
+# pagegraph_query reads .graphml.gz files directly, so extracting them to
+# disk first is optional.
+EXTRACT_GZ_FILES = os.getenv("EXTRACT_GZ_FILES", "true").lower() == "true"
 
 PG_QUERY_RUN_PATH = "pagegraph_query/run.py"
 
@@ -66,11 +71,10 @@ def get_all_graphml_files(base_path):
 
     for root, dirs, files in os.walk(base_path):
 
-        for file in files:
-            if file.endswith('.graphml'):
-                full_path = os.path.join(root, file)
-                size = os.path.getsize(full_path)
-                result.append((full_path, size))
+        for file in select_graphml_files(files):
+            full_path = os.path.join(root, file)
+            size = os.path.getsize(full_path)
+            result.append((full_path, size))
 
         dir_count += 1
 
@@ -89,6 +93,9 @@ def run_pagegraph_cli(command, input_path):
     if command == "html":
         cmd += ["--at-serialization", "--body-content"]
 
+    if daemon_enabled():
+        return query_daemon(command, input_path, cmd[4:])
+
     try:
         result = subprocess.run(
             cmd,
@@ -108,11 +115,31 @@ def run_pagegraph_cli(command, input_path):
 
 
 
+def run_pagegraph_cli_multi(commands, input_path):
+
+    if daemon_enabled():
+        return query_daemon("multi", input_path, ["--commands", ",".join(commands)])
+
+    cmd = ["python3", PG_QUERY_RUN_PATH, "multi", input_path,
+           "--commands", ",".join(commands)]
+
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=1800  # max 30 minutes
+    )
+    return result.stdout
+
+
+
 def process_file(file, cmds):
 
     
-    output_file_path = file[:-8]  # remove .pagegraph or similar
+    output_file_path = strip_graphml_suffix(file)
 
+    pending_cmds = []
     for cmd in cmds:
 
         output_file_path_for_cmd = f"{output_file_path}.{cmd}.json"
@@ -120,11 +147,33 @@ def process_file(file, cmds):
         if os.path.exists(output_file_path_for_cmd) or os.path.exists(get_hashed_file_path(output_file_path_for_cmd, cmd)):
             continue
 
-        print("Processing:", file, cmd)
+        pending_cmds.append(cmd)
+
+    if not pending_cmds:
+        return
+
+    print("Processing:", file, pending_cmds)
+
+    # html needs non-default options, so it can't share the parsed graph
+    results = {}
+    multi_cmds = [cmd for cmd in pending_cmds if cmd != "html"]
+    if multi_cmds:
+        try:
+            results = json.loads(run_pagegraph_cli_multi(multi_cmds, file))
+        except Exception as e:
+            print(f"[ERROR] {multi_cmds} failed for {file}: {e}")
+
+    for cmd in pending_cmds:
+
+        output_file_path_for_cmd = f"{output_file_path}.{cmd}.json"
 
         try:
-            res = run_pagegraph_cli(cmd, file)
-            res = json.loads(res)
+            if cmd == "html":
+                res = json.loads(run_pagegraph_cli(cmd, file))
+            elif cmd in results:
+                res = results[cmd]
+            else:
+                raise ValueError("no report produced")
 
             res["url"] = res["meta"]["url"]
             res["report"] = remove_duplicates_from_list(res["report"])
@@ -159,9 +208,10 @@ def extract_data_from_pagegraph(base_dir, data_types):
 if __name__ == "__main__":
     
 
-    print("Starting: Extracting .gz files...")
-    extract_gz_files_parallel(base_dir)
-    print("Finished: .gz files extracted.\n")
+    if EXTRACT_GZ_FILES:
+        print("Starting: Extracting .gz files...")
+        extract_gz_files_parallel(base_dir)
+        print("Finished: .gz files extracted.\n")
 
     print("Starting: Extracting data from pagegraph...")
     extract_data_from_pagegraph(base_dir, ['cookies', 'scripts', 'requests', 'js-calls'])
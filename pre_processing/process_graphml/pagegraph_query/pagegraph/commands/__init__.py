@@ -1,45 +1,101 @@
 from __future__ import annotations
 
 from abc import ABC
+import io
 import json
+import sys
 from typing import TYPE_CHECKING
 
-from pagegraph.serialize import ReportBase, to_jsonable
+import pagegraph.graph
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+from pagegraph.serialize import ReportBase, to_jsonable, write_json
+from pagegraph.serialize import orjson_dumps, use_orjson
+from pagegraph.types import ElementTypes
 
 if TYPE_CHECKING:
     from pathlib import Path
-    from typing import Union, Sequence, Optional
+    from typing import Union, Sequence, Optional, TextIO
 
     from pagegraph.graph import PageGraph
+    from pagegraph.serialize import JSONAble
     from pagegraph.types import Url, PageGraphId, PageGraphNodeId
 
 
+# Groups of edge types commands commonly need, for `Base.edge_types`.
+REQUEST_EDGE_TYPES = [
+    Edge.Types.REQUEST_START,
+    Edge.Types.REQUEST_REDIRECT,
+    Edge.Types.REQUEST_COMPLETE,
+    Edge.Types.REQUEST_ERROR,
+]
+STORAGE_EDGE_TYPES = [
+    Edge.Types.STORAGE_BUCKET,
+    Edge.Types.STORAGE_READ_CALL,
+    Edge.Types.STORAGE_READ_RESULT,
+    Edge.Types.STORAGE_CLEAR,
+    Edge.Types.STORAGE_SET,
+    Edge.Types.STORAGE_DELETE,
+]
+# Reporting on a script needs its execute edge, and the URL of an external
+# script is found through the requests made by the element that ran it.
+SCRIPT_REPORT_EDGE_TYPES = [
+    Edge.Types.EXECUTE,
+    Edge.Types.EXECUTE_FROM_ATTRIBUTE,
+] + REQUEST_EDGE_TYPES
+
+
 # pylint: disable=too-few-public-methods
 class Result:
     tool_version: str
     graph_version: str
     url: Optional[Url]
     report: Union[ReportBase, Sequence[ReportBase]]
+    meta: dict[str, JSONAble]
+    """Any additional, command specific, information to include in the
+    "meta" section of the output, next to the versions and URL. Values are
+    included as is, so must already be JSON-able."""
 
     def __init__(self, pg: PageGraph,
-                 report: Union[ReportBase, Sequence[ReportBase]]) -> None:
+                 report: Union[ReportBase, Sequence[ReportBase]],
+                 meta: Optional[dict[str, JSONAble]] = None) -> None:
         self.tool_version = str(pg.tool_version)
         self.graph_version = str(pg.graph_version)
         self.url = pg.url
         self.report = report
+        self.meta = meta or {}
 
-    def to_json(self) -> str:
-        data = {
-            "meta": {
-                "versions": {
-                    "tool": self.tool_version,
-                    "graph": self.graph_version
-                },
-                "url": self.url
+    def meta_data(self) -> dict[str, JSONAble]:
+        return {
+            "versions": {
+                "tool": self.tool_version,
+                "graph": self.graph_version
             },
-            "report": to_jsonable(self.report)
+            "url": self.url,
+            **self.meta
         }
-        return json.dumps(data)
+
+    def to_json(self) -> str:
+        buffer = io.StringIO()
+        self.write_json(buffer)
+        return buffer.getvalue()
+
+    def write_json(self, stream: TextIO) -> None:
+        """Writes the result as JSON to the stream, converting and writing
+        the report a piece at a time, instead of first building the
+        whole document as a string."""
+        if use_orjson():
+            data = {
+                "meta": self.meta_data(),
+                "report": to_jsonable(self.report)
+            }
+            stream.write(orjson_dumps(data))
+            return
+        stream.write('{"meta": ')
+        stream.write(json.dumps(self.meta_data()))
+        stream.write(', "report": ')
+        write_json(self.report, stream)
+        stream.write("}")
 
 
 def validate_node_id(node_id: PageGraphNodeId) -> bool:
@@ -58,10 +114,24 @@ def validate_pg_id(pg_id: PageGraphId) -> bool:
 class Base(ABC):
     input_path: Path
     debug: bool
-
-    def __init__(self, input_path: Path, debug: bool = False) -> None:
+    pg: Optional[PageGraph]
+    """An already loaded graph to run the command against. If not provided,
+    the graph is loaded from `input_path` when the command is executed."""
+
+    node_types: Optional[list[Node.Types]] = None
+    edge_types: Optional[list[Edge.Types]] = None
+    """Commands that only look at part of the graph can list the node and
+    edge types they need here, and the rest of the graph isn't loaded
+    (unless in debug mode, since validation checks the whole graph).
+    Nodes connected by an edge of a listed type are always loaded, so
+    `node_types` only needs to list types the command finds by type (e.g.,
+    with `PageGraph.nodes_of_type()`)."""
+
+    def __init__(self, input_path: Path, debug: bool = False,
+                 pg: Optional[PageGraph] = None) -> None:
         self.input_path = input_path
         self.debug = debug
+        self.pg = pg
 
     def validate(self) -> None:
         if not self.input_path.is_file():
@@ -69,8 +139,30 @@ class Base(ABC):
                 f"Unable to read from input file: {self.input_path.name}")
         
 
+    def element_types(self) -> Optional[ElementTypes]:
+        """Returns the parts of the graph this command needs, or None if
+        it needs the whole graph."""
+        if self.node_types is None or self.edge_types is None:
+            return None
+        return ElementTypes(
+            frozenset(node_type.value for node_type in self.node_types),
+            frozenset(edge_type.value for edge_type in self.edge_types))
+
+    def load_graph(self) -> PageGraph:
+        """Returns the graph this command should query, only parsing the
+        file at `input_path` if no graph was provided to the command."""
+        if self.pg is None:
+            element_types = None if self.debug else self.element_types()
+            self.pg = pagegraph.graph.from_path(
+                self.input_path, self.debug, element_types=element_types)
+        return self.pg
+
     def execute(self) -> Result:
         raise NotImplementedError()
 
     def format(self, result: Result) -> Optional[str]:
-        return result.to_json()
+        # Write the result out as it's serialized, so that large results
+        # don't need to be held in memory as a single string.
+        result.write_json(sys.stdout)
+        sys.stdout.write("\n")
+        return None
@@ -7,6 +7,7 @@ import json
 
 import pagegraph.commands
 import pagegraph.graph
+from pagegraph.graph.node import Node
 from pagegraph.serialize import ReportBase
 
 if TYPE_CHECKING:
@@ -29,6 +30,10 @@ class Command(pagegraph.commands.Base):
     include_source: bool
     depth: int
 
+    node_types = [Node.Types.COOKIE_JAR]
+    edge_types = (pagegraph.commands.STORAGE_EDGE_TYPES +
+                  pagegraph.commands.SCRIPT_REPORT_EDGE_TYPES)
+
 
 
 
@@ -63,7 +68,7 @@ class Command(pagegraph.commands.Base):
     def execute(self) -> pagegraph.commands.Result:
 
         reports: list[Result] = []
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
 
 
         cookie_jar = pg.cookie_nodes()
@@ -73,7 +78,7 @@ class Command(pagegraph.commands.Base):
             return
 
         if len(cookie_jar) == 0:
-            return {}
+            return pagegraph.commands.Result(pg, [])
 
         cookie_jar = cookie_jar[0]
         outgoing_edges = cookie_jar.outgoing_edges()
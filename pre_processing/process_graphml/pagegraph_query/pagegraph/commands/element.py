@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import json
+import sys
 from typing import TYPE_CHECKING
 
 import networkx
@@ -11,12 +13,13 @@ from pagegraph.serialize import ReportBase
 
 if TYPE_CHECKING:
     from pathlib import Path
-    from typing import Optional, Union
+    from typing import Iterator, Optional, Union
 
 
 
 
 
+    from pagegraph.graph import PageGraph
     from pagegraph.serialize import ScriptReport, BasicReport, FrameReport
     from pagegraph.types import PageGraphId
 
@@ -26,27 +29,89 @@ class BytesWrittenResult(ReportBase):
     num_bytes: int
 
 
+def read_ids(ids_path: Path) -> list[PageGraphId]:
+    """Reads one PageGraph id per line from the given file, or from STDIN
+    if the path is '-'. Blank lines are ignored."""
+    if str(ids_path) == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = ids_path.read_text(encoding="utf8").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+class Results:
+    """The reports for a batch of element queries, which are generated
+    lazily (one at a time) as they're serialized."""
+
+    command: Command
+    pg: PageGraph
+
+    def __init__(self, command: Command, pg: PageGraph) -> None:
+        self.command = command
+        self.pg = pg
+
+    def to_json_lines(self) -> Iterator[str]:
+        for pg_id in self.command.pg_ids:
+            try:
+                result = self.command.result_for_id(self.pg, pg_id)
+            except (KeyError, ValueError) as exc:
+                error = {"id": pg_id, "error": f"{type(exc).__name__}: {exc}"}
+                yield json.dumps(error)
+                continue
+            yield result.to_json()
+
+    def to_json(self) -> str:
+        return "[" + ", ".join(self.to_json_lines()) + "]"
+
+
 class Command(pagegraph.commands.Base):
-    pg_id: PageGraphId
+    pg_ids: list[PageGraphId]
+    is_batch: bool
+    """Whether the command was given a list of ids (even a list of one), in
+    which case it always returns `Results`, with an error line for each
+    unknown id. Given a single id, it returns that id's `Result`, and
+    raises if the id is unknown."""
     depth: int
     output_path: Optional[Path]
 
-    def __init__(self, input_path: Path, pg_id: PageGraphId, depth: int,
+    def __init__(self, input_path: Path,
+                 pg_ids: Union[PageGraphId, list[PageGraphId]], depth: int,
                  output_path: Optional[Path], debug: bool) -> None:
-        self.pg_id = pg_id
+        self.is_batch = not isinstance(pg_ids, str)
+        self.pg_ids = [pg_ids] if isinstance(pg_ids, str) else pg_ids
         self.depth = depth
         self.output_path = output_path
         super().__init__(input_path, debug)
 
     def validate(self) -> None:
-        if self.pg_id:
-            pagegraph.commands.validate_pg_id(self.pg_id)
+        if len(self.pg_ids) == 0:
+            raise ValueError("At least one node or edge id must be provided")
+        for pg_id in self.pg_ids:
+            pagegraph.commands.validate_pg_id(pg_id)
+        if self.output_path and len(self.pg_ids) != 1:
+            raise ValueError("Can only write GraphML for a single element")
         return super().validate()
 
-    def execute(self) -> pagegraph.commands.Result:
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
-        if self.pg_id.startswith("n"):
-            target_node = pg.node(self.pg_id)
+    def execute(self) -> Union[pagegraph.commands.Result, Results]:  # type: ignore[override]
+        pg = self.load_graph()
+        if not self.is_batch:
+            return self.result_for_id(pg, self.pg_ids[0])
+        return Results(self, pg)
+
+    def format(self, result: Union[pagegraph.commands.Result, Results]) -> Optional[str]:  # type: ignore[override]
+        if not isinstance(result, Results):
+            return result.to_json()
+        # Write each report out as its generated, so that large batches
+        # don't need to hold every report in memory at once.
+        for line in result.to_json_lines():
+            sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+        return None
+
+    def result_for_id(self, pg: PageGraph,
+                      pg_id: PageGraphId) -> pagegraph.commands.Result:
+        if pg_id.startswith("n"):
+            target_node = pg.node(pg_id)
             if self.output_path:
                 subgraph = target_node.subgraph(self.depth)
                 text = "\n".join(list(networkx.generate_graphml(subgraph)))
@@ -57,7 +122,7 @@ class Command(pagegraph.commands.Base):
             node_report = target_node.to_node_report(self.depth)
             return pagegraph.commands.Result(pg, node_report)
 
-        target_edge = pg.edge(self.pg_id)
+        target_edge = pg.edge(pg_id)
         if self.output_path:
             subgraph = target_edge.subgraph(self.depth)
             text = "\n".join(list(networkx.generate_graphml(subgraph)))
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import pagegraph.commands
+import pagegraph.graph
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+from pagegraph.serialize import ReportBase
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+    from typing import Union
+
+    from pagegraph.graph.edge.js_call import JSCallEdge
+    from pagegraph.serialize import BasicReport, ScriptReport
+    from pagegraph.types import PageGraphNodeId
+
+
+CANVAS_IMAGE = "canvas image"
+CANVAS_FONT = "canvas font"
+WEBRTC = "webrtc"
+AUDIO = "audio"
+
+CANVAS_TEXT_METHODS = frozenset([
+    "CanvasRenderingContext2D.fillText",
+    "CanvasRenderingContext2D.strokeText",
+])
+CANVAS_STYLE_METHODS = frozenset([
+    "CanvasRenderingContext2D.fillStyle.set",
+    "CanvasRenderingContext2D.strokeStyle.set",
+])
+CANVAS_EXPORT_METHODS = frozenset([
+    "HTMLCanvasElement.toDataURL",
+])
+# Scripts that draw text for display tend to also use these, while
+# fingerprinting scripts draw, export, and move on.
+CANVAS_BENIGN_METHODS = frozenset([
+    "CanvasRenderingContext2D.save",
+    "CanvasRenderingContext2D.restore",
+    "HTMLCanvasElement.addEventListener",
+])
+
+CANVAS_FONT_SET_METHOD = "CanvasRenderingContext2D.font.set"
+CANVAS_MEASURE_METHOD = "CanvasRenderingContext2D.measureText"
+# A script must set more than this many distinct fonts, and measure text
+# more than this many times, to be flagged for font fingerprinting.
+CANVAS_FONT_THRESHOLD = 20
+
+WEBRTC_CHANNEL_METHODS = frozenset([
+    "RTCPeerConnection.createDataChannel",
+    "RTCPeerConnection.createOffer",
+])
+WEBRTC_CANDIDATE_METHODS = frozenset([
+    "RTCPeerConnection.localDescription.get",
+    "RTCPeerConnection.onicecandidate.get",
+])
+
+AUDIO_METHODS = frozenset(
+    f"{interface}.{member}"
+    for interface in ("BaseAudioContext", "AudioContext",
+                      "OfflineAudioContext")
+    for member in ("createOscillator", "createDynamicsCompressor",
+                   "destination", "startRendering", "oncomplete"))
+
+
+@dataclass
+class ScriptUsage:
+    """What a single script did with the methods the detectors look at."""
+    counts: Counter[str] = field(default_factory=Counter)
+    fonts: set[str] = field(default_factory=set)
+
+    def called_any(self, methods: frozenset[str]) -> bool:
+        return any(self.counts[method] > 0 for method in methods)
+
+
+def record_call(usage: ScriptUsage, method: str, edge: JSCallEdge) -> None:
+    usage.counts[method] += 1
+
+
+def record_font_set(usage: ScriptUsage, method: str,
+                    edge: JSCallEdge) -> None:
+    usage.counts[method] += 1
+    args = edge.args()
+    font = args[0] if isinstance(args, list) and args else args
+    usage.fonts.add(str(font))
+
+
+# Maps each method any detector cares about to how a call to it is
+# recorded, so that each call is looked at once, regardless of how many
+# detectors use it, and calls to all other methods are never looked at.
+METHOD_HANDLERS: dict[
+        str, Callable[[ScriptUsage, str, JSCallEdge], None]] = {
+    method: record_call
+    for method in (CANVAS_TEXT_METHODS | CANVAS_STYLE_METHODS |
+                   CANVAS_EXPORT_METHODS | CANVAS_BENIGN_METHODS |
+                   WEBRTC_CHANNEL_METHODS | WEBRTC_CANDIDATE_METHODS |
+                   AUDIO_METHODS | {CANVAS_MEASURE_METHOD})
+}
+METHOD_HANDLERS[CANVAS_FONT_SET_METHOD] = record_font_set
+
+
+def detect_techniques(usage: ScriptUsage) -> list[str]:
+    """Returns the fingerprinting techniques the script's calls match."""
+    techniques = []
+    if (usage.called_any(CANVAS_TEXT_METHODS) and
+            usage.called_any(CANVAS_STYLE_METHODS) and
+            usage.called_any(CANVAS_EXPORT_METHODS) and
+            not usage.called_any(CANVAS_BENIGN_METHODS)):
+        techniques.append(CANVAS_IMAGE)
+    if (len(usage.fonts) > CANVAS_FONT_THRESHOLD and
+            usage.counts[CANVAS_MEASURE_METHOD] > CANVAS_FONT_THRESHOLD):
+        techniques.append(CANVAS_FONT)
+    if (usage.called_any(WEBRTC_CHANNEL_METHODS) and
+            usage.called_any(WEBRTC_CANDIDATE_METHODS)):
+        techniques.append(WEBRTC)
+    if usage.called_any(AUDIO_METHODS):
+        techniques.append(AUDIO)
+    return techniques
+
+
+@dataclass
+class Result(ReportBase):
+    caller_id: PageGraphNodeId
+    techniques: list[str]
+    calls: dict[str, int]
+    """The number of calls the script made to each method the detectors
+    look at."""
+    distinct_fonts: int
+    caller: Union[ScriptReport, BasicReport, None] = None
+
+
+class Command(pagegraph.commands.Base):
+    """Flags the scripts whose JS calls match known canvas, canvas font,
+    WebRTC and audio fingerprinting patterns. Unlike the js-calls command,
+    every call is considered, not a sample of them."""
+
+    node_types = [Node.Types.JS_BUILTIN, Node.Types.WEB_API]
+    # The attribute edges are needed to describe the element that
+    # executed each flagged script.
+    edge_types = pagegraph.commands.SCRIPT_REPORT_EDGE_TYPES + [
+        Edge.Types.JS_CALL,
+        Edge.Types.ATTRIBUTE_SET,
+        Edge.Types.ATTRIBUTE_DELETE,
+    ]
+
+    def __init__(self, input_path: Path, debug: bool = False) -> None:
+        super().__init__(input_path, debug)
+
+    def execute(self) -> pagegraph.commands.Result:
+        pg = self.load_graph()
+        usages: dict[PageGraphNodeId, ScriptUsage] = {}
+
+        for js_node in pg.js_structure_nodes():
+            method = js_node.name()
+            handler = METHOD_HANDLERS.get(method)
+            if handler is None:
+                continue
+            for edge in js_node.incoming_edges_of_type(Edge.Types.JS_CALL):
+                js_call_edge = edge.as_js_call_edge()
+                assert js_call_edge
+                usage = usages.get(js_call_edge.incoming_node_id)
+                if usage is None:
+                    usage = ScriptUsage()
+                    usages[js_call_edge.incoming_node_id] = usage
+                handler(usage, method, js_call_edge)
+
+        reports: list[Result] = []
+        for caller_id in sorted(usages, key=lambda nid: int(nid[1:])):
+            usage = usages[caller_id]
+            techniques = detect_techniques(usage)
+            if not techniques:
+                continue
+            caller_node = pg.node(caller_id)
+            reports.append(Result(
+                caller_id, techniques, dict(sorted(usage.counts.items())),
+                len(usage.fonts), caller_node.to_report()))
+        return pagegraph.commands.Result(pg, reports)
@@ -2,17 +2,35 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
+from urllib.parse import urljoin
 
 import pagegraph.commands
 import pagegraph.graph
-from pagegraph.serialize import ReportBase
+from pagegraph.graph.edge import Edge
+from pagegraph.serialize import DOMElementReport, ReportBase
+from pagegraph.urls import is_security_origin_inheriting_url
 
 if TYPE_CHECKING:
     from pathlib import Path
     from typing import Optional
 
+    from pagegraph.graph import PageGraph
+    from pagegraph.graph.node.abc.dom_element import DOMElementNode
     from pagegraph.serialize import DOMNodeReport
-    from pagegraph.types import PageGraphNodeId
+    from pagegraph.types import PageGraphNodeId, Url
+
+
+# The attributes checked (in order) for the URL an element loads.
+URL_ATTRIBUTES = ("src", "href")
+
+
+@dataclass
+class CreatorElementReport(DOMElementReport):
+    creator_id: Optional[PageGraphNodeId] = None
+    creator_type: Optional[str] = None
+    url: Optional[Url] = None
+    """The element's "src" (or else "href") attribute, resolved against the
+    URL of the element's document."""
 
 
 @dataclass
@@ -24,20 +42,26 @@ class Command(pagegraph.commands.Base):
     frame_filter: Optional[PageGraphNodeId]
     at_serialization: bool
     only_body_content: bool
+    tags: Optional[frozenset[str]]
+    include_creators: bool
 
     def __init__(self, input_path: Path,
                  frame_filter: Optional[PageGraphNodeId],
                  at_serialization: bool, only_body_content: bool,
                  debug: bool,
-                  pg=None) -> None:
-
-        self.pg = pg
+                 pg: Optional[PageGraph] = None,
+                 tags: Optional[list[str]] = None,
+                 include_creators: bool = False) -> None:
 
         self.frame_filter = frame_filter
         self.at_serialization = at_serialization
         self.only_body_content = only_body_content
+        self.tags = None
+        if tags:
+            self.tags = frozenset(tag.upper() for tag in tags)
+        self.include_creators = include_creators
         
-        super().__init__(input_path, debug)
+        super().__init__(input_path, debug, pg)
 
     def validate(self) -> None:
         if self.frame_filter:
@@ -45,12 +69,14 @@ class Command(pagegraph.commands.Base):
         return super().validate()
 
     def execute(self) -> pagegraph.commands.Result:
-        pg = self.pg if self.pg is not None else pagegraph.graph.from_path(self.input_path, self.debug)        
+        pg = self.load_graph()
 
         dom_nodes = pg.dom_nodes()
         reports = []
 
         for node in dom_nodes:
+            if self.tags and node.tag_name().upper() not in self.tags:
+                continue
             if self.frame_filter:
                 domroot_for_insertion = node.domroot_for_document()
                 if not domroot_for_insertion:
@@ -61,5 +87,33 @@ class Command(pagegraph.commands.Base):
                 continue
             if self.only_body_content and not node.is_body_content():
                 continue
-            reports.append(node.to_report())
+            report = node.to_report()
+            if self.include_creators and isinstance(report, DOMElementReport):
+                report = self.creator_report(node, report)
+            reports.append(report)
         return pagegraph.commands.Result(pg, Result(reports))
+
+    def creator_report(self, node: DOMElementNode,
+                       report: DOMElementReport) -> CreatorElementReport:
+        creator_report = CreatorElementReport(report.id, report.tag,
+                                              report.attrs)
+        for edge in node.incoming_edges_of_type(Edge.Types.NODE_CREATE):
+            creator_node = edge.incoming_node()
+            creator_report.creator_id = creator_node.pg_id()
+            creator_report.creator_type = creator_node.node_type().value
+            break
+
+        attrs = report.attrs or {}
+        for attr_name in URL_ATTRIBUTES:
+            attr_value = attrs.get(attr_name)
+            if not isinstance(attr_value, str) or not attr_value:
+                continue
+            base_url = None
+            if domroot_node := node.domroot_for_document():
+                base_url = domroot_node.url()
+            if not base_url or is_security_origin_inheriting_url(base_url):
+                base_url = node.pg.url
+            creator_report.url = (urljoin(base_url, attr_value.strip())
+                                  if base_url else attr_value)
+            break
+        return creator_report
@@ -11,12 +11,15 @@ import pagegraph.graph
 from pagegraph.serialize import ReportBase
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from pathlib import Path
-    from typing import Optional, Union
+    from typing import Optional, TypeVar, Union
     from pagegraph.graph.node.dom_root import DOMRootNode
     from pagegraph.serialize import ScriptReport, BasicReport, JSCallResultReport
     from pagegraph.types import PageGraphId
 
+    T = TypeVar("T")
+
 
 JS_CALLS_TO_IGNORE = ["DateConstructor", "ConsoleLog", "DateNow", "JsonParse", "JsonStringify", "DateTimeFormatSupportedLocalesOf", "DatePrototypeSetHours", "DatePrototypeSetMinutes", "DatePrototypeSetSeconds", "DateTimeFormatConstructor", "DateTimeFormatPrototypeResolvedOptions", "DatePrototypeToUTCString", "ConsoleWarn", "DateUTC", "DatePrototypeToISOString", "DatePrototypeToString", "DatePrototypeToLocaleString", "DatePrototypeToLocaleDateString", "DatePrototypeSetUTCFullYear", "DatePrototypeSetFullYear", "DateTimeFormatPrototypeFormat", "DateTimeFormatInternalFormat"]
 
@@ -24,6 +27,10 @@ JS_CALLS_TO_IGNORE = ["DateConstructor", "ConsoleLog", "DateNow", "JsonParse", "
 THRESHOLD_FOR_JS_CALLS_TO_IGNORE = 500
 THRESHOLD_FOR_JS_CALLS_TO_COSIDER = 5000
 
+# Seed for choosing which calls to report when a method is called more
+# often than its threshold, so that reruns give the same report.
+DEFAULT_SAMPLING_SEED = 0
+
 
 
 @dataclass
@@ -32,20 +39,42 @@ class Result(ReportBase):
     call: JSCallResultReport
 
 
+def reservoir_sample(items: Iterable[T], k: int,
+                     rng: random.Random) -> tuple[list[T], int]:
+    """Chooses up to `k` of the items uniformly at random, in one pass over
+    the items, and returns the chosen items (in the order they were seen)
+    along with how many items there were."""
+    reservoir: list[tuple[int, T]] = []
+    count = 0
+    for count, item in enumerate(items, start=1):
+        if count <= k:
+            reservoir.append((count, item))
+            continue
+        index = rng.randrange(count)
+        if index < k:
+            reservoir[index] = (count, item)
+    reservoir.sort(key=lambda entry: entry[0])
+    return [item for _, item in reservoir], count
+
+
 class Command(pagegraph.commands.Base):
     frame_nid: Optional[PageGraphId]
     cross_frame: bool
     method: Optional[str]
     pg_id: Optional[PageGraphId]
+    seed: int
 
     def __init__(self, input_path: Path, frame_nid: Optional[PageGraphId],
                  cross_frame: bool, method: Optional[str],
-                 pg_id: Optional[PageGraphId], debug: bool = False) -> None:
+                 pg_id: Optional[PageGraphId],
+                 seed: int = DEFAULT_SAMPLING_SEED,
+                 debug: bool = False) -> None:
         
         self.frame_nid = frame_nid
         self.cross_frame = cross_frame
         self.method = method
         self.pg_id = pg_id
+        self.seed = seed
         super().__init__(input_path, debug)
 
     def validate(self) -> None:
@@ -57,7 +86,7 @@ class Command(pagegraph.commands.Base):
 
     def execute(self) -> pagegraph.commands.Result:
 
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         
         reports: list[Result] = []        
         domroot_node: Optional[DOMRootNode] = None
@@ -83,7 +112,12 @@ class Command(pagegraph.commands.Base):
             return pagegraph.commands.Result(pg, reports)
 
 
-        lits_of_nodes = list(pg.js_structure_nodes())
+        # Methods called more often than their threshold are sampled as
+        # their calls are enumerated, so that call results and reports are
+        # only built for the calls that end up being reported. The true
+        # number of calls to each method is included with the report.
+        rng = random.Random(self.seed)
+        call_counts: dict[str, int] = {}
 
         js_structure_nodes = pg.js_structure_nodes()
 
@@ -92,13 +126,15 @@ class Command(pagegraph.commands.Base):
             if self.method and self.method not in js_node.name():
                 continue
 
-            call_results = js_node.call_results()
-
-            if js_node.name() in JS_CALLS_TO_IGNORE and len(call_results) > THRESHOLD_FOR_JS_CALLS_TO_IGNORE: 
-                call_results = random.sample(call_results, k=THRESHOLD_FOR_JS_CALLS_TO_IGNORE)
-
-            elif len(call_results) > THRESHOLD_FOR_JS_CALLS_TO_COSIDER: 
-                call_results = random.sample(call_results, k=THRESHOLD_FOR_JS_CALLS_TO_COSIDER)
+            if js_node.name() in JS_CALLS_TO_IGNORE:
+                threshold = THRESHOLD_FOR_JS_CALLS_TO_IGNORE
+            else:
+                threshold = THRESHOLD_FOR_JS_CALLS_TO_COSIDER
+            call_edges, num_calls = reservoir_sample(
+                js_node.call_edges(), threshold, rng)
+            call_counts[js_node.name()] = (
+                call_counts.get(js_node.name(), 0) + num_calls)
+            call_results = [js_node.call_result(edge) for edge in call_edges]
 
             nb_call_results = len(call_results)
 
@@ -124,4 +160,5 @@ class Command(pagegraph.commands.Base):
                 script_report = script_node.to_report()
                 reports.append(Result(script_report, call_report))
 
-        return pagegraph.commands.Result(pg, reports)
\ No newline at end of file
+        return pagegraph.commands.Result(
+            pg, reports, {"js call counts": call_counts})
\ No newline at end of file
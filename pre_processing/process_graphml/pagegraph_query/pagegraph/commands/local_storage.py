@@ -7,6 +7,7 @@ import json
 
 import pagegraph.commands
 import pagegraph.graph
+from pagegraph.graph.node import Node
 from pagegraph.serialize import ReportBase
 
 if TYPE_CHECKING:
@@ -29,6 +30,10 @@ class Command(pagegraph.commands.Base):
     include_source: bool
     depth: int
 
+    node_types = [Node.Types.LOCAL_STORAGE]
+    edge_types = (pagegraph.commands.STORAGE_EDGE_TYPES +
+                  pagegraph.commands.SCRIPT_REPORT_EDGE_TYPES)
+
 
 
 
@@ -64,7 +69,7 @@ class Command(pagegraph.commands.Base):
 
         reports: list[Result] = []
 
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         local_storage_nodes = pg.local_storage_nodes()
 
         if len(local_storage_nodes) > 1:
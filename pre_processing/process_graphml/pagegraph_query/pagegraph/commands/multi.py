@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import TYPE_CHECKING
+
+import pagegraph.commands
+from pagegraph.graphml import graph_name_from_path
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Optional
+
+    from pagegraph.types import ElementTypes
+
+
+class Result:
+    results: dict[str, pagegraph.commands.Result]
+
+    def __init__(self, results: dict[str, pagegraph.commands.Result]) -> None:
+        self.results = results
+
+    def to_json(self) -> str:
+        parts = []
+        for name, result in self.results.items():
+            parts.append(f"{json.dumps(name)}: {result.to_json()}")
+        return "{" + ", ".join(parts) + "}"
+
+
+class Command(pagegraph.commands.Base):
+    """Runs several commands against a single parsed copy of a graph.
+
+    Parsing the GraphML file dominates the runtime of most commands, so
+    this loads the graph once and hands the same `PageGraph` instance to
+    each of the given commands."""
+
+    commands: dict[str, pagegraph.commands.Base]
+    output_dir: Optional[Path]
+
+    def __init__(self, input_path: Path,
+                 commands: dict[str, pagegraph.commands.Base],
+                 output_dir: Optional[Path], debug: bool = False) -> None:
+        self.commands = commands
+        self.output_dir = output_dir
+        super().__init__(input_path, debug)
+
+    def validate(self) -> None:
+        if len(self.commands) == 0:
+            raise ValueError("At least one command must be provided")
+        if self.output_dir and not self.output_dir.is_dir():
+            raise ValueError(
+                f"Output directory does not exist: {self.output_dir}")
+        for command in self.commands.values():
+            command.validate()
+        return super().validate()
+
+    def element_types(self) -> Optional[ElementTypes]:
+        """Loads everything any of the commands needs."""
+        element_types: Optional[ElementTypes] = None
+        for command in self.commands.values():
+            command_types = command.element_types()
+            if command_types is None:
+                return None
+            if element_types is None:
+                element_types = command_types
+            else:
+                element_types = element_types.union(command_types)
+        return element_types
+
+    def execute(self) -> Result:  # type: ignore[override]
+        pg = self.load_graph()
+        results: dict[str, pagegraph.commands.Result] = {}
+        for name, command in self.commands.items():
+            command.pg = pg
+            try:
+                result = command.execute()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # One failing report shouldn't throw away the (expensive)
+                # parsed graph for all the others.
+                print(f"Command '{name}' failed: {exc}", file=sys.stderr)
+                continue
+            if not isinstance(result, pagegraph.commands.Result):
+                print(f"Command '{name}' failed: returned {result!r} "
+                      "instead of a result", file=sys.stderr)
+                continue
+            results[name] = result
+        return Result(results)
+
+    def output_path_for(self, name: str) -> Path:
+        assert self.output_dir
+        graph_name = graph_name_from_path(self.input_path)
+        return self.output_dir / f"{graph_name}.{name}.json"
+
+    def format(self, result: Result) -> Optional[str]:  # type: ignore[override]
+        if not self.output_dir:
+            return result.to_json()
+        for name, command_result in result.results.items():
+            with self.output_path_for(name).open("w") as handle:
+                command_result.write_json(handle)
+        return None
@@ -5,12 +5,17 @@ from typing import TYPE_CHECKING
 
 import pagegraph.commands
 import pagegraph.graph
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
 from pagegraph.serialize import ReportBase
 
 if TYPE_CHECKING:
     from pathlib import Path
     from typing import Optional
 
+    from pagegraph.graph.edge.request_start import RequestStartEdge
+    from pagegraph.graph.node.dom_root import DOMRootNode
+    from pagegraph.graph.requests import RequestChain
     from pagegraph.serialize import RequestChainReport, FrameReport
     from pagegraph.types import PageGraphNodeId
 
@@ -24,6 +29,17 @@ class Result(ReportBase):
 class Command(pagegraph.commands.Base):
     frame_nid: Optional[PageGraphNodeId]
 
+    node_types = [Node.Types.RESOURCE, Node.Types.DOM_ROOT]
+    # Frame reports need the DOM structure (for the security origin of
+    # frames in older graphs, which is worked out from the parent frame).
+    edge_types = pagegraph.commands.REQUEST_EDGE_TYPES + [
+        Edge.Types.CROSS_DOM,
+        Edge.Types.DOCUMENT,
+        Edge.Types.NODE_CREATE,
+        Edge.Types.NODE_INSERT,
+        Edge.Types.STRUCTURE,
+    ]
+
     def __init__(self, input_path: Path, frame_nid: Optional[PageGraphNodeId],
                  debug: bool = False) -> None:
 
@@ -36,7 +52,7 @@ class Command(pagegraph.commands.Base):
         return super().validate()
 
     def execute(self) -> pagegraph.commands.Result:
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         results: list[Result] = []
 
 
@@ -51,8 +67,13 @@ class Command(pagegraph.commands.Base):
             request_id = request_start_edge.request_id()
             request_chain = pg.request_chain_for_id(request_id)
 
-            request_chain_report = request_chain.to_report()
-            frame_report = request_frame.to_report()
-            report = Result(request_chain_report, frame_report)
-            results.append(report)
+            results.append(self.report(request_start_edge, request_chain,
+                                       request_frame))
         return pagegraph.commands.Result(pg, results)
+
+    def report(self, request_start_edge: RequestStartEdge,
+               request_chain: RequestChain,
+               request_frame: DOMRootNode) -> Result:
+        request_chain_report = request_chain.to_report()
+        frame_report = request_frame.to_report()
+        return Result(request_chain_report, frame_report)
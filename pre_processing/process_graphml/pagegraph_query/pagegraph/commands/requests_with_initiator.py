@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import pagegraph.commands.requests
+from pagegraph.serialize import ReportBase
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from pagegraph.graph.edge.request_start import RequestStartEdge
+    from pagegraph.graph.node.dom_root import DOMRootNode
+    from pagegraph.graph.requests import RequestChain
+    from pagegraph.types import PageGraphNodeId, RequesterNode
+
+
+@dataclass
+class InitiatorReport(ReportBase):
+    id: PageGraphNodeId
+    type: str
+    hash: Optional[str] = None
+    """The hash of the script's source, if the initiator is a script."""
+
+
+@dataclass
+class Result(pagegraph.commands.requests.Result):
+    initiator: InitiatorReport
+
+
+class Command(pagegraph.commands.requests.Command):
+    """Reports each request chain along with the node that started the
+    request (i.e., the incoming node of the chain's "request start" edge)."""
+
+    initiators: dict[PageGraphNodeId, InitiatorReport]
+
+    def execute(self) -> pagegraph.commands.Result:
+        self.initiators = {}
+        return super().execute()
+
+    def initiator_report(self, node: RequesterNode) -> InitiatorReport:
+        # Pages often make many requests from the same script or element,
+        # so each initiator is only described once.
+        if (report := self.initiators.get(node.pg_id())) is not None:
+            return report
+        report = InitiatorReport(node.pg_id(), node.node_type().value)
+        if script_node := node.as_script_local_node():
+            report.hash = script_node.hash()
+        self.initiators[node.pg_id()] = report
+        return report
+
+    def report(self, request_start_edge: RequestStartEdge,
+               request_chain: RequestChain,
+               request_frame: DOMRootNode) -> Result:
+        initiator = request_start_edge.incoming_node()
+        return Result(request_chain.to_report(), request_frame.to_report(),
+                      self.initiator_report(initiator))
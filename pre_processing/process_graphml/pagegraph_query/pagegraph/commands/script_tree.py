@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import pagegraph.commands
+import pagegraph.graph
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+from pagegraph.serialize import ReportBase
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Optional
+
+    from pagegraph.types import PageGraphNodeId, Url
+
+
+@dataclass
+class LoaderReport(ReportBase):
+    id: PageGraphNodeId
+    type: str
+    script_type: Optional[str] = None
+    hash: Optional[str] = None
+    url: Optional[Url] = None
+    tag_name: Optional[str] = None
+
+
+@dataclass
+class Result(ReportBase):
+    script: LoaderReport
+    loaders: list[LoaderReport]
+    """The node that loaded the script, then the node that loaded that
+    one, and so on, up to the parser (or whichever node has no loader)."""
+    execute_edge_type: Optional[str] = None
+    """How the first loader ran the script, either "execute", or "execute
+    from attribute" (for event handler attributes)."""
+
+
+class Command(pagegraph.commands.Base):
+    """Reports, for every script, the chain of scripts and elements that
+    led to it being loaded. A script is loaded by whatever executed it (an
+    element, or another script for eval and similar), and an element is
+    loaded by whatever created it (a script, or the parser)."""
+
+    node_types = [Node.Types.SCRIPT_LOCAL]
+    edge_types = pagegraph.commands.SCRIPT_REPORT_EDGE_TYPES + [
+        Edge.Types.NODE_CREATE,
+    ]
+
+    reports: dict[PageGraphNodeId, LoaderReport]
+    chains: dict[PageGraphNodeId, list[LoaderReport]]
+
+    def __init__(self, input_path: Path, debug: bool = False) -> None:
+        super().__init__(input_path, debug)
+
+    def loader_report(self, node: Node) -> LoaderReport:
+        if (report := self.reports.get(node.pg_id())) is not None:
+            return report
+        report = LoaderReport(node.pg_id(), node.node_type().value)
+        if script_node := node.as_script_local_node():
+            report.script_type = script_node.script_type().value
+            report.hash = script_node.hash()
+            report.url = script_node.url_if_external()
+        elif dom_element_node := node.as_dom_element_node():
+            report.tag_name = dom_element_node.tag_name()
+        self.reports[node.pg_id()] = report
+        return report
+
+    @staticmethod
+    def loader_node(node: Node) -> Optional[Node]:
+        if script_node := node.as_script_local_node():
+            execute_edge = script_node.execute_edge()
+            return execute_edge.incoming_node() if execute_edge else None
+        if node.as_dom_element_node():
+            for edge in node.incoming_edges_of_type(Edge.Types.NODE_CREATE):
+                return edge.incoming_node()
+        return None
+
+    def loader_chain(self, node: Node) -> list[LoaderReport]:
+        """Returns the loaders of the node, nearest first. Chains are
+        memoized, so loaders shared by many scripts (e.g., a tag manager)
+        are only walked once."""
+        # Walk up until reaching a node whose chain is already known (or
+        # that has no loader), and then fill in the chains on the way back.
+        pending: list[Node] = []
+        seen: set[PageGraphNodeId] = set()
+        chain: list[LoaderReport] = []
+        needle: Optional[Node] = node
+        while needle is not None:
+            if (known_chain := self.chains.get(needle.pg_id())) is not None:
+                chain = [self.loader_report(needle)] + known_chain
+                break
+            if needle.pg_id() in seen:
+                # Shouldn't happen, but don't loop forever if it does.
+                break
+            seen.add(needle.pg_id())
+            pending.append(needle)
+            needle = self.loader_node(needle)
+
+        for pending_node in reversed(pending):
+            self.chains[pending_node.pg_id()] = chain
+            chain = [self.loader_report(pending_node)] + chain
+        return self.chains[node.pg_id()]
+
+    def execute(self) -> pagegraph.commands.Result:
+        pg = self.load_graph()
+        self.reports = {}
+        self.chains = {}
+        results: list[Result] = []
+        for script_node in pg.script_local_nodes():
+            execute_edge = script_node.execute_edge()
+            results.append(Result(
+                self.loader_report(script_node),
+                self.loader_chain(script_node),
+                execute_edge.type_name() if execute_edge else None))
+        return pagegraph.commands.Result(pg, results)
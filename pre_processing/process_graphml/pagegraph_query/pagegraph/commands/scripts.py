@@ -47,7 +47,7 @@ class Command(pagegraph.commands.Base):
 
     def execute(self) -> pagegraph.commands.Result:
         
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         reports: list[Result] = []
         for script_node in pg.script_local_nodes():
             if self.pg_id and script_node.pg_id() != self.pg_id:
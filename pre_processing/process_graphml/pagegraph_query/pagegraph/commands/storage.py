@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import pagegraph.commands
+import pagegraph.graph
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+from pagegraph.serialize import ReportBase
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Optional
+
+    from pagegraph.types import PageGraphEdgeId, PageGraphNodeId, Url
+
+    # The caller id, type, hash, script type and URL, in `Result` order.
+    CallerFields = tuple[PageGraphNodeId, str, Optional[str], Optional[str],
+                         Optional[Url]]
+
+
+STORAGE_NODE_TYPES = [
+    Node.Types.COOKIE_JAR,
+    Node.Types.LOCAL_STORAGE,
+    Node.Types.SESSION_STORAGE,
+]
+
+
+@dataclass
+class Result(ReportBase):
+    """One storage event, as a single flat row. The caller fields are only
+    set (beyond the id and type) when the caller is a script."""
+    edge_id: PageGraphEdgeId
+    event_type: str
+    storage_type: str
+    storage_key: Optional[str]
+    storage_value: Optional[str]
+    caller_id: PageGraphNodeId
+    caller_type: str
+    caller_hash: Optional[str] = None
+    script_type: Optional[str] = None
+    caller_url: Optional[Url] = None
+
+
+class Command(pagegraph.commands.Base):
+    """Reports on cookie, localStorage and sessionStorage events together,
+    in one pass over the graph's storage nodes."""
+
+    node_types = STORAGE_NODE_TYPES
+    edge_types = (pagegraph.commands.STORAGE_EDGE_TYPES +
+                  pagegraph.commands.SCRIPT_REPORT_EDGE_TYPES)
+
+    def __init__(self, input_path: Path, debug: bool = False) -> None:
+        super().__init__(input_path, debug)
+
+    def caller_fields(self, caller_node: Node) -> CallerFields:
+        if script_node := caller_node.as_script_local_node():
+            return (script_node.pg_id(), script_node.node_type().value,
+                    script_node.hash(), script_node.script_type().value,
+                    script_node.url_if_external())
+        return (caller_node.pg_id(), caller_node.node_type().value,
+                None, None, None)
+
+    def execute(self) -> pagegraph.commands.Result:
+        pg = self.load_graph()
+        results: list[Result] = []
+
+        # Most storage events come from a handful of scripts, so each
+        # caller is only described once.
+        callers: dict[PageGraphNodeId, CallerFields] = {}
+        key_attr = Edge.RawAttrs.KEY.value
+        value_attr = Edge.RawAttrs.VALUE.value
+
+        storage_nodes: list[Node] = []
+        for node_type in STORAGE_NODE_TYPES:
+            storage_nodes += pg.nodes_of_type(node_type)
+
+        for storage_node in storage_nodes:
+            storage_type = storage_node.node_type().value
+            storage_nid = storage_node.pg_id()
+            edges = (list(storage_node.outgoing_edges()) +
+                     list(storage_node.incoming_edges()))
+            for edge in edges:
+                event_type = edge.type_name()
+                if event_type == Edge.Types.STORAGE_BUCKET.value:
+                    continue
+
+                if edge.incoming_node_id == storage_nid:
+                    caller_nid = edge.outgoing_node_id
+                else:
+                    caller_nid = edge.incoming_node_id
+                caller = callers.get(caller_nid)
+                if caller is None:
+                    caller = self.caller_fields(pg.node(caller_nid))
+                    callers[caller_nid] = caller
+
+                edge_data = edge.data()
+                results.append(Result(
+                    edge.pg_id(), event_type, storage_type,
+                    edge_data.get(key_attr), edge_data.get(value_attr),
+                    *caller))
+        return pagegraph.commands.Result(pg, results)
@@ -30,7 +30,7 @@ class Command(pagegraph.commands.Base):
         super().__init__(input_path, debug)
 
     def execute(self) -> pagegraph.commands.Result:
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         results: list[Result] = []
         for iframe_node in pg.iframe_nodes():
             if (self.local_only and
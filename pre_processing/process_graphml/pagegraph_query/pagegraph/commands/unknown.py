@@ -14,7 +14,7 @@ class Result(ReportBase):
 
 class Command(pagegraph.commands.Base):
     def execute(self) -> pagegraph.commands.Result:
-        pg = pagegraph.graph.from_path(self.input_path, self.debug)
+        pg = self.load_graph()
         count = 0
         unknown_node = pg.unknown_node()
         if unknown_node:
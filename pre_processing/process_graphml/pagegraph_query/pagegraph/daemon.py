@@ -0,0 +1,336 @@
+"""A long running query server, that keeps recently used graphs in memory.
+
+Requests and responses are single line JSON objects. Each request looks like:
+
+    {"id": <optional, echoed back>, "graph": "<path to graph>",
+     "command": "<command name, as used on the command line>",
+     "args": <optional list of CLI args, or dict of long option names>}
+
+and is answered with either:
+
+    {"id": ..., "ok": true, "result": <the command's JSON report>}
+    {"id": ..., "ok": false, "error": "<description>"}
+
+Commands are run in a pool of worker processes, each of which holds its
+own LRU cache of parsed graphs. When listening on a unix socket, each
+connection is handled in its own thread, so up to one request per worker
+is answered at a time. A worker is killed and replaced if a request takes
+longer than the per-request timeout, or if the worker's memory use grows
+beyond a given limit."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import gc
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import queue
+import socketserver
+import sys
+from typing import TYPE_CHECKING
+
+import pagegraph.graph
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+    from typing import Any, Callable, Optional, TextIO, Union
+
+    from pagegraph.commands import Base
+    from pagegraph.graph import PageGraph
+
+    CommandArgs = Union[list[str], dict[str, Any], None]
+    CommandFactory = Callable[[str, Path, list[str]], Base]
+
+
+def current_rss_bytes() -> int:
+    """Returns the resident memory size of the current process. Only
+    supported on Linux (returns 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm", encoding="utf8") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def args_to_argv(args: CommandArgs) -> list[str]:
+    """Converts the "args" field of a request into command line arguments.
+
+    Args can either already be a list of command line arguments, or a dict
+    mapping long option names (e.g., "frame", or "at_serialization") to
+    values, where `True` values are treated as flags."""
+    if args is None:
+        return []
+    if isinstance(args, list):
+        return [str(arg) for arg in args]
+    if isinstance(args, dict):
+        argv: list[str] = []
+        for name, value in args.items():
+            option = "--" + name.replace("_", "-")
+            if value is True:
+                argv.append(option)
+            elif value is False or value is None:
+                continue
+            else:
+                argv += [option, str(value)]
+        return argv
+    raise ValueError(f"Invalid args, expected a list or dict: {args}")
+
+
+@dataclass
+class CachedGraph:
+    pg: PageGraph
+    mtime_ns: int
+
+
+class GraphCache:
+    """LRU cache of parsed graphs, bounded by an (approximate) byte budget.
+
+    The budget is checked against how much the process's resident memory
+    has grown since the cache was created, since CPython reuses memory
+    freed by evicted graphs, and so the size of each graph can't be told
+    apart from the process's. Least recently used graphs are evicted until
+    the process is back within budget. The most recently used graph is
+    always kept, even if it alone exceeds the budget. Where resident
+    memory can't be read, only the most recently used graph is kept."""
+
+    max_bytes: int
+    debug: bool
+    graphs: OrderedDict[Path, CachedGraph]
+    base_rss_bytes: int
+
+    def __init__(self, max_bytes: int, debug: bool = False) -> None:
+        self.max_bytes = max_bytes
+        self.debug = debug
+        self.graphs = OrderedDict()
+        self.base_rss_bytes = current_rss_bytes()
+
+    def num_bytes(self) -> Optional[int]:
+        """Returns how much the process's resident memory has grown since
+        the cache was created, or None if it can't be measured."""
+        rss_bytes = current_rss_bytes()
+        if rss_bytes == 0:
+            return None
+        return max(rss_bytes - self.base_rss_bytes, 0)
+
+    def get(self, input_path: Path) -> PageGraph:
+        key = input_path.resolve()
+        mtime_ns = key.stat().st_mtime_ns
+        entry = self.graphs.get(key)
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            self.graphs.move_to_end(key)
+            return entry.pg
+
+        if entry is not None:
+            del self.graphs[key]
+            entry.pg.close()
+        pg = pagegraph.graph.from_path(key, self.debug)
+        self.graphs[key] = CachedGraph(pg, mtime_ns)
+        self.evict()
+        return pg
+
+    def evict(self) -> None:
+        while len(self.graphs) > 1:
+            num_bytes = self.num_bytes()
+            if num_bytes is not None and num_bytes <= self.max_bytes:
+                return
+            _, entry = self.graphs.popitem(last=False)
+            entry.pg.close()
+            del entry
+            # Graphs are full of reference cycles (nodes point back at
+            # their graph), so they're only freed by the cycle collector.
+            gc.collect()
+
+
+def run_request(request: dict[str, Any], factory: CommandFactory,
+                cache: GraphCache) -> str:
+    """Runs a single request against the cache, and returns the JSON
+    encoded result of the command."""
+    graph_path = Path(request["graph"])
+    command_name = str(request["command"])
+    argv = args_to_argv(request.get("args"))
+    command = factory(command_name, graph_path, argv)
+    command.validate()
+    command.pg = cache.get(graph_path)
+    result = command.execute()
+    return result.to_json()
+
+
+def worker_main(conn: Connection, factory: CommandFactory,
+                cache_bytes: int, debug: bool) -> None:
+    # Anything the commands print shouldn't end up interleaved with
+    # responses, if the server is talking over STDOUT.
+    sys.stdout = sys.stderr
+    cache = GraphCache(cache_bytes, debug)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        try:
+            response = (True, run_request(request, factory, cache))
+        except SystemExit:
+            # argparse exits (after printing usage) on bad arguments.
+            response = (False, "Invalid arguments for command")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            response = (False, f"{type(exc).__name__}: {exc}")
+        conn.send((response, current_rss_bytes()))
+
+
+class Worker:
+    """A worker process, with its own cache of parsed graphs. The process
+    is (re)started on demand, and replaced if it times out, crashes, or
+    uses too much memory."""
+
+    factory: CommandFactory
+    cache_bytes: int
+    max_worker_bytes: int
+    timeout: float
+    debug: bool
+    process: Optional[BaseProcess] = None
+    conn: Optional[Connection] = None
+
+    def __init__(self, factory: CommandFactory, cache_bytes: int,
+                 max_worker_bytes: int, timeout: float,
+                 debug: bool = False) -> None:
+        self.factory = factory
+        self.cache_bytes = cache_bytes
+        self.max_worker_bytes = max_worker_bytes
+        self.timeout = timeout
+        self.debug = debug
+
+    def start(self) -> None:
+        # "fork" so that the worker inherits the command factory (which
+        # usually closes over the CLI's argument parser).
+        context = multiprocessing.get_context("fork")
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=worker_main, daemon=True,
+            args=(child_conn, self.factory, self.cache_bytes, self.debug))
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.process = None
+
+    def handle(self, request: dict[str, Any]) -> tuple[bool, str]:
+        """Returns a tuple of whether the request succeeded, and either
+        the JSON encoded result, or an error message."""
+        if self.process is None or not self.process.is_alive():
+            self.stop()
+            self.start()
+        assert self.conn
+
+        # The worker can die at any point (e.g., killed by the OOM killer),
+        # including between the liveness check above and the send.
+        try:
+            self.conn.send(request)
+            if not self.conn.poll(self.timeout):
+                self.stop()
+                return False, f"Request timed out after {self.timeout} seconds"
+            response, worker_rss = self.conn.recv()
+        except (OSError, EOFError):
+            self.stop()
+            return False, "Worker process exited while handling request"
+
+        if worker_rss > self.max_worker_bytes:
+            self.stop()
+        return response
+
+
+class Server:
+    """Hands each request to an idle worker from a fixed size pool, so
+    that several clients can be answered at once. Each worker has its own
+    graph cache, and so its own memory budget."""
+
+    workers: list[Worker]
+    idle_workers: queue.Queue[Worker]
+
+    def __init__(self, factory: CommandFactory, cache_bytes: int,
+                 max_worker_bytes: int, timeout: float,
+                 debug: bool = False, num_workers: int = 1) -> None:
+        if num_workers < 1:
+            raise ValueError("At least one worker is needed")
+        self.workers = [
+            Worker(factory, cache_bytes, max_worker_bytes, timeout, debug)
+            for _ in range(num_workers)]
+        self.idle_workers = queue.Queue()
+        for worker in self.workers:
+            self.idle_workers.put(worker)
+
+    def handle(self, request: dict[str, Any]) -> tuple[bool, str]:
+        """Returns a tuple of whether the request succeeded, and either
+        the JSON encoded result, or an error message."""
+        worker = self.idle_workers.get()
+        try:
+            return worker.handle(request)
+        finally:
+            self.idle_workers.put(worker)
+
+    def respond(self, line: str) -> str:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests must be JSON objects")
+            request_id = request.get("id")
+            for field in ("graph", "command"):
+                if field not in request:
+                    raise ValueError(f"Request is missing '{field}'")
+            is_success, text = self.handle(request)
+        except ValueError as exc:
+            is_success, text = False, str(exc)
+
+        prefix = '{"id": ' + json.dumps(request_id) + ", "
+        if is_success:
+            return prefix + '"ok": true, "result": ' + text + "}"
+        return prefix + '"ok": false, "error": ' + json.dumps(text) + "}"
+
+    def serve_stream(self, input_stream: TextIO, output_stream: TextIO) -> None:
+        for line in input_stream:
+            if not line.strip():
+                continue
+            output_stream.write(self.respond(line) + "\n")
+            output_stream.flush()
+
+    def serve_unix_socket(self, socket_path: Path) -> None:
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for raw_line in self.rfile:
+                    line = raw_line.decode("utf8")
+                    if not line.strip():
+                        continue
+                    response = server.respond(line) + "\n"
+                    self.wfile.write(response.encode("utf8"))
+                    self.wfile.flush()
+
+        # Start the workers before any handler threads exist, so they aren't
+        # forked from a multi-threaded process in the common case.
+        for worker in self.workers:
+            worker.start()
+        if socket_path.exists():
+            socket_path.unlink()
+        with socketserver.ThreadingUnixStreamServer(
+                str(socket_path), Handler) as unix_server:
+            unix_server.daemon_threads = True
+            try:
+                unix_server.serve_forever()
+            finally:
+                socket_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.stop()
@@ -1,26 +1,36 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import heapq
 from itertools import chain
+import os
 from pathlib import Path
 import sys
-from typing import cast, TYPE_CHECKING
+from typing import cast, TYPE_CHECKING, TypeVar
 
-import networkx as NWX
 from packaging.version import Version
 
 import pagegraph
+from pagegraph.graph.attributes import attribute_index_for_graph
+from pagegraph.graph.attributes import attribute_ever_index_for_graph
+from pagegraph.graph.dom_tree import serialization_states_for_graph
 from pagegraph.graph.edge import Edge
+from pagegraph.graph.frames import frame_info_for_domroot
 from pagegraph.graph.node import Node
-from pagegraph.graph.requests import request_chain_for_edge
+from pagegraph.graph.requests import request_chains_for_graph
 from pagegraph.graph.type_map import edge_for_type, node_for_type
 from pagegraph.graphml import load_from_path
+import pagegraph.pgcache
+from pagegraph.types import StoreType
 from pagegraph.versions import Feature
 from pagegraph.versions import min_version_for_feature
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Any, Optional
 
+    from pagegraph.graph.attributes import AttributeIndex
+    from pagegraph.graph.dom_tree import SerializationState
+    from pagegraph.graph.frames import FrameInfo
+    from pagegraph.graph.edge.abc.event_listener import EventListenerEdge
     from pagegraph.graph.edge.js_call import JSCallEdge
     from pagegraph.graph.edge.event_listener_add import EventListenerAddEdge
     from pagegraph.graph.edge.event_listener_fired import EventListenerFiredEdge
@@ -43,11 +53,17 @@ if TYPE_CHECKING:
     from pagegraph.graph.node.local_storage import LocalStorageNode
     from pagegraph.graph.node.unknown import UnknownNode
     from pagegraph.graph.requests import RequestChain
-    from pagegraph.types import BlinkId, EventListenerId, ChildDomNode
+    from pagegraph.serialize import JSONAble
+    from pagegraph.store import GraphStore
+    from pagegraph.types import BlinkId, ElementTypes, EventListenerId
+    from pagegraph.types import ChildDomNode
     from pagegraph.types import FrameId, RequestId, Url, PageGraphInput
     from pagegraph.types import PageGraphId, NetworkXEdgeId, NetworkXNodeId
 
 
+EventListenerEdgeT = TypeVar("EventListenerEdgeT", bound="EventListenerEdge")
+
+
 class PageGraph:
 
     # Instance properties
@@ -63,77 +79,140 @@ class PageGraph:
     tool_version: Version = pagegraph.__version__
     """Version of this library. Included in generated reports."""
 
-    graph: NWX.MultiDiGraph
-    """The low-level [NetworkX](https://networkx.org/) representation of the
-    PageGraph generated GraphML file."""
-
-    r_graph: NWX.MultiDiGraph
-    """The reversed (i.e., edges flipped) version of the graph represented by
-    the given GraphML file."""
+    store: GraphStore
+    """The low-level representation of the PageGraph generated GraphML file
+    (by default, a [NetworkX](https://networkx.org/) graph)."""
 
     url: Url
     """URL for the page that was executed to generate the given PageGraph
     file."""
 
-    __blink_id_map: dict[BlinkId, DOMElementNode] = {}
+    __blink_id_map: dict[BlinkId, DOMElementNode]
     """Private cache for mapping *from* the integer id Blink assigns to each
     element (e.g., HTMLElement, TextNode, docstring, etc.) in the DOM tree, *to*
     the node representing that page element in the PageGraph representation."""
 
-    __request_chain_map: dict[RequestId, RequestChain] = {}
+    index_build_counts: dict[str, int]
+    """How many times each of the lazily built secondary indexes (e.g., the
+    request chains, or the event listener maps) has been built for this
+    graph. Indexes that the running query never needed are missing, which
+    is useful for checking what each command actually costs."""
+
+    __request_chain_map: Optional[dict[RequestId, RequestChain]]
     """Private cache for mapping from the integer id Blink assigns to each
     request, to the set of edges PageGraph uses to record the start,
     redirection, and completion (either successfully or with an error) to record
-    a request."""
+    a request. Built the first time it's needed."""
 
-    __nodes_by_type: dict[Node.Types, list[Node]] = {}
+    __nodes_by_type: dict[Node.Types, list[Node]]
     """Private cache for mapping from each PageGraph node type, to all the nodes
     in the graph with that type."""
 
-    __edges_by_type: dict[Edge.Types, list[Edge]] = {}
+    __edges_by_type: dict[Edge.Types, list[Edge]]
     """Private cache for mapping from each PageGraph edge type, to all the edges
     in the graph with that type."""
 
-    __edge_cache: list[Edge] = []
+    __edge_cache: list[Edge]
     """Private cache of every edge in the graph."""
 
-    __edge_id_cache: dict[PageGraphId, tuple[NetworkXNodeId, NetworkXNodeId]] = {}
+    __edge_id_cache: dict[PageGraphId, tuple[NetworkXNodeId, NetworkXNodeId]]
     """Private cache mapping from the PageGraph assigned identifier for
     each edge, to the NetworkX assigned identifier for each edge (which is
     the tuple of the identifier for the incoming and outgoing node for the
     edge)."""
 
-    __listener_add_edges: dict[EventListenerId, list[EventListenerAddEdge]] = {}
+    __listener_add_edges: Optional[
+        dict[EventListenerId, list[EventListenerAddEdge]]]
     """Private cache mapping from the Blink assigned integer identifier for the
     event, to all the edges in the graph representing when that event was
-    registered."""
+    registered. Built the first time it's needed."""
 
-    __listener_fired_edges: dict[EventListenerId, list[EventListenerFiredEdge]] = {}
+    __listener_fired_edges: Optional[
+        dict[EventListenerId, list[EventListenerFiredEdge]]]
     """Private cache mapping from the Blink assigned integer identifier for the
     event, to all the edges in the graph representing when that event fired
-    (e.g., the edge representing a single "click" event occurring)."""
+    (e.g., the edge representing a single "click" event occurring). Built
+    the first time it's needed."""
 
-    __listener_remove_edges: dict[EventListenerId, list[EventListenerRemoveEdge]] = {}
+    __listener_remove_edges: Optional[
+        dict[EventListenerId, list[EventListenerRemoveEdge]]]
     """Private cache mapping from the Blink assigned integer identifier for the
     event, to all the edges in the graph representing when that event was
-    removed or unregistered on an element."""
+    removed or unregistered on an element. Built the first time it's
+    needed."""
 
-    __inserted_below_map: dict[ParentDOMElementNode, list[ChildDomNode]] = {}
+    __inserted_below_map: dict[ParentDOMElementNode, list[ChildDomNode]]
     """Private cache mapping from a PageGraph node representing a DOM element
     (like a HTML element), to *all* the nodes that have ever been a direct
     child of the parent node."""
 
-    __frame_id_map: dict[FrameId, DOMRootNode] = {}
+    __frame_id_map: Optional[dict[FrameId, DOMRootNode]]
     """Private cache mapping from the Blink assigned integer id for each
     frame root (e.g., usually the Blink id for`window.document.documentElement),
-    to the node representing that element in the PageGraph graph."""
+    to the node representing that element in the PageGraph graph. Built the
+    first time it's needed."""
+
+    __frame_infos: Optional[dict[PageGraphId, FrameInfo]]
+    """Private cache mapping from the id of each DOMRootNode, to where that
+    frame sits in the frame tree, its security origin, and the report
+    describing it. Filled in one frame at a time, the first time each frame
+    is needed."""
+
+    __serialization_states: Optional[dict[PageGraphId, SerializationState]]
+    """Private cache mapping from the id of each DOM element node, to where
+    that element was in the document tree at serialization. Built the first
+    time it's needed."""
+
+    __response_hash_map: Optional[dict[str, list[RequestChain]]]
+    """Private cache mapping from the hash of each successful response, to
+    the request chains that ended with that response. Built the first time
+    it's needed."""
+
+    __attribute_index: Optional[AttributeIndex]
+    """Private index from attribute names (and name, value pairs) to the
+    elements that had them at serialization. Built the first time it's
+    needed."""
+
+    __attribute_ever_index: Optional[AttributeIndex]
+    """Private index from attribute names (and name, value pairs) to the
+    elements that ever had them during the page's execution. Built the
+    first time it's needed."""
+
+    __node_objects: dict[PageGraphId, Node]
+    """Private cache of the Node instance for each node id, so that each
+    node is only ever represented by a single instance."""
+
+    __edge_objects: dict[PageGraphId, Edge]
+    """Private cache of the Edge instance for each edge id."""
+
+    __edge_types: dict[PageGraphId, Edge.Types]
+    """Private cache mapping from each edge's id, to the edge's type."""
+
+    __typed_out_edges: dict[PageGraphId, dict[Edge.Types, list[Edge]]]
+    """Private index mapping from each node's id, to that node's outgoing
+    edges, bucketed by edge type. Each bucket keeps the edges in the same
+    order `Node.outgoing_edges()` returns them in. A node's buckets are
+    built the first time they're asked for, and reused after that."""
+
+    __typed_in_edges: dict[PageGraphId, dict[Edge.Types, list[Edge]]]
+    """Private index mapping from each node's id, to that node's incoming
+    edges, bucketed by edge type (see `__typed_out_edges`)."""
+
+    __out_edge_positions: dict[PageGraphId, int]
+    """Private cache mapping from each edge's id, to the edge's position
+    in its source node's list of outgoing edges. Used to merge buckets back
+    into adjacency order when asking for more than one edge type."""
+
+    __in_edge_positions: dict[PageGraphId, int]
+    """Private cache mapping from each edge's id, to the edge's position
+    in its target node's list of incoming edges."""
 
     def __init__(self, input_data: PageGraphInput, debug: bool = False):
         self.debug = debug
         self.url = input_data.url
         self.graph_version = input_data.version
-        self.graph = input_data.graph
-        self.r_graph = input_data.reverse_graph
+        self.store = input_data.store
+        self.__reset_caches()
 
         for node_type in Node.Types:
             self.__nodes_by_type[node_type] = []
@@ -143,7 +222,9 @@ class PageGraph:
         for node in self.nodes():
             self.__nodes_by_type[node.node_type()].append(node)
         for edge in self.edges():
-            self.__edges_by_type[edge.edge_type()].append(edge)
+            edge_type = edge.edge_type()
+            self.__edges_by_type[edge_type].append(edge)
+            self.__edge_types[edge.pg_id()] = edge_type
 
         # Now that we've mapped the NetworkX representation of the
         # graph into the representation defined by this library,
@@ -159,41 +240,175 @@ class PageGraph:
                 edge.validate()
             edge.build_caches()
 
-        self.build_caches()
-
-    def build_caches(self) -> None:
-        # do the below to populate the blink_id mapping dicts
-        # and the frame_id to frame node mapping (we keep the most
-        # recent version of each frame).
-        for node in self.dom_nodes():
-            if domroot_node := node.as_domroot_node():
-                blink_id = domroot_node.blink_id()
-                if blink_id not in self.__frame_id_map:
-                    self.__frame_id_map[blink_id] = domroot_node
-                else:
-                    current_node = self.__frame_id_map[blink_id]
-                    if current_node.timestamp() < domroot_node.timestamp():
-                        self.__frame_id_map[blink_id] = domroot_node
-
-        for request_start_edge in self.request_start_edges():
-            request_id = request_start_edge.request_id()
-            self.__request_chain_map[request_id] = request_chain_for_edge(
-                request_start_edge)
-
-        for add_edge in self.event_listener_add_edges():
-            listener_id = add_edge.event_listener_id()
-            add_events = self.__listener_add_edges.setdefault(listener_id, [])
-            add_events.append(add_edge)
-
-        for fired_edge in self.event_listener_fired_edges():
-            listener_id = fired_edge.event_listener_id()
-            fired_events = self.__listener_fired_edges.setdefault(listener_id, [])
-            fired_events.append(fired_edge)
-
-        for remove_edge in self.event_listener_remove_edges():
-            listener_id = remove_edge.event_listener_id()
-            remove_events = self.__listener_remove_edges.setdefault(listener_id, [])
-            remove_events.append(remove_edge)
+    def __enter__(self) -> PageGraph:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Drops everything this graph has cached, and releases the
+        resources held by the underlying store (e.g., a memory mapped
+        snapshot, or an open handle to the GraphML file). The graph
+        can't be queried after it's closed."""
+        self.__reset_caches()
+        self.store.close()
+
+    def __reset_caches(self) -> None:
+        self.__blink_id_map = {}
+        self.index_build_counts = {}
+        self.__request_chain_map = None
+        self.__nodes_by_type = {}
+        self.__edges_by_type = {}
+        self.__edge_cache = []
+        self.__edge_id_cache = {}
+        self.__listener_add_edges = None
+        self.__listener_fired_edges = None
+        self.__listener_remove_edges = None
+        self.__inserted_below_map = {}
+        self.__frame_id_map = None
+        self.__frame_infos = None
+        self.__serialization_states = None
+        self.__response_hash_map = None
+        self.__attribute_index = None
+        self.__attribute_ever_index = None
+        self.__node_objects = {}
+        self.__edge_objects = {}
+        self.__edge_types = {}
+        self.__typed_out_edges = {}
+        self.__typed_in_edges = {}
+        self.__out_edge_positions = {}
+        self.__in_edge_positions = {}
+
+    def outgoing_edges_of_type(self, node_id: PageGraphId,
+                               *edge_types: Edge.Types) -> list[Edge]:
+        """Returns the edges of any of the given types that start at the
+        given node, in the same order as `Node.outgoing_edges()`."""
+        buckets = self.__typed_out_edges.get(node_id)
+        if buckets is None:
+            edge_ids = self.store.out_edge_ids(node_id)
+            buckets = self.__bucket_edges(edge_ids, self.__out_edge_positions)
+            self.__typed_out_edges[node_id] = buckets
+        return self.__edges_from_buckets(
+            buckets, edge_types, self.__out_edge_positions)
+
+    def incoming_edges_of_type(self, node_id: PageGraphId,
+                               *edge_types: Edge.Types) -> list[Edge]:
+        """Returns the edges of any of the given types that end at the
+        given node, in the same order as `Node.incoming_edges()`."""
+        buckets = self.__typed_in_edges.get(node_id)
+        if buckets is None:
+            edge_ids = self.store.in_edge_ids(node_id)
+            buckets = self.__bucket_edges(edge_ids, self.__in_edge_positions)
+            self.__typed_in_edges[node_id] = buckets
+        return self.__edges_from_buckets(
+            buckets, edge_types, self.__in_edge_positions)
+
+    def __bucket_edges(self, edge_ids: list[PageGraphId],
+                       positions: dict[PageGraphId, int]
+                       ) -> dict[Edge.Types, list[Edge]]:
+        """Buckets one node's edges by edge type, so that accessors looking
+        for one kind of edge (e.g., the edge that created a node) don't
+        have to walk every edge touching the node each time they're
+        called."""
+        buckets: dict[Edge.Types, list[Edge]] = {}
+        for position, edge_id in enumerate(edge_ids):
+            edge_type = self.__edge_types[edge_id]
+            buckets.setdefault(edge_type, []).append(self.edge(edge_id))
+            positions[edge_id] = position
+        return buckets
+
+    def __edges_from_buckets(self, buckets: dict[Edge.Types, list[Edge]],
+                             edge_types: tuple[Edge.Types, ...],
+                             positions: dict[PageGraphId, int]) -> list[Edge]:
+        matching = [buckets[t] for t in edge_types if t in buckets]
+        if len(matching) == 0:
+            return []
+        if len(matching) == 1:
+            return list(matching[0])
+        return list(heapq.merge(
+            *matching, key=lambda edge: positions[edge.pg_id()]))
+
+    def __count_index_build(self, index_name: str) -> None:
+        count = self.index_build_counts.get(index_name, 0)
+        self.index_build_counts[index_name] = count + 1
+
+    def __frame_ids(self) -> dict[FrameId, DOMRootNode]:
+        if self.__frame_id_map is not None:
+            return self.__frame_id_map
+        self.__count_index_build("frame ids")
+        # We keep the most recent version of each frame.
+        frame_id_map: dict[FrameId, DOMRootNode] = {}
+        for domroot_node in self.domroot_nodes():
+            blink_id = domroot_node.blink_id()
+            if blink_id not in frame_id_map:
+                frame_id_map[blink_id] = domroot_node
+            else:
+                current_node = frame_id_map[blink_id]
+                if current_node.timestamp() < domroot_node.timestamp():
+                    frame_id_map[blink_id] = domroot_node
+        self.__frame_id_map = frame_id_map
+        return frame_id_map
+
+    def __serialization_state_map(
+            self) -> dict[PageGraphId, SerializationState]:
+        if self.__serialization_states is None:
+            self.__count_index_build("serialization states")
+            self.__serialization_states = serialization_states_for_graph(self)
+        return self.__serialization_states
+
+    def __response_hashes(self) -> dict[str, list[RequestChain]]:
+        if self.__response_hash_map is None:
+            self.__count_index_build("response hashes")
+            response_hash_map: dict[str, list[RequestChain]] = {}
+            for request_chain in self.unattributed_requests():
+                if response_hash := request_chain.hash():
+                    chains = response_hash_map.setdefault(response_hash, [])
+                    chains.append(request_chain)
+            self.__response_hash_map = response_hash_map
+        return self.__response_hash_map
+
+    def __attributes(self) -> AttributeIndex:
+        if self.__attribute_index is None:
+            self.__count_index_build("attributes")
+            self.__attribute_index = attribute_index_for_graph(self)
+        return self.__attribute_index
+
+    def __attributes_ever(self) -> AttributeIndex:
+        if self.__attribute_ever_index is None:
+            self.__count_index_build("attributes ever")
+            self.__attribute_ever_index = attribute_ever_index_for_graph(self)
+        return self.__attribute_ever_index
+
+    def __request_chains(self) -> dict[RequestId, RequestChain]:
+        if self.__request_chain_map is None:
+            self.__count_index_build("request chains")
+            self.__request_chain_map = request_chains_for_graph(self)
+        return self.__request_chain_map
+
+    def __listener_adds(
+            self) -> dict[EventListenerId, list[EventListenerAddEdge]]:
+        if self.__listener_add_edges is None:
+            self.__count_index_build("event listener adds")
+            self.__listener_add_edges = group_by_listener_id(
+                self.event_listener_add_edges())
+        return self.__listener_add_edges
+
+    def __listener_fireds(
+            self) -> dict[EventListenerId, list[EventListenerFiredEdge]]:
+        if self.__listener_fired_edges is None:
+            self.__count_index_build("event listener fireds")
+            self.__listener_fired_edges = group_by_listener_id(
+                self.event_listener_fired_edges())
+        return self.__listener_fired_edges
+
+    def __listener_removes(
+            self) -> dict[EventListenerId, list[EventListenerRemoveEdge]]:
+        if self.__listener_remove_edges is None:
+            self.__count_index_build("event listener removes")
+            self.__listener_remove_edges = group_by_listener_id(
+                self.event_listener_remove_edges())
+        return self.__listener_remove_edges
 
     def feature_check(self, feature: Feature) -> bool:
         if self.graph_version is None:
@@ -210,32 +425,38 @@ class PageGraph:
         return prefetched_requests
 
     def request_chain_for_id(self, request_id: RequestId) -> RequestChain:
+        request_chain_map = self.__request_chains()
         if self.debug:
-            if request_id not in self.__request_chain_map:
+            if request_id not in request_chain_map:
                 raise ValueError(f"Unrecognized request id: {request_id}")
-        return self.__request_chain_map[request_id]
+        return request_chain_map[request_id]
+
+    def request_chains_for_hash(self, response_hash: str) -> list[RequestChain]:
+        """Returns the request chains that ended in a response with the
+        given hash, in the same order as `unattributed_requests()`."""
+        return list(self.__response_hashes().get(response_hash, []))
 
     def event_listener_add_edges_for_id(
             self, listener_id: EventListenerId) -> list[EventListenerAddEdge]:
-        return self.__listener_add_edges[listener_id]
+        return self.__listener_adds()[listener_id]
 
     def event_listener_fired_edges_for_id(
             self, listener_id: EventListenerId) -> list[EventListenerFiredEdge]:
-        return self.__listener_fired_edges[listener_id]
+        return self.__listener_fireds()[listener_id]
 
     def event_listener_remove_edges_for_id(
             self, listener_id: EventListenerId) -> list[EventListenerRemoveEdge]:
-        return self.__listener_remove_edges[listener_id]
+        return self.__listener_removes()[listener_id]
 
     def nodes(self) -> list[Node]:
         #HNA
-        return [self.node(node_id) for node_id in self.graph.nodes()]
+        return [self.node(node_id) for node_id in self.store.node_ids()]
 
     def edges(self) -> list[Edge]:
         if len(self.__edge_cache) > 0:
             return self.__edge_cache
         edges = []
-        for u, v, edge_id in self.graph.edges:
+        for u, v, edge_id in self.store.edge_keys():
             self.__edge_id_cache[edge_id] = (u, v)
             edges.append(self.edge(edge_id))
         self.__edge_cache = edges
@@ -312,11 +533,22 @@ class PageGraph:
     def edges_of_type(self, edge_type: Edge.Types) -> list[Edge]:
         return self.__edges_by_type[edge_type]
 
+    def serialization_state(
+            self, dom_node: DOMElementNode) -> SerializationState:
+        return self.__serialization_state_map()[dom_node.pg_id()]
+
+    def frame_info(self, domroot_node: DOMRootNode) -> FrameInfo:
+        if self.__frame_infos is None:
+            self.__count_index_build("frames")
+            self.__frame_infos = {}
+        return frame_info_for_domroot(self, domroot_node, self.__frame_infos)
+
     def domroot_for_frame_id(self, frame_id: FrameId) -> DOMRootNode:
+        frame_id_map = self.__frame_ids()
         if self.debug:
-            if frame_id not in self.__frame_id_map:
+            if frame_id not in frame_id_map:
                 raise ValueError(f"frame_id not in __frame_id_map:{frame_id}")
-        return self.__frame_id_map[frame_id]
+        return frame_id_map[frame_id]
 
     def resource_nodes(self) -> list[ResourceNode]:
         node_iterator = self.nodes_of_type(Node.Types.RESOURCE)
@@ -377,27 +609,29 @@ class PageGraph:
             return None
         return self.__inserted_below_map[parent_node]
 
-    @lru_cache(maxsize=None)
     def node(self, node_id: PageGraphId) -> Node:
         """Loading any node object should come through this method, since
         this method is the one that knows what Node or Node subtype
         should be used."""
-        node_type_str = self.graph.nodes[node_id][Node.RawAttrs.TYPE.value]
+        if node := self.__node_objects.get(node_id):
+            return node
+        node_type_str = self.store.node_type_name(node_id)
         node_type = Node.Types(node_type_str)
         node = node_for_type(node_type, self, node_id)
         if dom_node := node.as_dom_element_node():
             self.__blink_id_map[dom_node.blink_id()] = dom_node
+        self.__node_objects[node_id] = node
         return node
 
-    @lru_cache(maxsize=None)
     def edge(self, edge_id: PageGraphId) -> Edge:
         """Loading any edge object should come through this method, since
         this method is the one that knows what Edge or Edge subtype
         should be used."""
+        if edge := self.__edge_objects.get(edge_id):
+            return edge
         parent_id, child_id = self.__edge_id_cache[edge_id]
         edge_key = (parent_id, child_id, edge_id)
-        edge_data = self.graph.edges[edge_key]
-        edge_type_str = edge_data[Edge.RawAttrs.TYPE.value]
+        edge_type_str = self.store.edge_type_name(edge_key)
         edge_type = Edge.Types(edge_type_str)
         edge = edge_for_type(edge_type, self, edge_id, parent_id, child_id)
 
@@ -408,6 +642,7 @@ class PageGraph:
             if parent_node not in self.__inserted_below_map:
                 self.__inserted_below_map[parent_node] = []
             self.__inserted_below_map[parent_node].append(inserted_node)
+        self.__edge_objects[edge_id] = edge
         return edge
 
     def iframe_nodes(self) -> list[FrameOwnerNode]:
@@ -419,11 +654,7 @@ class PageGraph:
 
     def get_elements_by_id(self, id_attr: str) -> list[ParentDOMElementNode]:
         """Returns all elements that had the given id at serialization."""
-        elements = []
-        for node in self.parent_dom_nodes():
-            if node.get_attribute("id") == id_attr:
-                elements.append(node)
-        return elements
+        return self.elements_with_attribute("id", id_attr)
 
     def get_elements_by_id_ever(self, id_attr: str) -> list[ParentDOMElementNode]:
         """Returns any element that ever had the given id.
@@ -431,12 +662,22 @@ class PageGraph:
         Note that this method differs from get_elements_by_id() because it'll
         include elements who had the given id at one point, but the id was
         deleted during page execution."""
-        elements = []
-        for node in self.parent_dom_nodes():
-            values_for_attr = node.get_attribute_ever("id")
-            if values_for_attr and id_attr in values_for_attr:
-                elements.append(node)
-        return elements
+        return self.elements_with_attribute_ever("id", id_attr)
+
+    def elements_with_attribute(
+            self, name: str,
+            value: Optional[JSONAble] = None) -> list[ParentDOMElementNode]:
+        """Returns all elements that had the given attribute at
+        serialization (or if `value` is given, only those where the
+        attribute had that value)."""
+        return self.__attributes().elements(name, value)
+
+    def elements_with_attribute_ever(
+            self, name: str,
+            value: Optional[JSONAble] = None) -> list[ParentDOMElementNode]:
+        """Returns all elements that ever had the given attribute (or if
+        `value` is given, ever had the attribute set to that value)."""
+        return self.__attributes_ever().elements(name, value)
 
     def toplevel_domroot_nodes(self) -> list[DOMRootNode]:
         domroot_nodes = []
@@ -450,6 +691,54 @@ class PageGraph:
             print(msg, file=sys.stderr)
 
 
-def from_path(input_path: Path, debug: bool = False) -> PageGraph:
-    pagegraph_data = load_from_path(input_path)
+def group_by_listener_id(
+        edges: list[EventListenerEdgeT]
+        ) -> dict[EventListenerId, list[EventListenerEdgeT]]:
+    edges_by_id: dict[EventListenerId, list[EventListenerEdgeT]] = {}
+    for edge in edges:
+        edges_by_id.setdefault(edge.event_listener_id(), []).append(edge)
+    return edges_by_id
+
+
+def from_path(input_path: Path, debug: bool = False,
+              store_type: Optional[StoreType] = None,
+              use_cache: Optional[bool] = None,
+              lazy_attrs: Optional[bool] = None,
+              element_types: Optional[ElementTypes] = None) -> PageGraph:
+    """Loads a PageGraph instance from a GraphML file. If no store type
+    is given, the type in the `PAGEGRAPH_STORE` environment variable
+    is used (defaulting to a networkx backed store).
+
+    If `use_cache` is true (or, if not given, the `PAGEGRAPH_CACHE`
+    environment variable is set to "1"), the graph is read from (or
+    written to) a binary snapshot next to the GraphML file. Snapshots
+    always hold a compact store, so `store_type` is ignored in that case.
+
+    If `lazy_attrs` is true (or, if not given, the `PAGEGRAPH_LAZY_ATTRS`
+    environment variable is set to "1"), large attribute values like script
+    source text are only read from the GraphML file when first accessed.
+    This has no effect when loading from a snapshot.
+
+    If `element_types` is given, only nodes and edges of those types (and
+    the nodes the kept edges connect) are loaded. This is also ignored when
+    loading from a snapshot, since snapshots always hold the whole graph."""
+    if use_cache is None:
+        use_cache = os.environ.get("PAGEGRAPH_CACHE", "") == "1"
+    if use_cache:
+        pagegraph_data = pagegraph.pgcache.load_from_path(input_path, debug)
+    else:
+        if store_type is None:
+            store_type = default_store_type()
+        if lazy_attrs is None:
+            lazy_attrs = os.environ.get("PAGEGRAPH_LAZY_ATTRS", "") == "1"
+        pagegraph_data = load_from_path(input_path, store_type, lazy_attrs,
+                                        element_types)
     return PageGraph(pagegraph_data, debug)
+
+
+def default_store_type() -> StoreType:
+    store_name = os.environ.get("PAGEGRAPH_STORE", StoreType.NETWORKX.value)
+    try:
+        return StoreType(store_name)
+    except ValueError as exc:
+        raise ValueError(f"Unknown PAGEGRAPH_STORE: {store_name}") from exc
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Optional
+
+    from pagegraph.graph import PageGraph
+    from pagegraph.graph.node.abc.parent_dom_element import ParentDOMElementNode
+    from pagegraph.serialize import JSONAble
+
+
+@dataclass
+class AttributeIndex:
+    """Maps from attribute names, and from (attribute name, value) pairs, to
+    the elements that had them. Each list of elements is in the same order
+    as `PageGraph.parent_dom_nodes()`."""
+
+    by_name: dict[str, list[ParentDOMElementNode]] = field(
+        default_factory=dict)
+    by_name_and_value: dict[
+        tuple[str, JSONAble], list[ParentDOMElementNode]] = field(
+            default_factory=dict)
+
+    def add(self, node: ParentDOMElementNode, name: str,
+            values: Iterable[JSONAble]) -> None:
+        self.by_name.setdefault(name, []).append(node)
+        for value in dict.fromkeys(values):
+            key = (name, value)
+            self.by_name_and_value.setdefault(key, []).append(node)
+
+    def elements(self, name: str,
+                 value: Optional[JSONAble] = None
+                 ) -> list[ParentDOMElementNode]:
+        if value is None:
+            return list(self.by_name.get(name, []))
+        return list(self.by_name_and_value.get((name, value), []))
+
+
+def attribute_index_for_graph(pg: PageGraph) -> AttributeIndex:
+    """Indexes each element by the attributes it had at serialization."""
+    index = AttributeIndex()
+    for node in pg.parent_dom_nodes():
+        for name, value in node.attributes().items():
+            index.add(node, name, [value])
+    return index
+
+
+def attribute_ever_index_for_graph(pg: PageGraph) -> AttributeIndex:
+    """Indexes each element by every value each of its attributes ever
+    had, including attributes that were later changed or deleted."""
+    index = AttributeIndex()
+    for node in pg.parent_dom_nodes():
+        for name, values in node.attributes_ever().items():
+            index.add(node, name, values)
+    return index
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+    from pagegraph.graph.node.abc.dom_element import DOMElementNode
+    from pagegraph.graph.node.abc.parent_dom_element import ParentDOMElementNode
+    from pagegraph.graph.node.dom_root import DOMRootNode
+    from pagegraph.types import PageGraphNodeId
+
+
+@dataclass
+class SerializationState:
+    """Where a DOM element was in the document tree when the page was
+    serialized."""
+
+    parent: Optional[ParentDOMElementNode]
+    """The element's parent at serialization, or None if the element
+    wasn't attached to a document."""
+
+    is_body_content: bool
+    """Whether some ancestor of the element, reached only through HTML
+    elements, was the <body> element."""
+
+    domroot: Optional[DOMRootNode]
+    """The closest DOMRootNode above the element, if any."""
+
+
+def serialization_states_for_graph(
+        pg: PageGraph) -> dict[PageGraphNodeId, SerializationState]:
+    """Computes the serialization state of every DOM element in the graph
+    at once, by walking down the document tree from each element that has
+    no parent at serialization. This replaces walking up the tree from
+    every element, which revisits the same ancestors over and over."""
+    parents: dict[PageGraphNodeId, Optional[ParentDOMElementNode]] = {}
+    children: dict[PageGraphNodeId, list[DOMElementNode]] = {}
+    roots: list[DOMElementNode] = []
+    for node in pg.dom_nodes():
+        parent = serialization_parent(node)
+        parents[node.pg_id()] = parent
+        if parent is None:
+            roots.append(node)
+        else:
+            children.setdefault(parent.pg_id(), []).append(node)
+
+    states: dict[PageGraphNodeId, SerializationState] = {}
+    # Each entry is an element whose state is already known, along with
+    # the values its children inherit from it: whether it is (or is below)
+    # the <body> element, and the closest DOMRootNode at or above it.
+    stack: list[tuple[DOMElementNode, bool, Optional[DOMRootNode]]] = []
+    for root in roots:
+        states[root.pg_id()] = SerializationState(None, False, None)
+        stack.append((root, *inherited_state(root, False, None)))
+
+    while stack:
+        node, in_body, domroot = stack.pop()
+        parent_node = node.as_parent_dom_element_node()
+        if parent_node is None:
+            continue
+        for child in children.get(node.pg_id(), []):
+            states[child.pg_id()] = SerializationState(
+                parent_node, in_body, domroot)
+            stack.append((child, *inherited_state(child, in_body, domroot)))
+
+    # Elements whose chain of parents loops never get reached from a root.
+    for node_id, parent in parents.items():
+        if node_id not in states:
+            states[node_id] = SerializationState(parent, False, None)
+    return states
+
+
+def serialization_parent(
+        node: DOMElementNode) -> Optional[ParentDOMElementNode]:
+    # Unlike `DOMElementNode.parent_at_serialization()`, this doesn't
+    # assert on older graphs, where a DOMRootNode's structure parent is
+    # its parser.
+    edge = node.serialization_parent_edge()
+    if edge is None:
+        return None
+    return node.pg.node(edge.incoming_node_id).as_parent_dom_element_node()
+
+
+def inherited_state(node: DOMElementNode, parent_in_body: bool,
+                    parent_domroot: Optional[DOMRootNode]
+                    ) -> tuple[bool, Optional[DOMRootNode]]:
+    in_body = False
+    if html_node := node.as_html_node():
+        in_body = html_node.tag_name() == "BODY" or parent_in_body
+    domroot = node.as_domroot_node() or parent_domroot
+    return in_body, domroot
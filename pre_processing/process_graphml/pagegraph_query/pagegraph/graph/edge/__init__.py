@@ -326,7 +326,7 @@ class Edge(PageGraphElement, ABC):
         return None
 
     def data(self) -> dict[str, str]:
-        return cast(dict[str, str], self.pg.graph.edges[self.edge_key()])
+        return cast(dict[str, str], self.pg.store.edge_data(self.edge_key()))
 
     def edge_key(self) -> PageGraphEdgeKey:
         return self.incoming_node_id, self.outgoing_node_id, self._id
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+from pagegraph.serialize import FrameReport
+from pagegraph.urls import security_origin_from_url
+from pagegraph.versions import Feature
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+    from pagegraph.graph.node.dom_root import DOMRootNode
+    from pagegraph.types import BlinkId, PageGraphNodeId, Url
+
+
+@dataclass
+class FrameInfo:
+    """Where a frame (i.e., a DOMRootNode) sits in the page's frame tree,
+    along with the values describing it in reports."""
+
+    parent_frame: Optional[DOMRootNode]
+    """The frame containing the <iframe> (or similar) element that holds
+    this frame, or None for top level frames."""
+
+    top_level_frame: DOMRootNode
+    """The top-most frame reached by following `parent_frame`."""
+
+    security_origin: Optional[Url]
+    blink_id: BlinkId
+
+    report: FrameReport
+    """Shared between every report that mentions this frame, so callers
+    must treat it as read only."""
+
+
+def frame_info_for_domroot(
+        pg: PageGraph, domroot_node: DOMRootNode,
+        infos: dict[PageGraphNodeId, FrameInfo]) -> FrameInfo:
+    """Describes the frame, and any of its ancestor frames that haven't been
+    described yet, adding each to `infos`. Frames are described the first
+    time they're needed, rather than for the whole graph up front, since
+    most reports only ever mention a handful of the frames in a page, and
+    finding a frame's parent can require walking the document tree."""
+    if (info := infos.get(domroot_node.pg_id())) is not None:
+        return info
+
+    # Collect the ancestors we haven't described yet, so that each frame
+    # is described after its parent (from whom it might inherit its
+    # security origin).
+    pending: list[tuple[DOMRootNode, Optional[DOMRootNode]]] = []
+    frame: Optional[DOMRootNode] = domroot_node
+    while frame is not None and frame.pg_id() not in infos:
+        if any(frame is pending_frame for pending_frame, _ in pending):
+            break
+        parent = frame.parent_domroot_node()
+        pending.append((frame, parent))
+        frame = parent
+
+    for frame, parent in reversed(pending):
+        parent_info = None if parent is None else infos.get(parent.pg_id())
+        infos[frame.pg_id()] = frame_info(pg, frame, parent, parent_info)
+    return infos[domroot_node.pg_id()]
+
+
+def frame_info(pg: PageGraph, domroot_node: DOMRootNode,
+               parent: Optional[DOMRootNode],
+               parent_info: Optional[FrameInfo]) -> FrameInfo:
+    if pg.feature_check(Feature.EXPLICIT_SECURITY_ORIGINS):
+        security_origin = domroot_node.recorded_security_origin()
+    else:
+        security_origin = None
+        url = domroot_node.url()
+        if url:
+            security_origin = security_origin_from_url(url)
+        if not security_origin and parent_info:
+            security_origin = parent_info.security_origin
+
+    top_level_frame = domroot_node
+    if parent_info:
+        top_level_frame = parent_info.top_level_frame
+
+    blink_id = domroot_node.blink_id()
+    report = FrameReport(domroot_node.pg_id(),
+                         domroot_node.is_top_level_domroot(),
+                         domroot_node.url(), security_origin, blink_id)
+    return FrameInfo(parent, top_level_frame, security_origin, blink_id,
+                     report)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Union
+from typing import Optional, TYPE_CHECKING, Union
 
 from pagegraph.serialize import Reportable, JSCallResultReport
 
+try:
+    import numpy  # type: ignore
+except ImportError:
+    numpy = None
+
 if TYPE_CHECKING:
     from pagegraph.graph import PageGraph
     from pagegraph.graph.edge.js_call import JSCallEdge
@@ -20,9 +25,10 @@ class JSCallResult(Reportable):
     pg: PageGraph
 
     def __init__(self, call_edge: JSCallEdge,
-                 result_edge: Union[JSResultEdge, None]):
+                 result_edge: Union[JSResultEdge, None],
+                 structure: Optional[JSStructureNode] = None):
         self.call = call_edge
-        self.structure = call_edge.outgoing_node()
+        self.structure = structure or call_edge.outgoing_node()
         self.result = result_edge
         self.pg = self.structure.pg
 
@@ -61,3 +67,72 @@ class JSCallResult(Reportable):
 
     def is_cross_frame_call(self) -> bool:
         return self.call_context() != self.receiver_context()
+
+
+def pair_calls_and_results(call_ids: list[int], result_ids: list[int]
+                           ) -> tuple[list[int], list[int]]:
+    """Matches each call to a JS builtin or Web API with the result (if any)
+    that it returned, given the ids of all the call and result edges for
+    the builtin or API.
+
+    Each result belongs to the closest call recorded before it. Returns
+    the indexes into `call_ids` ordered by id, and for each of those calls,
+    the index into `result_ids` of its result (or -1 if the call has no
+    result). Raises a ValueError if a result doesn't follow a call, or if
+    two results follow the same call.
+
+    If NumPy is installed, the edges are sorted and matched using array
+    operations, since builtins like `Date.now` can be called hundreds of
+    thousands of times in a single page."""
+    if numpy is not None:
+        return pair_calls_and_results_numpy(call_ids, result_ids)
+    return pair_calls_and_results_python(call_ids, result_ids)
+
+
+def pair_calls_and_results_numpy(call_ids: list[int], result_ids: list[int]
+                                 ) -> tuple[list[int], list[int]]:
+    calls = numpy.asarray(call_ids, dtype=numpy.int64)
+    results = numpy.asarray(result_ids, dtype=numpy.int64)
+    call_order = numpy.argsort(calls, kind="stable")
+    result_order = numpy.argsort(results, kind="stable")
+    sorted_results = results[result_order]
+
+    # The position (among the sorted calls) of the call before each result.
+    owners = numpy.searchsorted(calls[call_order], sorted_results) - 1
+    if len(owners) > 0 and owners[0] < 0:
+        raise ValueError(
+            f"Found result edge e{sorted_results[0]} before any call")
+    repeats = numpy.flatnonzero(owners[1:] == owners[:-1])
+    if len(repeats) > 0:
+        index = repeats[0]
+        raise ValueError("Found two adjacent result edges: "
+                         f"e{sorted_results[index]} and "
+                         f"e{sorted_results[index + 1]}")
+
+    result_for_call = numpy.full(len(call_ids), -1, dtype=numpy.int64)
+    result_for_call[owners] = result_order
+    return call_order.tolist(), result_for_call.tolist()
+
+
+def pair_calls_and_results_python(call_ids: list[int], result_ids: list[int]
+                                  ) -> tuple[list[int], list[int]]:
+    call_order = sorted(range(len(call_ids)), key=call_ids.__getitem__)
+    result_order = sorted(range(len(result_ids)), key=result_ids.__getitem__)
+
+    result_for_call = [-1] * len(call_ids)
+    owner = -1
+    last_owner = -1
+    for result_index in result_order:
+        result_id = result_ids[result_index]
+        while (owner + 1 < len(call_order) and
+               call_ids[call_order[owner + 1]] < result_id):
+            owner += 1
+        if owner < 0:
+            raise ValueError(f"Found result edge e{result_id} before any call")
+        if owner == last_owner:
+            previous_id = result_ids[result_for_call[owner]]
+            raise ValueError("Found two adjacent result edges: "
+                             f"e{previous_id} and e{result_id}")
+        result_for_call[owner] = result_index
+        last_owner = owner
+    return call_order, result_for_call
@@ -109,24 +109,30 @@ class Node(PageGraphElement, ABC):
         return Node.Types(self.type_name())
 
     def child_nodes(self) -> list[Node]:
-        return cast(list["Node"], list(self.pg.graph.adj[self._id].items()))
+        node_ids = self.pg.store.successor_ids(self._id)
+        return [self.pg.node(node_id) for node_id in node_ids]
 
     def parent_nodes(self) -> list[Node]:
-        return cast(list["Node"], list(self.pg.r_graph.adj[self._id].items()))
+        node_ids = self.pg.store.predecessor_ids(self._id)
+        return [self.pg.node(node_id) for node_id in node_ids]
 
     def outgoing_edges(self) -> Iterable[Edge]:
-        edges = []
-        for _, edge_info in self.pg.graph.adj[self._id].items():
-            for edge_id, _ in edge_info.items():
-                edges.append(self.pg.edge(edge_id))
-        return edges
+        edge_ids = self.pg.store.out_edge_ids(self._id)
+        return [self.pg.edge(edge_id) for edge_id in edge_ids]
 
     def incoming_edges(self) -> Iterable[Edge]:
-        edges: list[Edge] = []
-        for _, edge_info in self.pg.r_graph.adj[self._id].items():
-            for edge_id, _ in edge_info.items():
-                edges.append(self.pg.edge(edge_id))
-        return edges
+        edge_ids = self.pg.store.in_edge_ids(self._id)
+        return [self.pg.edge(edge_id) for edge_id in edge_ids]
+
+    def outgoing_edges_of_type(self, *edge_types: Edge.Types) -> list[Edge]:
+        """Returns only the outgoing edges with one of the given types,
+        in the same order as `outgoing_edges()`."""
+        return self.pg.outgoing_edges_of_type(self._id, *edge_types)
+
+    def incoming_edges_of_type(self, *edge_types: Edge.Types) -> list[Edge]:
+        """Returns only the incoming edges with one of the given types,
+        in the same order as `incoming_edges()`."""
+        return self.pg.incoming_edges_of_type(self._id, *edge_types)
 
     def to_node_report(
             self, depth: int = 0,
@@ -256,10 +262,7 @@ class Node(PageGraphElement, ABC):
         return None
 
     def is_toplevel_parser(self) -> bool:
-        for incoming_edge in self.incoming_edges():
-            if incoming_edge.as_cross_dom_edge() is not None:
-                return False
-        return True
+        return len(self.incoming_edges_of_type(Edge.Types.CROSS_DOM)) == 0
 
     def frame_owner_nodes(self) -> list[FrameOwnerNode]:
         frame_owner_nodes = []
@@ -269,19 +272,17 @@ class Node(PageGraphElement, ABC):
         return frame_owner_nodes
 
     def data(self) -> dict[str, str]:
-        return cast(dict[str, str], self.pg.graph.nodes[self._id])
+        return cast(dict[str, str], self.pg.store.node_data(self._id))
 
     def creation_edge(self) -> Optional[NodeCreateEdge]:
-        for edge in self.incoming_edges():
-            if create_edge := edge.as_create_edge():
-                return create_edge
+        for edge in self.incoming_edges_of_type(Edge.Types.NODE_CREATE):
+            return edge.as_create_edge()
         return None
 
     def created_nodes(self) -> list[Node]:
         created_nodes = []
-        for edge in self.outgoing_edges():
-            if edge.as_create_edge() is not None:
-                created_nodes.append(edge.outgoing_node())
+        for edge in self.outgoing_edges_of_type(Edge.Types.NODE_CREATE):
+            created_nodes.append(edge.outgoing_node())
         return created_nodes
 
     def describe(self) -> str:
@@ -336,9 +337,8 @@ class Node(PageGraphElement, ABC):
 
 
     def creator_edge(self) -> Optional[NodeCreateEdge]:
-        for edge in self.incoming_edges():
-            if create_edge := edge.as_create_edge():
-                return create_edge
+        for edge in self.incoming_edges_of_type(Edge.Types.NODE_CREATE):
+            return edge.as_create_edge()
         self.throw("Could not find a creation edge for this node")
         return None
 
@@ -352,10 +352,10 @@ class Node(PageGraphElement, ABC):
         for _ in range(depth):
             neighbors: set[PageGraphId] = set()
             for node_id in node_ids:
-                neighbors.update(self.pg.graph.neighbors(node_id))
+                neighbors.update(self.pg.store.successor_ids(node_id))
             node_ids.update(neighbors)
 
-        return self.pg.graph.subgraph(node_ids)
+        return self.pg.store.subgraph(node_ids)
 
 
 def node_type_from_networkx_node_data(node_data: dict[str, Any]) -> Node.Types:
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import Optional, TYPE_CHECKING
+from typing import cast, Optional, TYPE_CHECKING
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.element import sort_elements
 from pagegraph.graph.node import Node
 from pagegraph.versions import Feature
@@ -33,11 +34,8 @@ class DOMElementNode(Node, ABC):
         raise NotImplementedError()
 
     def insertion_edges(self) -> list[NodeInsertEdge]:
-        insertion_edges: list[NodeInsertEdge] = []
-        for edge in self.incoming_edges():
-            if insert_edge := edge.as_insert_edge():
-                insertion_edges.append(insert_edge)
-        return sort_elements(insertion_edges)
+        edges = self.incoming_edges_of_type(Edge.Types.NODE_INSERT)
+        return sort_elements(cast(list["NodeInsertEdge"], edges))
 
     def insert_edge(self) -> Optional[NodeInsertEdge]:
         """Return the most recent edge describing when this element
@@ -51,44 +49,36 @@ class DOMElementNode(Node, ABC):
     def is_body_content(self) -> bool:
         # Returns True if the element was both 1. in the document
         # at serialization time, and 2. was a child of the <body> element.
-        parent_node = self.parent_at_serialization()
-        if not parent_node:
-            return False
-        needle_node: Optional[ParentDOMElementNode] = parent_node
-        while needle_node is not None:
-            needle_html_node = needle_node.as_html_node()
-            if not needle_html_node:
-                return False
-            if needle_html_node.tag_name() == "BODY":
-                return True
-            needle_node = needle_html_node.parent_at_serialization()
-        return False
+        return self.pg.serialization_state(self).is_body_content
 
     def is_present_at_serialization(self) -> bool:
-        parent_node_at_serialization = self.parent_at_serialization()
-        return parent_node_at_serialization is not None
+        return self.pg.serialization_state(self).parent is not None
 
-    def parent_at_serialization(self) -> Optional[ParentDOMElementNode]:
+    def serialization_parent_edge(self) -> Optional[Edge]:
+        """Returns the edge recording this element's parent when the page
+        was serialized (a document edge, or in older graphs, a structure
+        edge), if there is one."""
         if self.pg.feature_check(Feature.DOCUMENT_EDGES):
-            for edge in self.incoming_edges():
-                if document_edge := edge.as_document_edge():
-                    return document_edge.incoming_node()
+            edge_type = Edge.Types.DOCUMENT
         else:
-            for edge in self.incoming_edges():
-                structure_edge = edge.as_structure_edge()
-                if not structure_edge:
-                    continue
-                incoming_node = structure_edge.incoming_node()
-                parent_node = incoming_node.as_parent_dom_element_node()
-                assert parent_node
-                return parent_node
+            edge_type = Edge.Types.STRUCTURE
+        for edge in self.incoming_edges_of_type(edge_type):
+            return edge
         return None
 
+    def parent_at_serialization(self) -> Optional[ParentDOMElementNode]:
+        edge = self.serialization_parent_edge()
+        if edge is None:
+            return None
+        parent_node = edge.incoming_node().as_parent_dom_element_node()
+        assert parent_node
+        return parent_node
+
     def creation_edge(self) -> NodeCreateEdge:
         creation_edge = None
-        for edge in self.incoming_edges():
-            if creation_edge := edge.as_create_edge():
-                break
+        for edge in self.incoming_edges_of_type(Edge.Types.NODE_CREATE):
+            creation_edge = edge.as_create_edge()
+            break
         assert creation_edge
         return creation_edge
 
@@ -144,11 +134,9 @@ class DOMElementNode(Node, ABC):
         and could differ from the domroot of the context the element
         was created in (if this element was moved between documents
         during page execution)."""
-        current_node = self.parent_at_serialization()
-        while current_node:
-            if domroot_node := current_node.as_domroot_node():
-                return domroot_node
-            current_node = current_node.parent_at_serialization()
+        domroot_node = self.pg.serialization_state(self).domroot
+        if domroot_node:
+            return domroot_node
 
         parent_node_from_structure = self.domroot_from_parent_node_path()
         if parent_node_from_structure:
@@ -161,16 +149,18 @@ class DOMElementNode(Node, ABC):
         document), or more than one node (if the node was moved around the
         document during execution)."""
         parent_html_nodes = []
-        for edge in self.incoming_edges():
-            if insert_edge := edge.as_insert_edge():
-                parent_html_nodes.append(insert_edge.inserted_below_node())
+        for edge in self.incoming_edges_of_type(Edge.Types.NODE_INSERT):
+            insert_edge = edge.as_insert_edge()
+            assert insert_edge
+            parent_html_nodes.append(insert_edge.inserted_below_node())
         return parent_html_nodes
 
     def requests(self) -> list[RequestChain]:
         chains: list[RequestChain] = []
-        for outgoing_edge in self.outgoing_edges():
-            if request_start_edge := outgoing_edge.as_request_start_edge():
-                request_id = request_start_edge.request_id()
-                request_chain = self.pg.request_chain_for_id(request_id)
-                chains.append(request_chain)
+        for edge in self.outgoing_edges_of_type(Edge.Types.REQUEST_START):
+            request_start_edge = edge.as_request_start_edge()
+            assert request_start_edge
+            request_id = request_start_edge.request_id()
+            request_chain = self.pg.request_chain_for_id(request_id)
+            chains.append(request_chain)
         return chains
@@ -3,20 +3,38 @@ from __future__ import annotations
 from abc import ABC
 from typing import TYPE_CHECKING
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.node.abc.dom_element import DOMElementNode
 
 if TYPE_CHECKING:
     from typing import Optional
+
+    from pagegraph.graph import PageGraph
     from pagegraph.serialize import JSONAble
+    from pagegraph.types import PageGraphId
 
 
 class ParentDOMElementNode(DOMElementNode, ABC):
 
+    # Instance properties
+
+    # The attributes this element had at serialization, and every value each
+    # attribute ever had. Each is built the first time it's asked for, since
+    # it means replaying all the attribute edges for the element.
+    __attributes: Optional[dict[str, JSONAble]]
+    __attributes_ever: Optional[dict[str, list[JSONAble]]]
+
+    def __init__(self, graph: PageGraph, pg_id: PageGraphId):
+        self.__attributes = None
+        self.__attributes_ever = None
+        super().__init__(graph, pg_id)
+
 
 
     def validate(self) -> None:
         summary: dict[str, JSONAble] = {}
-        incoming_edges = list(self.incoming_edges())
+        incoming_edges = self.incoming_edges_of_type(
+            Edge.Types.ATTRIBUTE_SET, Edge.Types.ATTRIBUTE_DELETE)
         incoming_edges.sort(key=lambda x: x.id())
         for edge in incoming_edges:
             if set_attr_edge := edge.as_attribute_set_edge():
@@ -43,8 +61,14 @@ class ParentDOMElementNode(DOMElementNode, ABC):
         return self.data()[self.RawAttrs.TAG.value]
 
     def attributes(self) -> dict[str, JSONAble]:
+        if self.__attributes is None:
+            self.__attributes = self.__replay_attributes()
+        return dict(self.__attributes)
+
+    def __replay_attributes(self) -> dict[str, JSONAble]:
         summary: dict[str, JSONAble] = {}
-        incoming_edges = list(self.incoming_edges())
+        incoming_edges = self.incoming_edges_of_type(
+            Edge.Types.ATTRIBUTE_SET, Edge.Types.ATTRIBUTE_DELETE)
         incoming_edges.sort(key=lambda x: x.id())
         for edge in incoming_edges:
             if set_attr_edge := edge.as_attribute_set_edge():
@@ -62,8 +86,14 @@ class ParentDOMElementNode(DOMElementNode, ABC):
         return summary
 
     def attributes_ever(self) -> dict[str, list[JSONAble]]:
+        if self.__attributes_ever is None:
+            self.__attributes_ever = self.__replay_attributes_ever()
+        return {name: list(values)
+                for name, values in self.__attributes_ever.items()}
+
+    def __replay_attributes_ever(self) -> dict[str, list[JSONAble]]:
         summary: dict[str, list[JSONAble]] = {}
-        incoming_edges = list(self.incoming_edges())
+        incoming_edges = self.incoming_edges_of_type(Edge.Types.ATTRIBUTE_SET)
         incoming_edges.sort(key=lambda x: x.id())
         for edge in incoming_edges:
             if set_attr_edge := edge.as_attribute_set_edge():
@@ -77,7 +107,12 @@ class ParentDOMElementNode(DOMElementNode, ABC):
         return summary
 
     def get_attribute(self, attr_name: str) -> Optional[JSONAble]:
-        return self.attributes().get(attr_name)
+        if self.__attributes is None:
+            self.__attributes = self.__replay_attributes()
+        return self.__attributes.get(attr_name)
 
     def get_attribute_ever(self, attr_name: str) -> Optional[list[JSONAble]]:
-        return self.attributes_ever().get(attr_name)
+        if self.__attributes_ever is None:
+            self.__attributes_ever = self.__replay_attributes_ever()
+        values = self.__attributes_ever.get(attr_name)
+        return None if values is None else list(values)
@@ -50,9 +50,10 @@ class ScriptNode(Node, ABC):
 
     def execute_edge(self) -> Optional[ExecuteEdge]:
         execute_edge = None
-        for edge in self.incoming_edges():
-            if execute_edge := edge.as_execute_edge():
-                break
+        for edge in self.incoming_edges_of_type(
+                Edge.Types.EXECUTE, Edge.Types.EXECUTE_FROM_ATTRIBUTE):
+            execute_edge = edge.as_execute_edge()
+            break
         if self.pg.debug:
             if not execute_edge:
                 self.throw("Could not find execution edge for script")
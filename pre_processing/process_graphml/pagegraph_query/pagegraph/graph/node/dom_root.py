@@ -3,9 +3,10 @@ from __future__ import annotations
 from enum import Enum
 from typing import Callable, Optional, TYPE_CHECKING, TypeVar
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.node.abc.dom_element import DOMElementNode
 from pagegraph.graph.node.abc.parent_dom_element import ParentDOMElementNode
-from pagegraph.serialize import Reportable, FrameReport
+from pagegraph.serialize import Reportable
 from pagegraph.urls import is_url_local, is_security_origin_inheriting_url
 from pagegraph.urls import security_origin_from_url
 from pagegraph.versions import Feature, exception_for_feature
@@ -14,6 +15,7 @@ if TYPE_CHECKING:
     from pagegraph.graph.node.frame_owner import FrameOwnerNode
     from pagegraph.graph.node.parser import ParserNode
     from pagegraph.graph.node.script_local import ScriptLocalNode
+    from pagegraph.serialize import FrameReport
     from pagegraph.types import Url, FrameId
 
 
@@ -46,7 +48,7 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
         this validation step will only be taken on graphs recent enough
         to include the security origin as an attribute)."""
         if self.pg.feature_check(Feature.EXPLICIT_SECURITY_ORIGINS):
-            explicit_security_origin = self.__security_origin()
+            explicit_security_origin = self.recorded_security_origin()
             calculated_security_origin = self.__calculate_security_origin()
             if explicit_security_origin != calculated_security_origin:
                 self.throw(
@@ -60,7 +62,7 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
 
     def frame_owner_node(self) -> Optional[FrameOwnerNode]:
         if self.pg.feature_check(Feature.CROSS_DOM_EDGES_POINT_TO_DOM_ROOTS):
-            for edge in self.incoming_edges():
+            for edge in self.incoming_edges_of_type(Edge.Types.CROSS_DOM):
                 if cross_dom_edge := edge.as_cross_dom_edge():
                     return cross_dom_edge.incoming_node()
         else:
@@ -77,14 +79,10 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
         # <iframe> tag
         if self.url() != "about:blank":
             return False
-        for edge in self.incoming_edges():
-            if edge.as_structure_edge() is not None:
-                return True
-        return False
+        return len(self.incoming_edges_of_type(Edge.Types.STRUCTURE)) > 0
 
     def to_report(self) -> FrameReport:
-        return FrameReport(self.pg_id(), self.is_top_level_domroot(),
-                           self.url(), self.security_origin(), self.blink_id())
+        return self.pg.frame_info(self).report
 
     def __calculate_security_origin(self) -> Optional[Url]:
         """Calculates the security origin of the frame based on graph structure.
@@ -103,7 +101,7 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
             return parent_domroot_node.security_origin()
         return None
 
-    def __security_origin(self) -> Optional[Url]:
+    def recorded_security_origin(self) -> Optional[Url]:
         """Returns the security origin of the frame.
 
         This method returns the value for the "security origin" attribute from
@@ -125,16 +123,12 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
 
         # In more recent versions of PageGraph recordings, the security
         # origin of the frame is explicitly recorded in the graph, and so
-        # doesn't require any calculation.
-        if self.pg.feature_check(Feature.EXPLICIT_SECURITY_ORIGINS):
-            return self.__security_origin()
-        return self.__calculate_security_origin()
+        # doesn't require any calculation. Either way, it's worked out
+        # once per graph, along with the rest of the frame tree.
+        return self.pg.frame_info(self).security_origin
 
     def is_top_level_domroot(self) -> bool:
-        for edge in self.incoming_edges():
-            if edge.as_cross_dom_edge() is not None:
-                return False
-        return True
+        return len(self.incoming_edges_of_type(Edge.Types.CROSS_DOM)) == 0
 
     def is_security_origin_inheriting(self) -> bool:
         """Returns true if the frame inherits its security origin.
@@ -163,6 +157,9 @@ class DOMRootNode(ParentDOMElementNode, Reportable):
         assert parent_frame_url
         return is_url_local(this_frame_url, parent_frame_url)
 
+    def top_level_domroot_node(self) -> DOMRootNode:
+        return self.pg.frame_info(self).top_level_frame
+
     def parent_domroot_node(self) -> Optional[DOMRootNode]:
         frame_owner_node = self.frame_owner_node()
         if not frame_owner_node:
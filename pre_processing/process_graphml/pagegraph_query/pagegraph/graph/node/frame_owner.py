@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Optional, TYPE_CHECKING
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.node.abc.parent_dom_element import ParentDOMElementNode
 from pagegraph.serialize import Reportable, DOMElementReport
 from pagegraph.urls import are_urls_same_site
@@ -31,11 +32,10 @@ class FrameOwnerNode(ParentDOMElementNode, Reportable):
     def child_domroot_nodes(self) -> list[DOMRootNode]:
         domroots = []
         if self.pg.feature_check(Feature.CROSS_DOM_EDGES_POINT_TO_DOM_ROOTS):
-            for edge in self.outgoing_edges():
-                if cross_dom_edge := edge.as_cross_dom_edge():
-                    node = cross_dom_edge.outgoing_node().as_domroot_node()
-                    assert node
-                    domroots.append(node)
+            for edge in self.outgoing_edges_of_type(Edge.Types.CROSS_DOM):
+                node = edge.outgoing_node().as_domroot_node()
+                assert node
+                domroots.append(node)
         else:
             for parser_node in self.child_parser_nodes():
                 nodes = list(parser_node.domroots())
@@ -70,9 +70,8 @@ class FrameOwnerNode(ParentDOMElementNode, Reportable):
         """Returns the last domroot node that was executed in this frame
         owner."""
         domroot_nodes: list[DOMRootNode] = []
-        for edge in self.outgoing_edges():
-            if cross_dom_edge := edge.as_cross_dom_edge():
-                outgoing_node = cross_dom_edge.outgoing_node()
-                if domroot_node := outgoing_node.as_domroot_node():
-                    domroot_nodes.append(domroot_node)
+        for edge in self.outgoing_edges_of_type(Edge.Types.CROSS_DOM):
+            outgoing_node = edge.outgoing_node()
+            if domroot_node := outgoing_node.as_domroot_node():
+                domroot_nodes.append(domroot_node)
         return sorted(domroot_nodes, key=lambda x: x.id())[-1]
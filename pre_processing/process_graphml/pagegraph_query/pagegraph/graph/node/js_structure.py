@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 from typing import cast, Optional, TYPE_CHECKING
-from itertools import chain
 
 from pagegraph.graph.node import Node
 from pagegraph.serialize import Reportable
-from pagegraph.graph.js import JSCallResult
+from pagegraph.graph.js import JSCallResult, pair_calls_and_results
 from pagegraph.serialize import JSStructureReport
 
 if TYPE_CHECKING:
@@ -18,8 +17,11 @@ class JSStructureNode(Node, Reportable):
 
     def __init__(self, graph: PageGraph, pg_id: PageGraphId) -> None:
         super().__init__(graph, pg_id)
-        self.__cached_call_map: dict[JSCallEdge, JSCallResult] = {}
-        
+        self.__call_edge_ids: Optional[list[PageGraphId]] = None
+        self.__result_edge_ids: list[Optional[PageGraphId]] = []
+        self.__call_positions: dict[PageGraphId, int] = {}
+        self.__cached_call_results: list[Optional[JSCallResult]] = []
+
     def to_report(self) -> JSStructureReport:
         return JSStructureReport(self.name(), self.type_name())
 
@@ -29,49 +31,83 @@ class JSStructureNode(Node, Reportable):
     def name(self) -> str:
         return self.data()[self.RawAttrs.METHOD.value]
 
-    def build_caches(self) -> None:
-        js_calls = self.incoming_edges()
-        js_results = self.outgoing_edges()
-        calls_and_results_unsorted = list(chain(js_calls, js_results))
-        calls_and_results = sorted(
-            calls_and_results_unsorted, key=lambda x: x.id())
+    def validate(self) -> None:
+        self.__pair_calls_and_results()
+        super().validate()
+
+    def __pair_calls_and_results(self) -> list[PageGraphId]:
+        """Matches each call to this builtin with the result it returned
+        (if any) the first time the calls are needed. Only edge ids are
+        matched here; the `JSCallResult` for each call is built when it's
+        asked for."""
+        if self.__call_edge_ids is not None:
+            return self.__call_edge_ids
 
+        # Every edge into a builtin is a call, and every edge out of one
+        # is a result.
+        call_ids = self.pg.store.in_edge_ids(self._id)
+        result_ids = self.pg.store.out_edge_ids(self._id)
         if self.pg.debug:
-            num_calls = len(list(js_calls))
-            num_results = len(list(js_results))
+            num_calls = len(call_ids)
+            num_results = len(result_ids)
             if num_results > num_calls:
                 self.throw("Found more results than calls to this builtin, "
-                            f"calls={num_calls}, results={num_results}")
-
-        last_edge = calls_and_results[0]
-        for edge in calls_and_results[1:]:
-            if edge.as_js_result_edge() is not None:
-                if last_edge.as_js_result_edge() is not None:
-                    self.throw("Found two adjacent result edges: "
-                                f"{last_edge.pg_id()} and {edge.pg_id()}")
-            last_edge = edge
-
-        last_call_result = None
-        for edge in calls_and_results:
-            if js_call_edge := edge.as_js_call_edge():
-                a_call_result = JSCallResult(js_call_edge, None)
-                last_call_result = a_call_result
-                self.__cached_call_map[js_call_edge] = a_call_result
-            elif js_result_edge := edge.as_js_result_edge():
-                assert last_call_result
-                last_call_result.result = js_result_edge
-                last_call_result = None
-        super().build_caches()
+                           f"calls={num_calls}, results={num_results}")
+
+        try:
+            call_order, result_for_call = pair_calls_and_results(
+                [int(edge_id[1:]) for edge_id in call_ids],
+                [int(edge_id[1:]) for edge_id in result_ids])
+        except ValueError as exc:
+            self.throw(str(exc), exc)
+
+        call_edge_ids = [call_ids[index] for index in call_order]
+        self.__result_edge_ids = [
+            result_ids[index] if index >= 0 else None
+            for index in result_for_call]
+        self.__call_positions = {
+            edge_id: position for position, edge_id in enumerate(call_edge_ids)}
+        self.__cached_call_results = [None] * len(call_edge_ids)
+        self.__call_edge_ids = call_edge_ids
+        return call_edge_ids
+
+    def __call_result_at(self, position: int,
+                         js_call_edge: Optional[JSCallEdge] = None
+                         ) -> JSCallResult:
+        if call_result := self.__cached_call_results[position]:
+            return call_result
+        if js_call_edge is None:
+            assert self.__call_edge_ids is not None
+            call_edge = self.pg.edge(self.__call_edge_ids[position])
+            js_call_edge = call_edge.as_js_call_edge()
+            assert js_call_edge
+        js_result_edge = None
+        if result_edge_id := self.__result_edge_ids[position]:
+            js_result_edge = self.pg.edge(result_edge_id).as_js_result_edge()
+            assert js_result_edge
+        call_result = JSCallResult(js_call_edge, js_result_edge, self)
+        self.__cached_call_results[position] = call_result
+        return call_result
+
+    def call_edges(self) -> list[JSCallEdge]:
+        """Returns the calls to this builtin, ordered by id, without building
+        a `JSCallResult` for each."""
+        call_edge_ids = self.__pair_calls_and_results()
+        return cast(list["JSCallEdge"],
+                    [self.pg.edge(edge_id) for edge_id in call_edge_ids])
 
     def call_results(self) -> list[JSCallResult]:
-        return list(self.__cached_call_map.values())
+        call_edge_ids = self.__pair_calls_and_results()
+        return [self.__call_result_at(i) for i in range(len(call_edge_ids))]
 
     def call_result(self, edge: JSCallEdge) -> JSCallResult:
+        self.__pair_calls_and_results()
         try:
-            return self.__cached_call_map[edge]
+            position = self.__call_positions[edge.pg_id()]
         except KeyError as exc:
             msg = f"Unable to find call {edge}"
             raise ValueError(msg) from exc
+        return self.__call_result_at(position, edge)
 
     def incoming_edges(self) -> list[JSCallEdge]:
         return cast(list["JSCallEdge"], super().incoming_edges())
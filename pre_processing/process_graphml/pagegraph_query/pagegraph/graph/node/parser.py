@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Optional, TYPE_CHECKING
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.node import Node
 from pagegraph.graph.node.dom_root import DOMRootNode
 
@@ -35,17 +36,15 @@ class ParserNode(Node):
 
     def created_nodes(self) -> list[Node]:
         created_nodes = []
-        for edge in self.outgoing_edges():
-            if create_edge := edge.as_create_edge():
-                created_nodes.append(create_edge.outgoing_node())
+        for edge in self.outgoing_edges_of_type(Edge.Types.NODE_CREATE):
+            created_nodes.append(edge.outgoing_node())
         return created_nodes
 
     def domroots(self) -> list[DOMRootNode]:
         domroots = []
         already_returned = set()
-        for e in self.outgoing_edges():
-            if (e.as_create_edge() is None and e.as_structure_edge() is None):
-                continue
+        for e in self.outgoing_edges_of_type(
+                Edge.Types.NODE_CREATE, Edge.Types.STRUCTURE):
             child_node = e.outgoing_node()
             if child_node in already_returned:
                 continue
@@ -6,11 +6,8 @@ from pagegraph.graph.edge import Edge
 from pagegraph.graph.node import Node
 
 if TYPE_CHECKING:
-    from pagegraph.graph import PageGraph
-    from pagegraph.graph.edge.abc.request import RequestEdge
     from pagegraph.graph.edge.request_start import RequestStartEdge
-    from pagegraph.types import RequesterNode, Url, PageGraphId, RequestId
-    from pagegraph.types import RequestIncoming, RequestOutgoing
+    from pagegraph.types import RequesterNode, Url, RequestOutgoing
 
 
 class ResourceNode(Node):
@@ -34,13 +31,6 @@ class ResourceNode(Node):
         "url": "url"
     }
 
-    # Instance properties
-    requests_map: dict[RequestId, list[RequestOutgoing]]
-
-    def __init__(self, graph: PageGraph, pg_id: PageGraphId):
-        self.requests_map = {}
-        super().__init__(graph, pg_id)
-
     def as_resource_node(self) -> Optional[ResourceNode]:
         return self
 
@@ -67,28 +57,11 @@ class ResourceNode(Node):
             requesters.append(edge.incoming_node())
         return requesters
 
-    def build_caches(self) -> None:
+    def validate(self) -> None:
+        request_ids = set()
         for incoming_edge in self.incoming_edges():
-            request_id = incoming_edge.request_id()
-            if request_id not in self.requests_map:
-                self.requests_map[request_id] = []
-
+            request_ids.add(incoming_edge.request_id())
         for outgoing_edge in self.outgoing_edges():
-            request_id = outgoing_edge.request_id()
-            if self.pg.debug:
-                if request_id not in self.requests_map:
-                    self.throw("Response without request for resource")
-            self.requests_map[request_id].append(outgoing_edge)
-        super().build_caches()
-
-    def next_response_for_id(
-            self, request_id: RequestId,
-            prev_requests: set[RequestEdge]) -> Optional[RequestOutgoing]:
-        if self.pg.debug:
-            if request_id not in self.requests_map:
-                self.throw("Unexpected request id")
-        outgoing_responses = self.requests_map[request_id]
-        for a_response in outgoing_responses:
-            if a_response not in prev_requests:
-                return a_response
-        return None
+            if outgoing_edge.request_id() not in request_ids:
+                self.throw("Response without request for resource")
+        super().validate()
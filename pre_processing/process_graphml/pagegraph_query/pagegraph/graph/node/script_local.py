@@ -5,18 +5,20 @@ from enum import Enum
 import hashlib
 from typing import Union, Optional, TYPE_CHECKING
 
+from pagegraph.graph.edge import Edge
 from pagegraph.graph.node import Node
 from pagegraph.graph.node.abc.script import ScriptNode
 from pagegraph.serialize import Reportable, ScriptReport
 from pagegraph.types import ResourceType
 
 if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
     from pagegraph.graph.edge.execute import ExecuteEdge
     from pagegraph.graph.js import JSCallResult
     from pagegraph.graph.node.abc.parent_dom_element import ParentDOMElementNode
     from pagegraph.graph.node.dom_root import DOMRootNode
     from pagegraph.graph.requests import RequestChain
-    from pagegraph.types import Url, ActorNode
+    from pagegraph.types import Url, ActorNode, PageGraphId
     from pagegraph.types import ScriptExecutorNode
     from pagegraph.serialize import DOMElementReport
 
@@ -44,25 +46,34 @@ class ScriptLocalNode(ScriptNode, Reportable):
         MODULE = "module"
         UNKNOWN = "unknown"
 
+    # Instance properties
+
+    # Hash of the script's source, computed the first time it's asked for.
+    __source_hash: Optional[str]
+
+    def __init__(self, graph: PageGraph, pg_id: PageGraphId):
+        self.__source_hash = None
+        super().__init__(graph, pg_id)
+
     def as_script_local_node(self) -> Optional[ScriptLocalNode]:
         return self
 
     def created_nodes(self) -> list[Node]:
         created_nodes = []
-        for edge in self.outgoing_edges():
-            if create_edge := edge.as_create_edge():
-                created_nodes.append(create_edge.outgoing_node())
+        for edge in self.outgoing_edges_of_type(Edge.Types.NODE_CREATE):
+            created_nodes.append(edge.outgoing_node())
         return created_nodes
 
     def calls(self, method_name: Optional[str] = None) -> list[JSCallResult]:
         js_call_results = []
-        for edge in self.outgoing_edges():
-            if js_call_edge := edge.as_js_call_edge():
-                if method_name is not None:
-                    if js_call_edge.outgoing_node().name() != method_name:
-                        continue
-                call_result = js_call_edge.call_result()
-                js_call_results.append(call_result)
+        for edge in self.outgoing_edges_of_type(Edge.Types.JS_CALL):
+            js_call_edge = edge.as_js_call_edge()
+            assert js_call_edge
+            if method_name is not None:
+                if js_call_edge.outgoing_node().name() != method_name:
+                    continue
+            call_result = js_call_edge.call_result()
+            js_call_results.append(call_result)
         return js_call_results
 
     def script_type(self) -> ScriptLocalNode.ScriptType:
@@ -129,9 +140,11 @@ class ScriptLocalNode(ScriptNode, Reportable):
             return ""
 
     def hash(self) -> str:
-        hasher = hashlib.new("sha256")
-        hasher.update(self.source().encode("utf8"))
-        return b64encode(hasher.digest()).decode("utf8")
+        if self.__source_hash is None:
+            hasher = hashlib.new("sha256")
+            hasher.update(self.source().encode("utf8"))
+            self.__source_hash = b64encode(hasher.digest()).decode("utf8")
+        return self.__source_hash
 
     def url_if_external(self) -> Optional["Url"]:
         if self.script_type() != self.__class__.ScriptType.EXTERNAL:
@@ -162,10 +175,8 @@ class ScriptLocalNode(ScriptNode, Reportable):
         executing_node = incoming_node.as_html_node()
         assert executing_node
         # Test for requirement 3 above
-        execution_edges = []
-        for outgoing_edge in executing_node.outgoing_edges():
-            if execution_edge := outgoing_edge.as_execute_edge():
-                execution_edges.append(execution_edge)
+        execution_edges = executing_node.outgoing_edges_of_type(
+            Edge.Types.EXECUTE, Edge.Types.EXECUTE_FROM_ATTRIBUTE)
 
         # A little odd to use a `while` statement here, since we'll
         # never loop, but just done so we can easily jump out of the
@@ -229,12 +240,10 @@ class ScriptLocalNode(ScriptNode, Reportable):
         return None
 
     def matching_unattributed_request(self) -> Optional[RequestChain]:
-        script_hash = self.hash()
-        unattributed_requests = self.pg.unattributed_requests()
-        for request_chain in unattributed_requests:
-            if request_chain.hash() == script_hash:
-                return request_chain
-        return None
+        request_chains = self.pg.request_chains_for_hash(self.hash())
+        if len(request_chains) == 0:
+            return None
+        return request_chains[0]
 
     def execution_context_in(self) -> DOMRootNode:
         exc_edge = self.execute_edge()
@@ -16,7 +16,8 @@ if TYPE_CHECKING:
     from pagegraph.graph.edge.request_error import RequestErrorEdge
     from pagegraph.graph.edge.request_redirect import RequestRedirectEdge
     from pagegraph.graph.edge.request_start import RequestStartEdge
-    from pagegraph.types import RequestId, RequestHeaders, Url, ResourceType
+    from pagegraph.types import PageGraphNodeId, RequestId, RequestHeaders
+    from pagegraph.types import ResourceType, Url
     from pagegraph.types import RequestIncoming, RequestOutgoing
 
 
@@ -95,17 +96,59 @@ class RequestChain(Reportable):
         return requests
 
 
-def request_chain_for_edge(request_edge: RequestStartEdge) -> RequestChain:
+def request_chains_for_graph(pg: PageGraph) -> dict[RequestId, RequestChain]:
+    """Builds the chain for every request in the graph at once.
+
+    This takes one pass over the graph's edges, grouping each response
+    (redirect, completion or error) by the request id it belongs to and
+    the resource it leaves from, and then follows each request start edge
+    through those groups. If more than one request start edge has the same
+    request id, the chain for the last one is kept."""
+    start_edges: list[RequestStartEdge] = []
+    responses: dict[tuple[RequestId, PageGraphNodeId], list[RequestOutgoing]] = {}
+    for edge in pg.edges():
+        if request_start_edge := edge.as_request_start_edge():
+            start_edges.append(request_start_edge)
+            continue
+        response_edge: Optional[RequestOutgoing] = (
+            edge.as_request_redirect_edge() or
+            edge.as_request_complete_edge() or
+            edge.as_request_error_edge())
+        if response_edge is None:
+            continue
+        # The edges are walked in the same order as each resource's
+        # outgoing edges, so each group is in the order the responses
+        # were recorded for that resource.
+        key = (response_edge.request_id(), response_edge.incoming_node_id)
+        responses.setdefault(key, []).append(response_edge)
+
+    chains: dict[RequestId, RequestChain] = {}
+    for request_start_edge in start_edges:
+        request_id = request_start_edge.request_id()
+        chains[request_id] = build_request_chain(request_start_edge, responses)
+    return chains
+
+
+def build_request_chain(
+        request_edge: RequestStartEdge,
+        responses: dict[tuple[RequestId, PageGraphNodeId], list[RequestOutgoing]]
+        ) -> RequestChain:
     request_id = request_edge.request_id()
     chain = RequestChain(request_id, request_edge)
     resource_node = request_edge.outgoing_node()
+    # How many of each resource's responses this chain has already
+    # followed, so that a redirect back to a resource already in the
+    # chain picks up that resource's next response.
+    num_followed: dict[PageGraphNodeId, int] = {}
 
     while True:
-        next_edge = resource_node.next_response_for_id(request_id,
-                                                       chain.all_requests())
-
-        if not next_edge:
+        resource_id = resource_node.pg_id()
+        resource_responses = responses.get((request_id, resource_id), [])
+        index = num_followed.get(resource_id, 0)
+        if index >= len(resource_responses):
             return chain
+        num_followed[resource_id] = index + 1
+        next_edge = resource_responses[index]
 
         if request_redirect_edge := next_edge.as_request_redirect_edge():
             chain.add_redirect(request_redirect_edge)
@@ -3,9 +3,14 @@ processed and loaded as proper PageGraph recordings."""
 
 from __future__ import annotations
 
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+import gzip
+import io
 from pathlib import Path
 import re
 from typing import TYPE_CHECKING
+from xml.parsers import expat
 
 import networkx
 from packaging.version import parse
@@ -13,15 +18,77 @@ from packaging.version import parse
 from pagegraph.graph.node import Node
 from pagegraph.graph.node import url_from_network_node_data
 from pagegraph.graph.node import node_type_from_networkx_node_data
-from pagegraph.types import PageGraphInput
+from pagegraph.store import builder_for_type, FilteringGraphBuilder
+from pagegraph.store import LazyValue, LazyValueSource, NetworkXGraphBuilder
+from pagegraph.types import PageGraphInput, StoreType
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Any, BinaryIO, Callable, Iterator, Optional
 
     from networkx import MultiDiGraph
     from packaging.version import Version
 
-    from pagegraph.types import Url
+    from pagegraph.store import GraphBuilder, GraphStore
+    from pagegraph.types import ElementTypes, NetworkXNodeId, Url
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Kept in sync with utils/graphml_files.py, which names reports the same way.
+GRAPHML_SUFFIXES = (".graphml", ".graphml.gz", ".graphml.zst")
+
+
+def graph_name_from_path(input_path: Path) -> str:
+    """Returns the file name at `input_path` without its .graphml (or
+    .graphml.gz, ...) suffix."""
+    name = input_path.name
+    for suffix in GRAPHML_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def compression_of_graphml_file(input_path: Path) -> Optional[str]:
+    """Returns "gzip" or "zstd" if the file at `input_path` is compressed
+    (based on the file's contents, not its name), and otherwise None."""
+    with input_path.open("rb") as handle:
+        magic = handle.read(len(ZSTD_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def decompressing_reader(handle: BinaryIO,
+                         compression: Optional[str]) -> BinaryIO:
+    """Wraps `handle` so that reads return the decompressed contents of
+    the file, without decompressing the whole file up front."""
+    match compression:
+        case None:
+            return handle
+        case "gzip":
+            return gzip.GzipFile(fileobj=handle, mode="rb")
+        case "zstd":
+            try:
+                import zstandard  # type: ignore
+            except ImportError as exc:
+                raise ValueError("Reading zstd compressed graphs requires "
+                                 "the 'zstandard' package") from exc
+            return zstandard.ZstdDecompressor().stream_reader(handle)
+        case _:
+            raise ValueError(f"Unknown compression: {compression}")
+
+
+@contextmanager
+def open_graphml_file(input_path: Path) -> Iterator[BinaryIO]:
+    """Opens a (possibly gzip or zstd compressed) GraphML file for
+    reading."""
+    compression = compression_of_graphml_file(input_path)
+    with input_path.open("rb") as handle:
+        with closing(decompressing_reader(handle, compression)) as reader:
+            yield reader
 
 
 def url_from_graphml_file(input_path: Path) -> Url:
@@ -31,8 +98,9 @@ def url_from_graphml_file(input_path: Path) -> Url:
     xml_empty_url_pattern = r'<desc>.*?<url/>.*?</desc>'
     xml_empty_url_matcher = re.compile(xml_empty_url_pattern, flags=re.U)
 
-    with input_path.open() as f:
-        for line in f:
+    with (open_graphml_file(input_path) as handle,
+          io.TextIOWrapper(handle, encoding="utf8") as text):
+        for line in text:
             if with_url_match := xml_url_matcher.search(line):
                 return with_url_match.group(1)
             # If we couldn't find a proper URL in the PageGraph file,
@@ -49,8 +117,9 @@ def pagegraph_version_from_graphml_file(input_path: Path) -> Version:
     pattern = r"<version>(\d+\.\d+\.\d+)<\/version>"
 
     graph_version = None
-    with input_path.open(encoding="utf8") as f:
-        for line in f:
+    with (open_graphml_file(input_path) as handle,
+          io.TextIOWrapper(handle, encoding="utf8") as text):
+        for line in text:
             match = re.search(pattern, line, re.ASCII)
             if match:
                 graph_version = parse(match.group(1))
@@ -94,19 +163,350 @@ def remove_intermediate_subgraphs(graph: MultiDiGraph) -> MultiDiGraph:
     return new_graph
 
 
-def load_from_path(input_path: Path) -> PageGraphInput:
-    """Loads a networkx instance from a graphml file.
+# The same mappings `networkx.read_graphml` uses for "attr.type" values
+# and boolean values.
+GRAPHML_TYPES: dict[str, Callable[[str], Any]] = {
+    "boolean": bool,
+    "double": float,
+    "float": float,
+    "int": int,
+    "integer": int,
+    "long": int,
+    "string": str,
+}
+GRAPHML_BOOLS = {"true": True, "false": False, "0": False, "1": True}
+
+
+@dataclass
+class GraphMLKey:
+    name: str
+    type: Callable[[str], Any]
+    domain: Optional[str]
+
+    def decode(self, text: Optional[str]) -> Any:
+        if text is None:
+            return ""
+        if self.type is bool:
+            return GRAPHML_BOOLS[text.lower()]
+        return self.type(text)
+
+
+# Attributes that can be very large (script source text, and the arguments
+# and return values of JS calls), and so are worth skipping when loading
+# a graph, and only reading later if they're actually needed.
+LAZY_ATTR_NAMES = frozenset(["source", "args", "value"])
+# Values shorter than this (in characters) are cheaper to just keep than
+# to read again later.
+LAZY_MIN_LENGTH = 1024
+
+
+class GraphMLFileSource(LazyValueSource):
+    """Reads byte ranges back out of a GraphML file, for loading
+    `LazyGraphMLValue` values. The file handle is opened on first use and
+    kept open until `close()` is called."""
+
+    path: Path
+    handle: Optional[BinaryIO] = None
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def read(self, start: int, end: int) -> bytes:
+        if self.handle is None:
+            self.handle = self.path.open("rb")
+        self.handle.seek(start)
+        return self.handle.read(end - start)
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+class LazyGraphMLValue(LazyValue):
+    """An attribute value that is read (and decoded) from the byte range of
+    its <data> element in the source GraphML file when first needed.
+
+    Note that this assumes the file isn't modified after the graph is
+    loaded."""
+
+    __slots__ = ("source", "key", "start", "end")
+
+    source: GraphMLFileSource
+    key: GraphMLKey
+    start: int
+    end: int
+
+    def __init__(self, source: GraphMLFileSource, key: GraphMLKey,
+                 start: int, end: int) -> None:
+        self.source = source
+        self.key = key
+        self.start = start
+        self.end = end
+
+    def load(self) -> Any:
+        # The byte range covers the <data ...> start tag and the element's
+        # content, so just close the element and parse it on its own.
+        fragment = self.source.read(self.start, self.end) + b"</data>"
+        chunks: list[str] = []
+        parser = expat.ParserCreate()
+        parser.CharacterDataHandler = chunks.append
+        try:
+            parser.Parse(fragment, True)
+        except expat.ExpatError as exc:
+            raise ValueError(
+                f"Unable to read attribute from {self.source.path}") from exc
+        return self.key.decode("".join(chunks) if chunks else None)
+
+    def __repr__(self) -> str:
+        return (f"LazyGraphMLValue({self.key.name}, "
+                f"bytes={self.start}-{self.end})")
+
+
+class GraphMLStreamReader:
+    """Builds a graph from a PageGraph GraphML file in a single pass over
+    the file, without first building an in memory tree of the whole XML
+    document (which is what `networkx.read_graphml` does).
+
+    Along the way, this also reads the PageGraph version and top level
+    URL from the document's <desc> element. The resulting graph is
+    identical to the one `networkx.read_graphml` would produce (node, edge
+    and attribute order included).
+
+    If given a `lazy_source`, the values of large attributes (see
+    `LAZY_ATTR_NAMES`) aren't kept in memory. Instead, the reader only
+    records where in the file each value is, and stores a
+    `LazyGraphMLValue` in its place, which the graph store replaces with the
+    real value when the attribute is first accessed."""
+
+    builder: GraphBuilder
+    lazy_source: Optional[GraphMLFileSource] = None
+    lazy_min_length: int
+    parser: Optional[expat.XMLParserType] = None
+    version: Optional[Version] = None
+    url: Optional[Url] = None
+
+    keys: dict[str, GraphMLKey]
+    defaults: dict[str, Any]
+    stack: list[str]
+    text: Optional[list[str]] = None
+    """Character data collected for the current element, if needed."""
+    key_id: Optional[str] = None
+    data_key: Optional[GraphMLKey] = None
+    element_id: Optional[str] = None
+    element_data: Optional[dict[str, Any]] = None
+    edge_endpoints: Optional[tuple[NetworkXNodeId, NetworkXNodeId]] = None
+    lazy_start: Optional[int] = None
+    """Byte offset of the current <data> element, if its value might be
+    loaded lazily."""
+    lazy_length = 0
+
+    def __init__(self, builder: Optional[GraphBuilder] = None,
+                 lazy_source: Optional[GraphMLFileSource] = None,
+                 lazy_min_length: int = LAZY_MIN_LENGTH) -> None:
+        self.builder = builder or NetworkXGraphBuilder()
+        self.lazy_source = lazy_source
+        self.lazy_min_length = lazy_min_length
+        self.keys = {}
+        self.defaults = {}
+        self.stack = []
+        if lazy_source:
+            self.builder.use_lazy_values()
+
+    def read(self, handle: BinaryIO) -> GraphStore:
+        self.parser = parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.buffer_size = 1024 * 1024
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        try:
+            parser.ParseFile(handle)
+        except expat.ExpatError as exc:
+            raise ValueError(f"Invalid GraphML: {exc}") from exc
+        except (gzip.BadGzipFile, EOFError) as exc:
+            raise ValueError(f"Invalid compressed GraphML: {exc}") from exc
+        finally:
+            self.parser = None
+        return self.builder.build()
+
+    def character_data(self, data: str) -> None:
+        if self.text is not None:
+            self.text.append(data)
+
+    def lazy_character_data(self, data: str) -> None:
+        # Note that the handler can't be swapped out from here, since expat
+        # flushes its text buffer (calling this again) when that happens.
+        if self.text is None:
+            return
+        self.text.append(data)
+        self.lazy_length += len(data)
+        if self.lazy_length >= self.lazy_min_length:
+            # Long enough to be loaded lazily, so stop collecting the text.
+            self.text = None
+
+    def take_text(self) -> Optional[str]:
+        text = "".join(self.text) if self.text else None
+        self.text = None
+        return text
+
+    def start_element(self, name: str, attrs: dict[str, str]) -> None:
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append(name)
+        match name:
+            case "node" | "edge":
+                self.element_id = attrs.get("id")
+                self.element_data = {}
+                if name == "edge":
+                    self.edge_endpoints = (attrs["source"], attrs["target"])
+            case "data":
+                try:
+                    self.data_key = self.keys[attrs["key"]]
+                except KeyError as exc:
+                    raise ValueError(
+                        f"Bad GraphML data: no key {attrs.get('key')}") from exc
+                self.text = []
+                if (self.lazy_source and self.element_data is not None
+                        and self.data_key.name in LAZY_ATTR_NAMES):
+                    assert self.parser
+                    self.lazy_start = self.parser.CurrentByteIndex
+                    self.lazy_length = 0
+                    self.parser.CharacterDataHandler = self.lazy_character_data
+            case "key":
+                attr_type = attrs.get("attr.type", "string")
+                if "attr.name" not in attrs or attr_type not in GRAPHML_TYPES:
+                    raise ValueError(f"Unsupported GraphML key: {attrs}")
+                self.key_id = attrs["id"]
+                self.keys[self.key_id] = GraphMLKey(
+                    attrs["attr.name"], GRAPHML_TYPES[attr_type],
+                    attrs.get("for"))
+            case "graph":
+                if attrs.get("edgedefault") != "directed":
+                    raise ValueError("PageGraph GraphML must be directed")
+                self.start_graph()
+            case "default":
+                self.text = []
+            case "version" | "url" if parent == "desc":
+                self.text = []
+            case "hyperedge" | "port":
+                raise ValueError(f"Unsupported GraphML element: {name}")
+
+    def end_element(self, name: str) -> None:
+        self.stack.pop()
+        match name:
+            case "data":
+                assert self.data_key
+                value: Any
+                if self.lazy_start is None:
+                    value = self.data_key.decode(self.take_text())
+                else:
+                    value = self.end_lazy_data(self.data_key)
+                if self.element_data is not None:
+                    self.element_data[self.data_key.name] = value
+                elif self.stack and self.stack[-1] == "graph":
+                    self.builder.graph_attrs[self.data_key.name] = value
+            case "node":
+                assert self.element_id is not None and self.element_data is not None
+                self.builder.add_node(self.element_id, self.element_data)
+                self.element_data = None
+            case "edge":
+                assert self.edge_endpoints and self.element_data is not None
+                source, target = self.edge_endpoints
+                edge_key: Any = self.element_id
+                if edge_key is None:
+                    edge_key = self.element_data.get("key")
+                else:
+                    try:
+                        edge_key = int(edge_key)
+                    except ValueError:
+                        pass
+                self.builder.add_edge(source, target, edge_key,
+                                      self.element_data)
+                self.element_data = None
+            case "default":
+                assert self.key_id
+                key = self.keys[self.key_id]
+                self.defaults[self.key_id] = key.decode(self.take_text())
+            case "version" if self.stack and self.stack[-1] == "desc":
+                self.version = parse_pagegraph_version(self.take_text() or "")
+            case "url" if self.stack and self.stack[-1] == "desc":
+                self.url = self.take_text() or ""
+
+    def end_lazy_data(self, key: GraphMLKey) -> Any:
+        assert self.lazy_source and self.parser and self.lazy_start is not None
+        start = self.lazy_start
+        self.lazy_start = None
+        self.parser.CharacterDataHandler = self.character_data
+        if self.text is not None:
+            return key.decode(self.take_text())
+        return LazyGraphMLValue(self.lazy_source, key, start,
+                                self.parser.CurrentByteIndex)
+
+    def start_graph(self) -> None:
+        node_defaults: dict[str, Any] = {}
+        edge_defaults: dict[str, Any] = {}
+        for key_id, value in self.defaults.items():
+            key = self.keys[key_id]
+            if key.domain == "node":
+                node_defaults[key.name] = value
+            elif key.domain == "edge":
+                edge_defaults[key.name] = value
+        self.builder.graph_attrs["node_default"] = node_defaults
+        self.builder.graph_attrs["edge_default"] = edge_defaults
+
+
+def parse_pagegraph_version(text: str) -> Version:
+    if not re.fullmatch(r"\d+\.\d+\.\d+", text.strip(), re.ASCII):
+        raise ValueError(f"Invalid PageGraph version: {text}")
+    return parse(text.strip())
+
+
+def load_from_path(input_path: Path,
+                   store_type: StoreType = StoreType.NETWORKX,
+                   lazy_attrs: bool = False,
+                   element_types: Optional[ElementTypes] = None
+                   ) -> PageGraphInput:
+    """Loads a graph store (by default, a networkx instance) from a graphml
+    file, which may be gzip or zstd compressed.
+
+    If `lazy_attrs` is true, large attribute values (script source, JS call
+    arguments and results) are only read from the file when first used.
+    Compressed files can't be read from at an offset, so `lazy_attrs` is
+    ignored for them.
+
+    If `element_types` is given, only the parts of the graph with those
+    node and edge types are loaded (see `FilteringGraphBuilder`).
 
     This indirection step exists as a chance to do preprocess and modify
     networkx instances before they're consumed by the PageGraph class."""
 
     try:
-        version = pagegraph_version_from_graphml_file(input_path)
-        url = url_from_graphml_file(input_path)
-        graph = networkx.read_graphml(input_path)
-        # processed_graph = remove_intermediate_subgraphs(graph)
-        reverse_graph = networkx.reverse_view(graph)
-        return PageGraphInput(url, version, graph, reverse_graph)
+        compression = compression_of_graphml_file(input_path)
+        lazy_source = None
+        if lazy_attrs and compression is None:
+            lazy_source = GraphMLFileSource(input_path)
+        with open_graphml_file(input_path) as handle:
+            return load_from_handle(handle, store_type, lazy_source,
+                                    element_types)
     except ValueError as exc:
         raise ValueError(
             f"Unable to parse PageGraph file at {input_path}") from exc
+
+
+def load_from_handle(handle: BinaryIO,
+                     store_type: StoreType = StoreType.NETWORKX,
+                     lazy_source: Optional[GraphMLFileSource] = None,
+                     element_types: Optional[ElementTypes] = None
+                     ) -> PageGraphInput:
+    builder = builder_for_type(store_type)
+    if element_types is not None:
+        builder = FilteringGraphBuilder(builder, element_types)
+    reader = GraphMLStreamReader(builder, lazy_source)
+    store = reader.read(handle)
+    store.lazy_source = lazy_source
+    if reader.version is None:
+        raise ValueError("Unable to determine version of PageGraph file.")
+    if reader.url is None:
+        raise ValueError("Could not find <url>...</url> in graph file")
+    # processed_graph = remove_intermediate_subgraphs(graph)
+    return PageGraphInput(reader.url, reader.version, store)
@@ -0,0 +1,392 @@
+"""Reading and writing binary snapshots of parsed graphs.
+
+A snapshot (a ".pgcache" file, written next to the GraphML file it was
+built from) holds the tables of a `CompactStore`, along with the graph's
+version and URL. The tables are stored as fixed width arrays, so a
+snapshot is read by memory mapping the file, and only the parts of the
+graph a command touches are ever read from disk.
+
+A snapshot is only used if the GraphML file still has the size and
+modification time it had when the snapshot was written, or, if only the
+modification time changed, if it still has the same content hash.
+
+File layout (all integers are little endian):
+
+    magic (8 bytes) | header offset (u64) | header length (u64)
+    sections, each aligned to 8 bytes
+    header (JSON), describing the source file and where each section is"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+from typing import TYPE_CHECKING
+
+from packaging.version import parse
+
+from pagegraph.graphml import compression_of_graphml_file
+from pagegraph.graphml import decompressing_reader, load_from_handle
+from pagegraph.store import AttrsTable, CompactStore, TypeCodes
+from pagegraph.types import PageGraphInput, StoreType
+
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO, Optional, Union
+
+    ArrayLike = Union[array[int], memoryview]
+
+
+MAGIC = b"PGCACHE1"
+PRELUDE = struct.Struct("<8sQQ")
+SUFFIX = ".pgcache"
+
+TAG_STR = 0
+TAG_INT = 1
+TAG_FLOAT = 2
+TAG_BOOL = 3
+
+# Sections are stored as arrays of one of these (fixed width) types, which
+# are both `array` typecodes and `memoryview` formats.
+SECTION_TYPECODES = ("B", "H", "Q", "q")
+
+
+def cache_path_for(input_path: Path) -> Path:
+    return input_path.with_name(input_path.name + SUFFIX)
+
+
+def hash_file(input_path: Path) -> str:
+    digest = hashlib.sha256()
+    with input_path.open("rb") as handle:
+        while chunk := handle.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class SourceInfo:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class HashingReader:
+    """Wraps a file handle, hashing everything that's read through it."""
+
+    handle: BinaryIO
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self.handle = handle
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.handle.read(size)
+        self.digest.update(data)
+        return data
+
+
+class StringTable(Sequence):
+    """Strings stored back to back as UTF-8, decoded on access."""
+
+    offsets: ArrayLike
+    data: memoryview
+
+    def __init__(self, offsets: ArrayLike, data: memoryview) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]],
+                   "utf8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class MappedValues(Sequence):
+    """Attribute values, stored as a type tag and a 64 bit payload each.
+    For strings, the payload is an index into a `StringTable`."""
+
+    tags: ArrayLike
+    payloads: ArrayLike
+    strings: StringTable
+
+    def __init__(self, tags: ArrayLike, payloads: ArrayLike,
+                 strings: StringTable) -> None:
+        self.tags = tags
+        self.payloads = payloads
+        self.strings = strings
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        tag = self.tags[index]
+        payload = self.payloads[index]
+        if tag == TAG_STR:
+            return self.strings[payload]
+        if tag == TAG_INT:
+            return payload
+        if tag == TAG_BOOL:
+            return payload == 1
+        return struct.unpack("<d", struct.pack("<q", payload))[0]
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+class SnapshotWriter:
+    sections: dict[str, tuple[str, bytes]]
+    string_index: dict[str, int]
+    string_offsets: array[int]
+    string_data: bytearray
+
+    def __init__(self) -> None:
+        self.sections = {}
+        self.string_index = {}
+        self.string_offsets = array("Q", [0])
+        self.string_data = bytearray()
+
+    def add(self, name: str, typecode: str, values: Any) -> None:
+        if isinstance(values, memoryview):
+            values = values.tolist()
+        data = array(typecode, values)
+        if sys.byteorder != "little":
+            data.byteswap()
+        self.sections[name] = (typecode, data.tobytes())
+
+    def intern(self, value: str) -> int:
+        index = self.string_index.get(value)
+        if index is None:
+            index = len(self.string_index)
+            self.string_index[value] = index
+            self.string_data += value.encode("utf8")
+            self.string_offsets.append(len(self.string_data))
+        return index
+
+    def add_values(self, name: str, values: Sequence[Any]) -> None:
+        tags = array("B")
+        payloads = array("q")
+        for value in values:
+            if isinstance(value, bool):
+                tags.append(TAG_BOOL)
+                payloads.append(1 if value else 0)
+            elif isinstance(value, int):
+                tags.append(TAG_INT)
+                payloads.append(value)
+            elif isinstance(value, float):
+                tags.append(TAG_FLOAT)
+                payloads.append(
+                    struct.unpack("<q", struct.pack("<d", value))[0])
+            elif isinstance(value, str):
+                tags.append(TAG_STR)
+                payloads.append(self.intern(value))
+            else:
+                raise ValueError(f"Unable to store value of type {type(value)}")
+        self.add(f"{name}_tags", "B", tags)
+        self.add(f"{name}_payloads", "q", payloads)
+
+    def add_attrs(self, name: str, attrs: AttrsTable) -> None:
+        self.add(f"{name}_offsets", "Q", attrs.offsets)
+        self.add(f"{name}_codes", "H", attrs.codes)
+        self.add_values(f"{name}_values", attrs.values)
+
+    def write(self, output_path: Path, header: dict[str, Any]) -> None:
+        self.add("strings_offsets", "Q", self.string_offsets)
+        self.sections["strings_data"] = ("B", bytes(self.string_data))
+
+        header["sections"] = {}
+        # Write to a temporary file first, so that other processes never
+        # see a partially written snapshot.
+        tmp_path = output_path.with_name(output_path.name + f".{os.getpid()}")
+        try:
+            with tmp_path.open("wb") as handle:
+                handle.write(b"\0" * PRELUDE.size)
+                for name, (typecode, data) in self.sections.items():
+                    handle.write(b"\0" * (-handle.tell() % 8))
+                    header["sections"][name] = [
+                        handle.tell(), len(data), typecode]
+                    handle.write(data)
+                header_bytes = json.dumps(header).encode("utf8")
+                header_offset = handle.tell()
+                handle.write(header_bytes)
+                handle.seek(0)
+                handle.write(
+                    PRELUDE.pack(MAGIC, header_offset, len(header_bytes)))
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+def write(cache_path: Path, input_data: PageGraphInput,
+          source: SourceInfo) -> None:
+    store = input_data.store
+    if not isinstance(store, CompactStore):
+        raise ValueError("Only compact stores can be written to a snapshot")
+
+    writer = SnapshotWriter()
+    writer.add("node_ids", "Q",
+               [writer.intern(node_id) for node_id in store.node_id_list])
+    writer.add_values("edge_ids", store.edge_id_list)
+    writer.add_attrs("node_attrs", store.node_attrs)
+    writer.add_attrs("edge_attrs", store.edge_attrs)
+    writer.add("node_types", "B", store.node_types.codes)
+    writer.add("edge_types", "B", store.edge_types.codes)
+    for name in ("sources", "targets", "out_offsets", "out_edges",
+                 "in_offsets", "in_edges"):
+        writer.add(name, "Q", getattr(store, name))
+
+    header = {
+        "source": asdict(source),
+        "url": input_data.url,
+        "version": str(input_data.version),
+        "graph_attrs": store.graph_attrs,
+        "node_attr_names": store.node_attrs.names,
+        "edge_attr_names": store.edge_attrs.names,
+        "node_type_names": store.node_types.names,
+        "edge_type_names": store.edge_types.names,
+    }
+    writer.write(cache_path, header)
+
+
+def is_fresh(source: dict[str, Any], input_path: Path) -> bool:
+    stat = input_path.stat()
+    if stat.st_size != source["size"]:
+        return False
+    if stat.st_mtime_ns == source["mtime_ns"]:
+        return True
+    return hash_file(input_path) == source["sha256"]
+
+
+def read(cache_path: Path, input_path: Path) -> Optional[PageGraphInput]:
+    """Returns the graph stored in the snapshot at `cache_path`, or None
+    if there is no usable snapshot for the GraphML file at `input_path`."""
+    try:
+        with cache_path.open("rb") as handle:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, header_offset, header_length = PRELUDE.unpack_from(mapping)
+        if magic != MAGIC:
+            mapping.close()
+            return None
+        header = json.loads(
+            mapping[header_offset:header_offset + header_length])
+        if not is_fresh(header["source"], input_path):
+            mapping.close()
+            return None
+        return input_from_header(mapping, header)
+    except (KeyError, TypeError, ValueError, struct.error):
+        mapping.close()
+        return None
+
+
+def input_from_header(mapping: mmap.mmap,
+                      header: dict[str, Any]) -> PageGraphInput:
+    if sys.byteorder != "little":
+        raise ValueError("Snapshots can only be read on little endian systems")
+    view = memoryview(mapping)
+    views = [view]
+
+    def section(name: str) -> memoryview:
+        offset, length, typecode = header["sections"][name]
+        if typecode not in SECTION_TYPECODES:
+            raise ValueError(f"Unknown section type: {typecode}")
+        with view[offset:offset + length] as section_bytes:
+            views.append(section_bytes.cast(typecode))
+        return views[-1]
+
+    def values(name: str) -> MappedValues:
+        return MappedValues(section(f"{name}_tags"),
+                            section(f"{name}_payloads"), strings)
+
+    def attrs(name: str, names: list[str]) -> AttrsTable:
+        table = AttrsTable()
+        table.names = names
+        table.name_codes = {attr_name: i for i, attr_name in enumerate(names)}
+        table.offsets = section(f"{name}_offsets")
+        table.codes = section(f"{name}_codes")
+        table.values = values(f"{name}_values")
+        return table
+
+    def types(name: str, names: list[str]) -> TypeCodes:
+        type_codes = TypeCodes()
+        type_codes.names = names
+        type_codes.name_codes = {type_name: i for i, type_name in enumerate(names)}
+        type_codes.codes = section(name)
+        return type_codes
+
+    # If the snapshot turns out to be invalid part way through, release
+    # the views already taken, so that the caller can close the mapping.
+    try:
+        strings = StringTable(section("strings_offsets"),
+                              section("strings_data"))
+
+        store = CompactStore()
+        store.mapping = mapping
+        store.mapped_views = views
+        store.graph_attrs = header["graph_attrs"]
+        store.node_id_list = [strings[i] for i in section("node_ids")]
+        store.node_index = {
+            node_id: i for i, node_id in enumerate(store.node_id_list)}
+        store.edge_id_list = list(values("edge_ids"))
+        store.edge_index = {
+            edge_id: i for i, edge_id in enumerate(store.edge_id_list)}
+        store.node_attrs = attrs("node_attrs", header["node_attr_names"])
+        store.edge_attrs = attrs("edge_attrs", header["edge_attr_names"])
+        store.node_types = types("node_types", header["node_type_names"])
+        store.edge_types = types("edge_types", header["edge_type_names"])
+        store.sources = section("sources")
+        store.targets = section("targets")
+        store.out_offsets = section("out_offsets")
+        store.out_edges = section("out_edges")
+        store.in_offsets = section("in_offsets")
+        store.in_edges = section("in_edges")
+        return PageGraphInput(header["url"], parse(header["version"]), store)
+    except BaseException:
+        for mapped_view in reversed(views):
+            mapped_view.release()
+        raise
+
+
+def load_from_path(input_path: Path, debug: bool = False) -> PageGraphInput:
+    """Loads the graph at `input_path` from its snapshot if there is a
+    usable one. Otherwise, parses the GraphML file into a compact store,
+    and (if possible) writes a snapshot for the next time."""
+    cache_path = cache_path_for(input_path)
+    if input_data := read(cache_path, input_path):
+        return input_data
+
+    stat = input_path.stat()
+    try:
+        compression = compression_of_graphml_file(input_path)
+        with input_path.open("rb") as handle:
+            reader = HashingReader(handle)
+            input_data = load_from_handle(
+                decompressing_reader(reader, compression), StoreType.COMPACT)
+            # Decompressors can stop before the end of the file, but the
+            # hash needs to cover all of it.
+            while reader.read(1024 * 1024):
+                pass
+    except ValueError as exc:
+        raise ValueError(
+            f"Unable to parse PageGraph file at {input_path}") from exc
+
+    source = SourceInfo(stat.st_size, stat.st_mtime_ns,
+                        reader.digest.hexdigest())
+    try:
+        write(cache_path, input_data, source)
+    except (OSError, ValueError, OverflowError) as exc:
+        if debug:
+            print(f"Unable to write graph snapshot to {cache_path}: {exc}",
+                  file=sys.stderr)
+    return input_data
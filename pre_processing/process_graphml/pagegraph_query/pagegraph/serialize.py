@@ -2,12 +2,19 @@ from __future__ import annotations
 
 from abc import ABC
 from dataclasses import dataclass, fields
+import json
+import os
 from typing import TYPE_CHECKING, Union, Sequence
 
 from pagegraph.types import BlinkId, PageGraphId, RequestHeaders
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
-    from typing import Any, Optional
+    from typing import Any, Optional, TextIO
 
     from pagegraph.graph import PageGraph
     from pagegraph.types import Url, RequestId
@@ -143,13 +150,57 @@ class Reportable(ABC):
         raise NotImplementedError()
 
 
+# The number of list entries (e.g., reports) to encode at a time when
+# writing a list to a stream. Small batches keep few converted reports
+# alive at once, which (since the whole graph is also in memory) keeps
+# Python's garbage collector from running full collections.
+WRITE_BATCH_SIZE = 100
+
+# Maps each report class to the names of its fields, paired with the key
+# each field is written with. Filled in the first time a class is
+# serialized, so that `dataclasses.fields()` isn't called per report.
+REPORT_FIELDS: dict[type[ReportBase], tuple[tuple[str, str], ...]] = {}
+
+# Value types that are written out as is.
+SCALAR_TYPES = frozenset([str, int, float, bool])
+
+
 def report_field_name(field_name: str) -> str:
     return field_name.replace("_", " ")
 
 
+def report_fields(report_class: type[ReportBase]
+                  ) -> tuple[tuple[str, str], ...]:
+    try:
+        return REPORT_FIELDS[report_class]
+    except KeyError:
+        class_fields = tuple(
+            (field.name, report_field_name(field.name))
+            for field in fields(report_class))
+        REPORT_FIELDS[report_class] = class_fields
+        return class_fields
+
+
 def to_jsonable(data: JSONAble) -> Any:
+    """Converts reports (and lists and dicts of reports) into the lists,
+    dicts and values that are written out as JSON. Fields and dict entries
+    that are None are left out, as are None entries in lists."""
+    return jsonable_value(data, {})
+
+
+def jsonable_value(data: JSONAble,
+                   seen_reports: dict[int, Optional[dict[str, Any]]]) -> Any:
+    # Strings, numbers and booleans are by far the most common values, and
+    # are returned as is, so they're checked for first (and before
+    # recursing, in the loops below).
+    if data.__class__ in SCALAR_TYPES:
+        return data
+
     if isinstance(data, list):
-        return [to_jsonable(x) for x in data if x is not None]
+        return [
+            x if x.__class__ in SCALAR_TYPES else
+            jsonable_value(x, seen_reports)
+            for x in data if x is not None]
 
     if isinstance(data, dict):
         jsonable_dict: dict[str, JSONAble] = {}
@@ -157,18 +208,77 @@ def to_jsonable(data: JSONAble) -> Any:
             if v is None:
                 continue
             report_key = report_field_name(k)
-            jsonable_dict[report_key] = to_jsonable(v)
+            if v.__class__ not in SCALAR_TYPES:
+                v = jsonable_value(v, seen_reports)
+            jsonable_dict[report_key] = v
         return jsonable_dict
 
     if isinstance(data, ReportBase):
+        # Some reports (e.g., the report for a frame) are shared by many of
+        # the reports that mention them, so the converted version of any
+        # report seen more than once is kept and reused. Reports seen only
+        # once are just noted (as None), so that the converted versions of
+        # all the other reports aren't kept alive.
+        report_id = id(data)
+        is_shared = report_id in seen_reports
+        if is_shared and (jsonable_map := seen_reports[report_id]):
+            return jsonable_map
         jsonable_map = {}
-        for field in fields(data):
-            field_name = field.name
-            value = getattr(data, field_name)
+        values = data.__dict__
+        for field_name, report_name in report_fields(data.__class__):
+            value = values[field_name]
             if value is None:
                 continue
-            report_name = report_field_name(field_name)
-            jsonable_map[report_name] = to_jsonable(value)
+            if value.__class__ not in SCALAR_TYPES:
+                value = jsonable_value(value, seen_reports)
+            jsonable_map[report_name] = value
+        seen_reports[report_id] = jsonable_map if is_shared else None
         return jsonable_map
 
     return data
+
+
+def use_orjson() -> bool:
+    """Whether JSON output should be written with the `orjson` package,
+    which is enabled by setting `PAGEGRAPH_JSON=orjson`. This is much
+    faster for large reports, but (unlike the default) isn't byte for
+    byte the same as `json.dumps()`: it doesn't put spaces after
+    separators, and writes non-ASCII characters as UTF-8 instead of
+    escaping them."""
+    backend = os.environ.get("PAGEGRAPH_JSON", "json")
+    if backend == "json":
+        return False
+    if backend != "orjson":
+        raise ValueError(f"Unknown PAGEGRAPH_JSON: {backend}")
+    if orjson is None:
+        raise ValueError("PAGEGRAPH_JSON=orjson requires the "
+                         "'orjson' package")
+    return True
+
+
+def orjson_dumps(data: Any) -> str:
+    """Encodes already JSON-able data (e.g., the output of `to_jsonable()`)
+    with `orjson`."""
+    return orjson.dumps(data).decode("utf8")
+
+
+def write_json(data: JSONAble, stream: TextIO) -> None:
+    """Writes the same text as `json.dumps(to_jsonable(data))` to the
+    stream. Lists are converted and written a batch of entries at a time,
+    so the whole JSON document is never held in memory at once."""
+    if not isinstance(data, list):
+        stream.write(json.dumps(to_jsonable(data)))
+        return
+
+    seen_reports: dict[int, Optional[dict[str, Any]]] = {}
+    entries = [x for x in data if x is not None]
+    stream.write("[")
+    for start in range(0, len(entries), WRITE_BATCH_SIZE):
+        batch = entries[start:start + WRITE_BATCH_SIZE]
+        if start > 0:
+            stream.write(", ")
+        jsonable_batch = [jsonable_value(x, seen_reports) for x in batch]
+        # Strip the brackets from the encoded batch, leaving the entries
+        # separated the same way `json.dumps()` separates list entries.
+        stream.write(json.dumps(jsonable_batch)[1:-1])
+    stream.write("]")
@@ -0,0 +1,630 @@
+"""Storage backends for the nodes, edges and attributes of a graph.
+
+`PageGraph` (and the `Node` and `Edge` classes) only read the underlying
+graph through the `GraphStore` interface, which has two implementations:
+
+  - `NetworkXStore`, which wraps a networkx `MultiDiGraph` (the default).
+  - `CompactStore`, which keeps the graph in flat, array backed, CSR
+    (compressed sparse row) style tables. This uses much less memory than
+    networkx's nested dicts, at the cost of being read only.
+
+Both stores return nodes, edges and attributes in the same order."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+import networkx
+
+from pagegraph.types import StoreType
+
+if TYPE_CHECKING:
+    from mmap import mmap
+    from typing import Any, Iterable, Iterator, Optional
+
+    from networkx import MultiDiGraph
+
+    from pagegraph.types import ElementTypes, NetworkXNodeId, PageGraphEdgeId
+    from pagegraph.types import PageGraphEdgeKey
+
+
+NODE_TYPE_ATTR = "node type"
+EDGE_TYPE_ATTR = "edge type"
+
+MAX_INTERNED_LENGTH = 256
+"""Attribute values (strings) up to this length are shared between all
+elements in the compact store that have the same value."""
+
+
+class LazyValue(ABC):
+    """Placeholder for a (large) attribute value that hasn't been read
+    from the source file yet. Stores replace these with the real value the
+    first time the attribute is accessed."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def load(self) -> Any:
+        pass
+
+
+class LazyValueSource(ABC):
+    """Where `LazyValue`s read their values from (e.g., an open file)."""
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class LazyAttrsDict(dict):
+    """Attribute dict for networkx backed graphs that may contain
+    `LazyValue` placeholders, which are loaded when first read."""
+
+    def __getitem__(self, name: str) -> Any:
+        value = dict.__getitem__(self, name)
+        if isinstance(value, LazyValue):
+            value = value.load()
+            dict.__setitem__(self, name, value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        # Overriding __iter__ also keeps `dict(...)` and `{**...}` from
+        # copying the raw placeholders, since it disables CPython's fast
+        # path for copying dicts.
+        return dict.__iter__(self)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def items(self) -> Any:
+        return [(name, self[name]) for name in self]
+
+    def values(self) -> Any:
+        return [self[name] for name in self]
+
+    def copy(self) -> dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
+class GraphStore(ABC):
+    graph_attrs: dict[str, Any]
+    """Graph level attributes (i.e., networkx's `MultiDiGraph.graph`)."""
+
+    lazy_source: Optional[LazyValueSource] = None
+    """If some attribute values are loaded lazily, where they're read from."""
+
+    def close(self) -> None:
+        """Releases any resources (open files, memory maps) the store
+        holds. The store can't be used after it's closed."""
+        if self.lazy_source is not None:
+            self.lazy_source.close()
+            self.lazy_source = None
+
+    @abstractmethod
+    def node_ids(self) -> Iterable[NetworkXNodeId]:
+        """All node ids, in document order."""
+
+    @abstractmethod
+    def edge_keys(self) -> Iterable[PageGraphEdgeKey]:
+        """All edges, ordered the same way networkx's `MultiDiGraph.edges`
+        would order them."""
+
+    @abstractmethod
+    def node_data(self, node_id: NetworkXNodeId) -> Mapping[str, Any]:
+        """Raises a KeyError if there is no node with the given id."""
+
+    @abstractmethod
+    def edge_data(self, edge_key: PageGraphEdgeKey) -> Mapping[str, Any]:
+        """Raises a KeyError if there is no edge with the given key."""
+
+    def node_type_name(self, node_id: NetworkXNodeId) -> str:
+        return self.node_data(node_id)[NODE_TYPE_ATTR]
+
+    def edge_type_name(self, edge_key: PageGraphEdgeKey) -> str:
+        return self.edge_data(edge_key)[EDGE_TYPE_ATTR]
+
+    @abstractmethod
+    def out_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        """Ids of the edges starting at the given node."""
+
+    @abstractmethod
+    def in_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        """Ids of the edges ending at the given node."""
+
+    @abstractmethod
+    def successor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        """Ids of the nodes the given node has edges to (without
+        duplicates)."""
+
+    @abstractmethod
+    def predecessor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        """Ids of the nodes that have edges to the given node (without
+        duplicates)."""
+
+    @abstractmethod
+    def subgraph(self, node_ids: set[NetworkXNodeId]) -> MultiDiGraph:
+        """Returns a networkx graph, containing the given nodes and all the
+        edges between them."""
+
+
+class NetworkXStore(GraphStore):
+    graph: MultiDiGraph
+    r_graph: MultiDiGraph
+    """The reversed (i.e., edges flipped) view of `graph`."""
+
+    def __init__(self, graph: MultiDiGraph) -> None:
+        self.graph = graph
+        self.r_graph = networkx.reverse_view(graph)
+        self.graph_attrs = graph.graph
+
+    def node_ids(self) -> Iterable[NetworkXNodeId]:
+        return self.graph.nodes()
+
+    def edge_keys(self) -> Iterable[PageGraphEdgeKey]:
+        return self.graph.edges
+
+    def node_data(self, node_id: NetworkXNodeId) -> Mapping[str, Any]:
+        return self.graph.nodes[node_id]
+
+    def edge_data(self, edge_key: PageGraphEdgeKey) -> Mapping[str, Any]:
+        return self.graph.edges[edge_key]
+
+    def out_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        edge_ids = []
+        for _, edge_info in self.graph.adj[node_id].items():
+            edge_ids.extend(edge_info.keys())
+        return edge_ids
+
+    def in_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        edge_ids = []
+        for _, edge_info in self.r_graph.adj[node_id].items():
+            edge_ids.extend(edge_info.keys())
+        return edge_ids
+
+    def successor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        return list(self.graph.adj[node_id])
+
+    def predecessor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        return list(self.r_graph.adj[node_id])
+
+    def subgraph(self, node_ids: set[NetworkXNodeId]) -> MultiDiGraph:
+        return self.graph.subgraph(node_ids)
+
+
+class AttrsView(Mapping):
+    """Read only, dict-like view of one element's attributes in a
+    `CompactStore` table."""
+
+    __slots__ = ("table", "start", "end")
+
+    table: AttrsTable
+    start: int
+    end: int
+
+    def __init__(self, table: AttrsTable, start: int, end: int) -> None:
+        self.table = table
+        self.start = start
+        self.end = end
+
+    def __getitem__(self, name: str) -> Any:
+        code = self.table.name_codes.get(name)
+        if code is not None:
+            codes = self.table.codes
+            for index in range(self.start, self.end):
+                if codes[index] == code:
+                    value = self.table.values[index]
+                    if isinstance(value, LazyValue):
+                        value = value.load()
+                        self.table.values[index] = value
+                    return value
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.table.names
+        codes = self.table.codes
+        for index in range(self.start, self.end):
+            yield names[codes[index]]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class AttrsTable:
+    """The attributes of every node (or every edge) in a graph, stored as
+    one flat list of values, plus a parallel array of small integer codes
+    for the attribute names. The attributes for element `i` are the entries
+    from `offsets[i]` to `offsets[i + 1]`."""
+
+    names: list[str]
+    name_codes: dict[str, int]
+    offsets: array[int]
+    codes: array[int]
+    values: list[Any]
+    interned: dict[str, str]
+
+    def __init__(self) -> None:
+        self.names = []
+        self.name_codes = {}
+        self.offsets = array("L", [0])
+        self.codes = array("H")
+        self.values = []
+        self.interned = {}
+
+    def append(self, data: dict[str, Any]) -> None:
+        for name, value in data.items():
+            code = self.name_codes.get(name)
+            if code is None:
+                code = len(self.names)
+                self.names.append(name)
+                self.name_codes[name] = code
+            if isinstance(value, str) and len(value) <= MAX_INTERNED_LENGTH:
+                value = self.interned.setdefault(value, value)
+            self.codes.append(code)
+            self.values.append(value)
+        self.offsets.append(len(self.values))
+
+    def view(self, index: int) -> AttrsView:
+        return AttrsView(self, self.offsets[index], self.offsets[index + 1])
+
+    def finish(self) -> None:
+        # Only needed while building the table.
+        self.interned = {}
+
+
+class TypeCodes:
+    """Maps the type name of each node (or edge) to a small integer."""
+
+    names: list[str]
+    name_codes: dict[str, int]
+    codes: array[int]
+
+    def __init__(self) -> None:
+        self.names = []
+        self.name_codes = {}
+        self.codes = array("B")
+
+    def append(self, type_name: Optional[str]) -> None:
+        type_name = type_name or ""
+        code = self.name_codes.get(type_name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(type_name)
+            self.name_codes[type_name] = code
+        self.codes.append(code)
+
+    def type_name(self, index: int) -> str:
+        return self.names[self.codes[index]]
+
+
+class CompactStore(GraphStore):
+    """A read only graph, with integer indexes for each node and edge,
+    and CSR style forward and reverse adjacency arrays.
+
+    The edges leaving the node at index `i` are the edge indexes in
+    `out_edges[out_offsets[i]:out_offsets[i + 1]]` (and similarly for
+    `in_edges` / `in_offsets`)."""
+
+    node_id_list: list[NetworkXNodeId]
+    node_index: dict[NetworkXNodeId, int]
+    node_attrs: AttrsTable
+    node_types: TypeCodes
+
+    edge_id_list: list[PageGraphEdgeId]
+    edge_index: dict[PageGraphEdgeId, int]
+    edge_attrs: AttrsTable
+    edge_types: TypeCodes
+    sources: array[int]
+    targets: array[int]
+
+    out_offsets: array[int]
+    out_edges: array[int]
+    in_offsets: array[int]
+    in_edges: array[int]
+
+    mapping: Optional[mmap] = None
+    """If the store was loaded from a snapshot (see `pagegraph.pgcache`),
+    the memory mapped snapshot file that the arrays above point into."""
+    mapped_views: Optional[list[memoryview]] = None
+    """Views into `mapping`, which need to be released before the mapping
+    can be closed."""
+
+    def close(self) -> None:
+        for view in self.mapped_views or []:
+            view.release()
+        self.mapped_views = None
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        super().close()
+
+    def node_ids(self) -> Iterable[NetworkXNodeId]:
+        return self.node_id_list
+
+    def edge_keys(self) -> Iterator[PageGraphEdgeKey]:
+        node_id_list = self.node_id_list
+        edge_id_list = self.edge_id_list
+        targets = self.targets
+        for node_index, node_id in enumerate(node_id_list):
+            start = self.out_offsets[node_index]
+            end = self.out_offsets[node_index + 1]
+            for edge_index in self.out_edges[start:end]:
+                yield (node_id, node_id_list[targets[edge_index]],
+                       edge_id_list[edge_index])
+
+    def node_data(self, node_id: NetworkXNodeId) -> Mapping[str, Any]:
+        return self.node_attrs.view(self.node_index[node_id])
+
+    def node_type_name(self, node_id: NetworkXNodeId) -> str:
+        return self.node_types.type_name(self.node_index[node_id])
+
+    def edge_index_for_key(self, edge_key: PageGraphEdgeKey) -> int:
+        source_id, target_id, edge_id = edge_key
+        edge_index = self.edge_index[edge_id]
+        if (self.node_id_list[self.sources[edge_index]] != source_id or
+                self.node_id_list[self.targets[edge_index]] != target_id):
+            raise KeyError(edge_key)
+        return edge_index
+
+    def edge_data(self, edge_key: PageGraphEdgeKey) -> Mapping[str, Any]:
+        return self.edge_attrs.view(self.edge_index_for_key(edge_key))
+
+    def edge_type_name(self, edge_key: PageGraphEdgeKey) -> str:
+        return self.edge_types.type_name(self.edge_index_for_key(edge_key))
+
+    def out_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        node_index = self.node_index[node_id]
+        start = self.out_offsets[node_index]
+        end = self.out_offsets[node_index + 1]
+        return [self.edge_id_list[i] for i in self.out_edges[start:end]]
+
+    def in_edge_ids(self, node_id: NetworkXNodeId) -> list[PageGraphEdgeId]:
+        node_index = self.node_index[node_id]
+        start = self.in_offsets[node_index]
+        end = self.in_offsets[node_index + 1]
+        return [self.edge_id_list[i] for i in self.in_edges[start:end]]
+
+    def successor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        node_index = self.node_index[node_id]
+        start = self.out_offsets[node_index]
+        end = self.out_offsets[node_index + 1]
+        targets = (self.targets[i] for i in self.out_edges[start:end])
+        return [self.node_id_list[i] for i in dict.fromkeys(targets)]
+
+    def predecessor_ids(self, node_id: NetworkXNodeId) -> list[NetworkXNodeId]:
+        node_index = self.node_index[node_id]
+        start = self.in_offsets[node_index]
+        end = self.in_offsets[node_index + 1]
+        sources = (self.sources[i] for i in self.in_edges[start:end])
+        return [self.node_id_list[i] for i in dict.fromkeys(sources)]
+
+    def subgraph(self, node_ids: set[NetworkXNodeId]) -> MultiDiGraph:
+        graph = networkx.MultiDiGraph()
+        graph.graph = self.graph_attrs
+        for node_id in self.node_id_list:
+            if node_id in node_ids:
+                graph.add_node(node_id, **self.node_data(node_id))
+        for source_id, target_id, edge_id in self.edge_keys():
+            if source_id in node_ids and target_id in node_ids:
+                edge_data = dict(self.edge_attrs.view(self.edge_index[edge_id]))
+                graph.add_edges_from([(source_id, target_id, edge_id, edge_data)])
+        return graph
+
+
+class GraphBuilder(ABC):
+    """Receives nodes and edges (in document order) as a graph is parsed,
+    and builds a `GraphStore` from them."""
+
+    graph_attrs: dict[str, Any]
+
+    @abstractmethod
+    def add_node(self, node_id: NetworkXNodeId, data: dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def add_edge(self, source_id: NetworkXNodeId, target_id: NetworkXNodeId,
+                 edge_id: PageGraphEdgeId, data: dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def build(self) -> GraphStore:
+        pass
+
+    def use_lazy_values(self) -> None:
+        """Called before any elements are added, if attribute values might
+        be `LazyValue` placeholders."""
+
+
+class NetworkXGraphBuilder(GraphBuilder):
+    graph: MultiDiGraph
+    node_id_list: list[NetworkXNodeId]
+    """<node> ids, in the order they appear in the document."""
+
+    def __init__(self) -> None:
+        self.graph = networkx.MultiDiGraph()
+        self.graph_attrs = self.graph.graph
+        self.node_id_list = []
+
+    def add_node(self, node_id: NetworkXNodeId, data: dict[str, Any]) -> None:
+        self.graph.add_node(node_id, **data)
+        self.node_id_list.append(node_id)
+
+    def add_edge(self, source_id: NetworkXNodeId, target_id: NetworkXNodeId,
+                 edge_id: PageGraphEdgeId, data: dict[str, Any]) -> None:
+        self.graph.add_edges_from([(source_id, target_id, edge_id, data)])
+
+    def use_lazy_values(self) -> None:
+        self.graph.node_attr_dict_factory = LazyAttrsDict
+        self.graph.edge_attr_dict_factory = LazyAttrsDict
+
+    def restore_node_order(self) -> None:
+        """Edges are added as they're read, which means that a node can be
+        added (implicitly, by an edge) before its <node> element is read.
+        networkx.read_graphml instead adds all nodes before any edges, so
+        this reorders the graph's nodes to match."""
+        graph = self.graph
+        # pylint: disable=protected-access
+        if list(graph._node) == self.node_id_list:
+            return
+        order = list(self.node_id_list)
+        seen = set(order)
+        order += [node_id for node_id in graph._node if node_id not in seen]
+        graph._node = {node_id: graph._node[node_id] for node_id in order}
+        graph._adj = {node_id: graph._adj[node_id] for node_id in order}
+        graph._pred = {node_id: graph._pred[node_id] for node_id in order}
+        graph._succ = graph._adj
+
+    def build(self) -> NetworkXStore:
+        self.restore_node_order()
+        return NetworkXStore(self.graph)
+
+
+class CompactGraphBuilder(GraphBuilder):
+    store: CompactStore
+    edge_source_ids: list[NetworkXNodeId]
+    edge_target_ids: list[NetworkXNodeId]
+
+    def __init__(self) -> None:
+        self.graph_attrs = {}
+        self.store = CompactStore()
+        self.store.node_id_list = []
+        self.store.node_index = {}
+        self.store.node_attrs = AttrsTable()
+        self.store.node_types = TypeCodes()
+        self.store.edge_id_list = []
+        self.store.edge_index = {}
+        self.store.edge_attrs = AttrsTable()
+        self.store.edge_types = TypeCodes()
+        self.edge_source_ids = []
+        self.edge_target_ids = []
+
+    def add_node(self, node_id: NetworkXNodeId, data: dict[str, Any]) -> None:
+        store = self.store
+        if node_id in store.node_index:
+            raise ValueError(f"Duplicate node id: {node_id}")
+        store.node_index[node_id] = len(store.node_id_list)
+        store.node_id_list.append(node_id)
+        store.node_attrs.append(data)
+        store.node_types.append(data.get(NODE_TYPE_ATTR))
+
+    def add_edge(self, source_id: NetworkXNodeId, target_id: NetworkXNodeId,
+                 edge_id: PageGraphEdgeId, data: dict[str, Any]) -> None:
+        store = self.store
+        if edge_id in store.edge_index:
+            raise ValueError(f"Duplicate edge id: {edge_id}")
+        store.edge_index[edge_id] = len(store.edge_id_list)
+        store.edge_id_list.append(edge_id)
+        store.edge_attrs.append(data)
+        store.edge_types.append(data.get(EDGE_TYPE_ATTR))
+        self.edge_source_ids.append(source_id)
+        self.edge_target_ids.append(target_id)
+
+    def build(self) -> CompactStore:
+        store = self.store
+        store.graph_attrs = self.graph_attrs
+        store.node_attrs.finish()
+        store.edge_attrs.finish()
+
+        # Nodes only mentioned by edges are added after all other nodes,
+        # matching networkx.read_graphml.
+        store.sources = array("L")
+        store.targets = array("L")
+        for endpoints, node_ids in ((store.sources, self.edge_source_ids),
+                                    (store.targets, self.edge_target_ids)):
+            for node_id in node_ids:
+                if node_id not in store.node_index:
+                    self.add_node(node_id, {})
+                endpoints.append(store.node_index[node_id])
+        self.edge_source_ids = []
+        self.edge_target_ids = []
+
+        # networkx groups each node's edges by the neighboring node (in the
+        # order each neighbor was first connected to), so do the same here.
+        pair_ranks: dict[tuple[int, int], int] = {}
+        edge_ranks = array("L")
+        for source, target in zip(store.sources, store.targets):
+            edge_ranks.append(pair_ranks.setdefault(
+                (source, target), len(pair_ranks)))
+        del pair_ranks
+
+        num_nodes = len(store.node_id_list)
+        store.out_offsets, store.out_edges = build_csr(
+            num_nodes, store.sources, edge_ranks)
+        store.in_offsets, store.in_edges = build_csr(
+            num_nodes, store.targets, edge_ranks)
+        return store
+
+
+class FilteringGraphBuilder(GraphBuilder):
+    """Wraps another builder, only passing along the parts of the graph
+    described by an `ElementTypes`.
+
+    Edges are kept if their type is one of the wanted edge types. Nodes are
+    kept if their type is one of the wanted node types, or if they're an
+    end of a kept edge (so that kept edges never point at missing nodes).
+    Since that can't be known until all edges are read, nodes are held
+    here until `build()`, and then passed along in document order."""
+
+    builder: GraphBuilder
+    element_types: ElementTypes
+    nodes: list[tuple[NetworkXNodeId, dict[str, Any]]]
+    edge_node_ids: set[NetworkXNodeId]
+    """Ids of the nodes at either end of a kept edge."""
+
+    def __init__(self, builder: GraphBuilder,
+                 element_types: ElementTypes) -> None:
+        self.builder = builder
+        self.graph_attrs = builder.graph_attrs
+        self.element_types = element_types
+        self.nodes = []
+        self.edge_node_ids = set()
+
+    def add_node(self, node_id: NetworkXNodeId, data: dict[str, Any]) -> None:
+        self.nodes.append((node_id, data))
+
+    def add_edge(self, source_id: NetworkXNodeId, target_id: NetworkXNodeId,
+                 edge_id: PageGraphEdgeId, data: dict[str, Any]) -> None:
+        if data.get(EDGE_TYPE_ATTR) not in self.element_types.edge_types:
+            return
+        self.edge_node_ids.add(source_id)
+        self.edge_node_ids.add(target_id)
+        self.builder.add_edge(source_id, target_id, edge_id, data)
+
+    def use_lazy_values(self) -> None:
+        self.builder.use_lazy_values()
+
+    def build(self) -> GraphStore:
+        node_types = self.element_types.node_types
+        for node_id, data in self.nodes:
+            if (data.get(NODE_TYPE_ATTR) in node_types
+                    or node_id in self.edge_node_ids):
+                self.builder.add_node(node_id, data)
+        self.nodes = []
+        self.edge_node_ids = set()
+        return self.builder.build()
+
+
+def build_csr(num_nodes: int, endpoints: array[int],
+              edge_ranks: array[int]) -> tuple[array[int], array[int]]:
+    order = sorted(range(len(endpoints)),
+                   key=lambda i: (endpoints[i], edge_ranks[i]))
+    offsets = array("L", [0] * (num_nodes + 1))
+    for node_index in endpoints:
+        offsets[node_index + 1] += 1
+    for node_index in range(num_nodes):
+        offsets[node_index + 1] += offsets[node_index]
+    return offsets, array("L", order)
+
+
+def builder_for_type(store_type: StoreType) -> GraphBuilder:
+    if store_type == StoreType.COMPACT:
+        return CompactGraphBuilder()
+    return NetworkXGraphBuilder()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC
+from pathlib import Path
+import tempfile
 from typing import TYPE_CHECKING
 import unittest
 
@@ -29,3 +31,25 @@ class PageGraphBaseTestClass(unittest.TestCase, ABC):
             raise ValueError("Inheritors must define NAME")
         graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
         self.graph = pagegraph.graph.from_path(graph_path, True)
+
+
+class ModifiedGraphTestClass(unittest.TestCase, ABC):
+    """Runs tests against a temporary copy of a generated graph, with parts
+    of its GraphML text replaced, for cases the generated graphs don't
+    cover. Each original string must appear in the graph."""
+    GRAPH_NAME = ""
+    REPLACEMENTS: dict[str, str] = {}
+    graph_path: Path
+
+    def setUp(self) -> None:
+        if self.GRAPH_NAME == "":
+            raise ValueError("Inheritors must define GRAPH_NAME")
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.graph_path = Path(tmp_dir.name) / self.GRAPH_NAME
+        source_path = PG_PATHS.generated_graphs() / self.GRAPH_NAME
+        graphml_text = source_path.read_text(encoding="utf8")
+        for original, replacement in self.REPLACEMENTS.items():
+            self.assertIn(original, graphml_text)
+            graphml_text = graphml_text.replace(original, replacement)
+        self.graph_path.write_text(graphml_text, encoding="utf8")
@@ -83,3 +83,21 @@ class AttributesBasicTestCase(PageGraphBaseTestClass):
         acting_script = attr_delete_edge.incoming_node().as_script_local_node()
         self.assertIsNotNone(acting_script)
         self.assertEqual(attr_delete_edge.key(), "id")
+
+    def test_elements_with_attribute(self) -> None:
+        par_node = self.get_par_html_node()
+        self.assertEqual(self.graph.elements_with_attribute("hi"), [par_node])
+        self.assertEqual(
+            self.graph.elements_with_attribute("hi", "again"), [par_node])
+        self.assertEqual(self.graph.elements_with_attribute("hi", "there"), [])
+        self.assertEqual(
+            self.graph.elements_with_attribute_ever("hi", "there"), [par_node])
+        self.assertEqual(self.graph.index_build_counts["attributes"], 1)
+        self.assertEqual(self.graph.index_build_counts["attributes ever"], 1)
+
+    def test_attributes_are_copies(self) -> None:
+        par_node = self.get_par_html_node()
+        par_node.attributes()["hi"] = "changed"
+        par_node.attributes_ever()["hi"].append("changed")
+        self.assertEqual(par_node.get_attribute("hi"), "again")
+        self.assertEqual(par_node.get_attribute_ever("hi"), ["there", "again"])
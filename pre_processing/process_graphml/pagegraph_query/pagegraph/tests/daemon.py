@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING
+import unittest
+import unittest.mock
+
+import pagegraph.commands
+import pagegraph.commands.requests
+import pagegraph.commands.scripts
+import pagegraph.daemon
+import pagegraph.tests.util.paths as PG_PATHS
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+GRAPH_PATH = PG_PATHS.generated_graphs() / "localstorage-complicated.graphml"
+OTHER_GRAPH_PATH = PG_PATHS.generated_graphs() / "attrs-basic.graphml"
+
+
+class SlowCommand(pagegraph.commands.scripts.Command):
+    def execute(self) -> pagegraph.commands.Result:
+        time.sleep(10)
+        return super().execute()
+
+
+def build_command(name: str, input_path: Path,
+                  argv: list[str]) -> pagegraph.commands.Base:
+    match name:
+        case "scripts":
+            return pagegraph.commands.scripts.Command(
+                input_path, None, None, False, False, False)
+        case "requests":
+            return pagegraph.commands.requests.Command(
+                input_path, argv[1] if argv else None)
+        case "slow":
+            return SlowCommand(input_path, None, None, False, False, False)
+        case _:
+            raise ValueError(f"Unknown command name: {name}")
+
+
+class GraphCacheTestCase(unittest.TestCase):
+    def test_reuses_graph(self) -> None:
+        cache = pagegraph.daemon.GraphCache(1024 ** 3)
+        self.assertIs(cache.get(GRAPH_PATH), cache.get(GRAPH_PATH))
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = pagegraph.daemon.GraphCache(0)
+        cache.get(GRAPH_PATH)
+        cache.get(OTHER_GRAPH_PATH)
+        self.assertEqual(list(cache.graphs.keys()),
+                         [OTHER_GRAPH_PATH.resolve()])
+
+    def test_evicts_while_over_rss_budget(self) -> None:
+        # The resident size is what's checked, since it still reflects
+        # graphs loaded into memory freed by earlier evictions.
+        rss_bytes = [1000]
+        with unittest.mock.patch.object(
+                pagegraph.daemon, "current_rss_bytes", lambda: rss_bytes[0]):
+            cache = pagegraph.daemon.GraphCache(500)
+            cache.get(GRAPH_PATH)
+            rss_bytes[0] = 1400
+            cache.get(OTHER_GRAPH_PATH)
+            self.assertEqual(len(cache.graphs), 2)
+
+            rss_bytes[0] = 1600
+            cache.evict()
+            self.assertEqual(list(cache.graphs.keys()),
+                             [OTHER_GRAPH_PATH.resolve()])
+
+    def test_graphs_dont_share_caches(self) -> None:
+        cache = pagegraph.daemon.GraphCache(1024 ** 3)
+        pg = cache.get(GRAPH_PATH)
+        other_pg = cache.get(OTHER_GRAPH_PATH)
+        for graph in (pg, other_pg):
+            for domroot_node in graph.domroot_nodes():
+                self.assertIs(domroot_node.pg, graph)
+                self.assertIs(
+                    graph.domroot_for_frame_id(domroot_node.frame_id()).pg,
+                    graph)
+        self.assertNotEqual(len(pg.request_start_edges()),
+                            len(other_pg.request_start_edges()))
+
+    def test_args_to_argv(self) -> None:
+        argv = pagegraph.daemon.args_to_argv(
+            {"frame": "n12", "at_serialization": True, "body_content": False})
+        self.assertEqual(argv, ["--frame", "n12", "--at-serialization"])
+
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = pagegraph.daemon.Server(
+            build_command, 1024 ** 3, 1024 ** 4, 5)
+
+    def tearDown(self) -> None:
+        self.server.close()
+
+    def test_matches_single_command(self) -> None:
+        request = json.dumps({
+            "id": 7, "graph": str(GRAPH_PATH), "command": "scripts"})
+        response = json.loads(self.server.respond(request))
+        self.assertEqual(response["id"], 7)
+        self.assertTrue(response["ok"])
+
+        command = build_command("scripts", GRAPH_PATH, [])
+        expected = json.loads(command.execute().to_json())
+        self.assertEqual(response["result"], expected)
+
+    def test_cached_graphs_answer_independently(self) -> None:
+        # Loading a second graph into the worker's cache must not change
+        # the answers for the first.
+        request = json.dumps({"graph": str(GRAPH_PATH), "command": "requests"})
+        other_request = json.dumps(
+            {"graph": str(OTHER_GRAPH_PATH), "command": "requests"})
+        first_response = json.loads(self.server.respond(request))
+        other_response = json.loads(self.server.respond(other_request))
+        self.assertTrue(first_response["ok"])
+        self.assertTrue(other_response["ok"])
+        self.assertNotEqual(len(first_response["result"]["report"]),
+                            len(other_response["result"]["report"]))
+        self.assertEqual(json.loads(self.server.respond(request)),
+                         first_response)
+
+    def test_errors_dont_stop_server(self) -> None:
+        requests = [
+            {"id": 1, "graph": str(GRAPH_PATH), "command": "unknown"},
+            {"id": 2, "command": "scripts"},
+            {"id": 3, "graph": str(GRAPH_PATH), "command": "requests",
+             "args": {"frame": "e12"}},
+            {"id": 4, "graph": str(GRAPH_PATH), "command": "requests"},
+        ]
+        lines = "\n".join(json.dumps(request) for request in requests)
+        output = io.StringIO()
+        self.server.serve_stream(io.StringIO(lines), output)
+
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1, 2, 3, 4])
+        self.assertEqual([r["ok"] for r in responses], [False] * 3 + [True])
+
+    def test_dead_worker_restarts(self) -> None:
+        request = json.dumps({"graph": str(GRAPH_PATH), "command": "scripts"})
+        self.assertTrue(json.loads(self.server.respond(request))["ok"])
+        # Simulate the worker dying after the liveness check, by closing
+        # the worker's end of the pipe without the server noticing.
+        worker = self.server.workers[0]
+        assert worker.process
+        worker.process.is_alive = lambda: True  # type: ignore
+        worker.process.kill()
+        worker.process.join()
+        response = json.loads(self.server.respond(request))
+        self.assertFalse(response["ok"])
+        self.assertIn("exited", response["error"])
+        self.assertIsNone(worker.process)
+        self.assertTrue(json.loads(self.server.respond(request))["ok"])
+
+    def test_timeout_restarts_worker(self) -> None:
+        worker = self.server.workers[0]
+        worker.timeout = 0.5
+        slow = json.dumps({"graph": str(GRAPH_PATH), "command": "slow"})
+        response = json.loads(self.server.respond(slow))
+        self.assertFalse(response["ok"])
+        self.assertIn("timed out", response["error"])
+        self.assertIsNone(worker.process)
+
+        worker.timeout = 30
+        request = json.dumps({"graph": str(GRAPH_PATH), "command": "scripts"})
+        self.assertTrue(json.loads(self.server.respond(request))["ok"])
+
+
+class SocketServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = Path(self.tmp_dir.name) / "pg.sock"
+        self.server = pagegraph.daemon.Server(
+            build_command, 1024 ** 3, 1024 ** 4, 30, num_workers=2)
+        self.thread = threading.Thread(
+            target=self.server.serve_unix_socket, args=(self.socket_path,),
+            daemon=True)
+        self.thread.start()
+        while not self.socket_path.exists():
+            time.sleep(0.01)
+
+    def tearDown(self) -> None:
+        self.server.close()
+        self.tmp_dir.cleanup()
+
+    def query(self, request: dict[str, Any]) -> dict[str, Any]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(self.socket_path))
+            with sock.makefile("rwb") as stream:
+                stream.write((json.dumps(request) + "\n").encode("utf8"))
+                stream.flush()
+                return json.loads(stream.readline())
+
+    def test_answers_clients_in_parallel(self) -> None:
+        # While one worker is busy with a slow request, the other still
+        # answers queries from other clients.
+        slow_thread = threading.Thread(target=self.query, daemon=True, args=(
+            {"graph": str(GRAPH_PATH), "command": "slow"},))
+        slow_thread.start()
+        time.sleep(0.5)
+        start = time.monotonic()
+        response = self.query({"graph": str(GRAPH_PATH), "command": "scripts"})
+        self.assertTrue(response["ok"])
+        self.assertLess(time.monotonic() - start, 5)
@@ -0,0 +1,147 @@
+import json
+from pathlib import Path
+
+import pagegraph.commands.element
+import pagegraph.commands.html
+import pagegraph.serialize
+from pagegraph.graph.edge import Edge
+import pagegraph.tests.util.paths as PG_PATHS
+from pagegraph.tests import PageGraphBaseTestClass
+
+
+class ElementBatchTestCase(PageGraphBaseTestClass):
+    NAME = "gen/localstorage-complicated"
+
+    def test_batch_matches_single(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        pg_ids = [node.pg_id() for node in self.graph.script_local_nodes()]
+        pg_ids += [edge.pg_id() for edge in self.graph.request_start_edges()]
+        self.assertGreater(len(pg_ids), 1)
+
+        command = pagegraph.commands.element.Command(
+            graph_path, pg_ids, 1, None, False)
+        command.pg = self.graph
+        batch_result = command.execute()
+        assert isinstance(batch_result, pagegraph.commands.element.Results)
+        lines = list(batch_result.to_json_lines())
+        self.assertEqual(len(lines), len(pg_ids))
+
+        for pg_id, line in zip(pg_ids, lines):
+            single_command = pagegraph.commands.element.Command(
+                graph_path, pg_id, 1, None, False)
+            single_command.pg = self.graph
+            single_result = single_command.execute()
+            self.assertEqual(line, single_result.to_json())
+            self.assertEqual(json.loads(line)["report"]["id"], pg_id)
+
+    def test_batch_reports_unknown_ids(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        command = pagegraph.commands.element.Command(
+            graph_path, ["n1", "e999999"], 0, None, False)
+        command.pg = self.graph
+        lines = list(command.execute().to_json_lines())
+        self.assertEqual(json.loads(lines[0])["report"]["id"], "n1")
+        self.assertEqual(json.loads(lines[1])["id"], "e999999")
+        self.assertIn("error", json.loads(lines[1]))
+
+    def test_batch_of_one(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        command = pagegraph.commands.element.Command(
+            graph_path, ["e999999"], 0, None, False)
+        command.pg = self.graph
+        result = command.execute()
+        assert isinstance(result, pagegraph.commands.element.Results)
+        lines = list(result.to_json_lines())
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["id"], "e999999")
+        self.assertIn("error", json.loads(lines[0]))
+
+
+class TypedAdjacencyTestCase(PageGraphBaseTestClass):
+    NAME = "gen/script-cross_dom"
+
+    def test_matches_unindexed_edges(self) -> None:
+        all_types = list(Edge.Types)
+        for node in self.graph.nodes():
+            for edge_type in all_types:
+                self.assertEqual(
+                    node.outgoing_edges_of_type(edge_type),
+                    [e for e in node.outgoing_edges()
+                     if e.edge_type() == edge_type])
+                self.assertEqual(
+                    node.incoming_edges_of_type(edge_type),
+                    [e for e in node.incoming_edges()
+                     if e.edge_type() == edge_type])
+            self.assertEqual(node.outgoing_edges_of_type(*all_types),
+                             list(node.outgoing_edges()))
+            self.assertEqual(node.incoming_edges_of_type(*all_types),
+                             list(node.incoming_edges()))
+
+
+
+class SerializationStateTestCase(PageGraphBaseTestClass):
+    NAME = "gen/iframes-sub_document"
+
+    def test_matches_walking_up_the_tree(self) -> None:
+        num_body_content = 0
+        for node in self.graph.dom_nodes():
+            parent_node = node.parent_at_serialization()
+            self.assertEqual(node.is_present_at_serialization(),
+                             parent_node is not None)
+
+            # Walk up through HTML elements, looking for <body>.
+            is_body_content = False
+            needle_node = parent_node
+            while html_node := needle_node and needle_node.as_html_node():
+                if html_node.tag_name() == "BODY":
+                    is_body_content = True
+                    break
+                needle_node = html_node.parent_at_serialization()
+            self.assertEqual(node.is_body_content(), is_body_content)
+            num_body_content += int(is_body_content)
+
+            # Walk up through anything, looking for the closest DOM root.
+            needle_node = parent_node
+            while needle_node and not needle_node.as_domroot_node():
+                needle_node = needle_node.parent_at_serialization()
+            if needle_node:
+                self.assertEqual(node.domroot_for_serialization(), needle_node)
+        self.assertGreater(num_body_content, 0)
+
+
+class HTMLCreatorsTestCase(PageGraphBaseTestClass):
+    NAME = "gen/localstorage-complicated"
+
+    def test_tags_and_creators(self) -> None:
+        command = pagegraph.commands.html.Command(
+            Path(), None, False, False, False, self.graph,
+            tags=["script", "IMG"], include_creators=True)
+        elements = command.execute().report.elements
+        self.assertEqual([element.id for element in elements],
+                         ["n87", "n156", "n227", "n279"])
+        for element in elements:
+            self.assertEqual(element.tag, "SCRIPT")
+            node = self.graph.node(element.id).as_dom_element_node()
+            assert node is not None
+            creator_node = node.creator_node()
+            self.assertEqual(element.creator_id, creator_node.pg_id())
+            self.assertEqual(element.creator_type,
+                             creator_node.node_type().value)
+
+        inserted_script = elements[3]
+        self.assertEqual(inserted_script.creator_type, "script")
+        self.assertEqual(inserted_script.attrs["src"],
+                         "/assets/js/localstorage-stress.js?2")
+        self.assertEqual(inserted_script.url,
+                         "http://[::]:8000/assets/js/localstorage-stress.js?2")
+        self.assertIsNone(elements[0].url)
+
+        command = pagegraph.commands.html.Command(
+            Path(), None, False, False, False, self.graph)
+        all_elements = command.execute().report.elements
+        self.assertEqual(
+            [element for element in all_elements
+             if element.id in ("n87", "n156", "n227", "n279")],
+            [pagegraph.serialize.DOMElementReport(
+                element.id, element.tag, element.attrs)
+             for element in elements])
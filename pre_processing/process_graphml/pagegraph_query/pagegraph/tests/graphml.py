@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+import shutil
+import tempfile
+from typing import TYPE_CHECKING
+import unittest
+
+import networkx
+
+import pagegraph.commands.requests
+import pagegraph.commands.scripts
+import pagegraph.graph
+from pagegraph.graphml import GraphMLFileSource, GraphMLStreamReader
+from pagegraph.graphml import load_from_path
+from pagegraph.graphml import pagegraph_version_from_graphml_file
+from pagegraph.graphml import url_from_graphml_file
+from pagegraph.store import builder_for_type, CompactStore, LazyValue
+from pagegraph.store import NetworkXStore
+import pagegraph.tests.util.paths as PG_PATHS
+from pagegraph.types import StoreType
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from pagegraph.store import GraphStore
+
+
+class GraphMLStreamReaderTestCase(unittest.TestCase):
+    def test_matches_networkx(self) -> None:
+        graph_paths = sorted(PG_PATHS.graphs().glob("*/*.graphml"))
+        self.assertNotEqual(len(graph_paths), 0)
+        for graph_path in graph_paths:
+            expected = networkx.read_graphml(graph_path)
+            for store_type in StoreType:
+                with self.subTest(graph=graph_path.name, store=store_type):
+                    reader = GraphMLStreamReader(builder_for_type(store_type))
+                    with graph_path.open("rb") as handle:
+                        store = reader.read(handle)
+
+                    self.assertEqual(store.graph_attrs, expected.graph)
+                    self.assertEqual(list(store.node_ids()),
+                                     list(expected.nodes()))
+                    self.assertEqual(list(store.edge_keys()),
+                                     list(expected.edges(keys=True)))
+                    for node_id, node_data in expected.nodes(data=True):
+                        self.assertEqual(dict(store.node_data(node_id)),
+                                         node_data)
+                        self.assertEqual(
+                            store.out_edge_ids(node_id),
+                            [k for _, _, k in expected.out_edges(node_id, keys=True)])
+                        self.assertEqual(
+                            store.in_edge_ids(node_id),
+                            [k for _, _, k in expected.in_edges(node_id, keys=True)])
+                        self.assertEqual(store.predecessor_ids(node_id),
+                                         list(expected.pred[node_id]))
+                    for *edge_key, edge_data in expected.edges(keys=True,
+                                                               data=True):
+                        self.assertEqual(dict(store.edge_data(tuple(edge_key))),
+                                         edge_data)
+
+    def test_reads_description(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "attrs-basic.graphml"
+        pg = pagegraph.graph.from_path(graph_path)
+        self.assertEqual(str(pg.graph_version), "0.7.3")
+        self.assertEqual(pg.url, "http://[::]:8000/attrs-basic.html")
+
+
+class CompactStoreTestCase(unittest.TestCase):
+    def test_subgraph_matches_networkx(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        nx_pg = pagegraph.graph.from_path(graph_path, True, StoreType.NETWORKX)
+        compact_pg = pagegraph.graph.from_path(
+            graph_path, True, StoreType.COMPACT)
+        for pg_id in ("n1", "n17", "e93"):
+            nx_elm = nx_pg.node(pg_id) if pg_id[0] == "n" else nx_pg.edge(pg_id)
+            compact_elm = (compact_pg.node(pg_id) if pg_id[0] == "n"
+                           else compact_pg.edge(pg_id))
+            # networkx's subgraph views don't have a stable node order, so
+            # just compare the contents.
+            nx_subgraph = nx_elm.subgraph(2)
+            compact_subgraph = compact_elm.subgraph(2)
+            self.assertEqual(sorted(nx_subgraph.nodes(data=True)),
+                             sorted(compact_subgraph.nodes(data=True)))
+            self.assertEqual(
+                sorted(nx_subgraph.edges(keys=True, data=True),
+                       key=lambda x: x[2]),
+                sorted(compact_subgraph.edges(keys=True, data=True),
+                       key=lambda x: x[2]))
+
+
+def raw_attr_values(store: GraphStore) -> list[Any]:
+    if isinstance(store, CompactStore):
+        return list(store.node_attrs.values) + list(store.edge_attrs.values)
+    assert isinstance(store, NetworkXStore)
+    values: list[Any] = []
+    for _, node_data in store.graph.nodes(data=True):
+        values += dict.values(node_data)
+    for *_, edge_data in store.graph.edges(keys=True, data=True):
+        values += dict.values(edge_data)
+    return values
+
+
+class LazyAttrsTestCase(unittest.TestCase):
+    def test_matches_eager_values(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        for store_type in StoreType:
+            with self.subTest(store=store_type):
+                expected = load_from_path(graph_path, store_type).store
+                source = GraphMLFileSource(graph_path)
+                reader = GraphMLStreamReader(
+                    builder_for_type(store_type), source, lazy_min_length=0)
+                with graph_path.open("rb") as handle:
+                    store = reader.read(handle)
+                self.assertIsNone(source.handle)
+                lazy_values = [value for value in raw_attr_values(store)
+                               if isinstance(value, LazyValue)]
+                self.assertNotEqual(len(lazy_values), 0)
+
+                for node_id in expected.node_ids():
+                    self.assertEqual(dict(store.node_data(node_id)),
+                                     dict(expected.node_data(node_id)))
+                for edge_key in expected.edge_keys():
+                    self.assertEqual(dict(store.edge_data(edge_key)),
+                                     dict(expected.edge_data(edge_key)))
+                # Values are only read from the file once.
+                self.assertFalse(any(isinstance(value, LazyValue)
+                                     for value in raw_attr_values(store)))
+                source.close()
+
+    def test_accessors_match(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        eager_pg = pagegraph.graph.from_path(graph_path, lazy_attrs=False)
+        lazy_pg = pagegraph.graph.from_path(graph_path, lazy_attrs=True)
+        for eager_node, lazy_node in zip(eager_pg.script_local_nodes(),
+                                         lazy_pg.script_local_nodes()):
+            self.assertEqual(eager_node.source(), lazy_node.source())
+        for eager_edge, lazy_edge in zip(eager_pg.js_call_edges(),
+                                         lazy_pg.js_call_edges()):
+            self.assertEqual(eager_edge.args(), lazy_edge.args())
+
+
+class CompressedGraphMLTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        self.gz_path = Path(self.tmp_dir.name) / "script-js_calls.graphml.gz"
+        with self.graph_path.open("rb") as f_in:
+            with gzip.open(self.gz_path, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_reads_headers(self) -> None:
+        self.assertEqual(url_from_graphml_file(self.gz_path),
+                         url_from_graphml_file(self.graph_path))
+        self.assertEqual(pagegraph_version_from_graphml_file(self.gz_path),
+                         pagegraph_version_from_graphml_file(self.graph_path))
+
+    def test_matches_uncompressed(self) -> None:
+        expected_pg = pagegraph.graph.from_path(self.graph_path)
+        expected = pagegraph.commands.scripts.Command(
+            self.graph_path, None, None, False, False, False)
+        expected.pg = expected_pg
+        # The second cached load reads back the snapshot the first wrote.
+        for use_cache in (False, True, True):
+            with self.subTest(use_cache=use_cache):
+                pg = pagegraph.graph.from_path(
+                    self.gz_path, use_cache=use_cache, lazy_attrs=True)
+                self.assertEqual(pg.url, expected_pg.url)
+                command = pagegraph.commands.scripts.Command(
+                    self.gz_path, None, None, False, False, False)
+                command.pg = pg
+                self.assertEqual(command.execute().to_json(),
+                                 expected.execute().to_json())
+
+
+class ElementTypesTestCase(unittest.TestCase):
+    def test_only_loads_needed_types(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        command = pagegraph.commands.requests.Command(graph_path, None)
+        element_types = command.element_types()
+        assert element_types
+        for store_type in StoreType:
+            with self.subTest(store=store_type):
+                full_store = load_from_path(graph_path, store_type).store
+                store = load_from_path(graph_path, store_type,
+                                       element_types=element_types).store
+                full_edge_types = {full_store.edge_type_name(edge_key)
+                                   for edge_key in full_store.edge_keys()}
+                edge_types = {store.edge_type_name(edge_key)
+                              for edge_key in store.edge_keys()}
+                self.assertIn("js call", full_edge_types)
+                self.assertEqual(edge_types,
+                                 full_edge_types & element_types.edge_types)
+
+                # Nodes of other types are only kept if an edge needs them.
+                node_ids = set(store.node_ids())
+                for source_id, target_id, _ in store.edge_keys():
+                    self.assertIn(source_id, node_ids)
+                    self.assertIn(target_id, node_ids)
+                self.assertNotIn("JS builtin", {
+                    store.node_type_name(node_id) for node_id in node_ids})
+
+    def test_matches_full_graph(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        command = pagegraph.commands.requests.Command(graph_path, None)
+        filtered_json = command.execute().to_json()
+        command.pg = pagegraph.graph.from_path(graph_path)
+        self.assertEqual(filtered_json, command.execute().to_json())
@@ -243,3 +243,20 @@ class IFramesIsTopLevelDOMRootTestCase(PageGraphBaseTestClass):
         assert frame
         domroot_node = frame.domroot_node()
         self.assertFalse(domroot_node.is_top_level_domroot())
+
+    def test_frame_tree(self) -> None:
+        for domroot_node in self.graph.domroot_nodes():
+            top_level_domroot_node = domroot_node
+            while parent := top_level_domroot_node.parent_domroot_node():
+                top_level_domroot_node = parent
+            self.assertIs(domroot_node.top_level_domroot_node(),
+                          top_level_domroot_node)
+            self.assertTrue(top_level_domroot_node.is_top_level_domroot())
+
+            report = domroot_node.to_report()
+            self.assertIs(domroot_node.to_report(), report)
+            self.assertEqual(report.main_frame,
+                             domroot_node.is_top_level_domroot())
+            self.assertEqual(report.security_origin,
+                             domroot_node.security_origin())
+        self.assertEqual(self.graph.index_build_counts["frames"], 1)
@@ -1,3 +1,6 @@
+from pathlib import Path
+
+import pagegraph.commands.storage
 from pagegraph.tests import PageGraphBaseTestClass
 
 
@@ -45,6 +48,23 @@ class LocalStorageBasicTestCase(PageGraphBaseTestClass):
         self.assertIsNotNone(
             storage_clear_edge.outgoing_node().as_local_storage_node())
 
+    def test_storage_command(self) -> None:
+        command = pagegraph.commands.storage.Command(Path())
+        command.pg = self.graph
+        rows = command.execute().report
+        self.assertEqual(
+            [(row.event_type, row.storage_key, row.storage_value)
+             for row in rows],
+            [("storage set", "test", "\"value\""),
+             ("storage set", "other", "\"newer\""),
+             ("delete storage", "test", None),
+             ("clear storage", "", None)])
+        script_node = self.graph.storage_clear_edges()[0].incoming_node()
+        for row in rows:
+            self.assertEqual(row.storage_type, "local storage")
+            self.assertEqual(row.caller_id, script_node.pg_id())
+            self.assertEqual(row.script_type, "inline")
+
 
 # pylint: disable=too-few-public-methods
 class LocalStorageCrossFrameTestCase(PageGraphBaseTestClass):
@@ -0,0 +1,88 @@
+import contextlib
+import gzip
+import io
+import json
+from pathlib import Path
+import shutil
+import tempfile
+
+import pagegraph.commands.cookies
+import pagegraph.commands.multi
+import pagegraph.commands.requests
+import pagegraph.commands.scripts
+import pagegraph.tests.util.paths as PG_PATHS
+from pagegraph.tests import PageGraphBaseTestClass
+
+
+class NotAResultCommand(pagegraph.commands.requests.Command):
+    def execute(self) -> pagegraph.commands.Result:
+        return {}  # type: ignore[return-value]
+
+
+class MultiCommandTestCase(PageGraphBaseTestClass):
+    NAME = "gen/localstorage-complicated"
+
+    def build_commands(self) -> dict[str, pagegraph.commands.Base]:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        return {
+            "cookies": pagegraph.commands.cookies.Command(
+                graph_path, None, None, None),
+            "requests": pagegraph.commands.requests.Command(
+                graph_path, None),
+            "scripts": pagegraph.commands.scripts.Command(
+                graph_path, None, None, False, False, False),
+        }
+
+    def test_shares_graph(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        commands = self.build_commands()
+        multi_command = pagegraph.commands.multi.Command(
+            graph_path, commands, None)
+        multi_command.pg = self.graph
+        result = multi_command.execute()
+
+        self.assertEqual(set(result.results.keys()), set(commands.keys()))
+        for command in commands.values():
+            self.assertIs(command.pg, self.graph)
+
+    def test_matches_single_commands(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        multi_command = pagegraph.commands.multi.Command(
+            graph_path, self.build_commands(), None)
+        combined = json.loads(multi_command.execute().to_json())
+
+        for name, command in self.build_commands().items():
+            single = json.loads(command.execute().to_json())
+            self.assertEqual(combined[name], single)
+
+    def test_skips_commands_not_returning_results(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        commands = self.build_commands()
+        commands["broken"] = NotAResultCommand(graph_path, None)
+        multi_command = pagegraph.commands.multi.Command(
+            graph_path, commands, None)
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            result = multi_command.execute()
+            combined = json.loads(result.to_json())
+
+        self.assertIn("'broken' failed", stderr.getvalue())
+        self.assertEqual(set(combined.keys()), {"cookies", "requests", "scripts"})
+
+    def test_out_dir_names_compressed_graphs(self) -> None:
+        graph_path = PG_PATHS.graphs() / (self.NAME + ".graphml")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_dir = Path(tmp_dir)
+            gz_path = out_dir / "localstorage-complicated.graphml.gz"
+            with graph_path.open("rb") as f_in:
+                with gzip.open(gz_path, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+
+            commands = self.build_commands()
+            multi_command = pagegraph.commands.multi.Command(
+                gz_path, commands, out_dir)
+            self.assertIsNone(multi_command.format(multi_command.execute()))
+
+            report_names = sorted(path.name for path in out_dir.iterdir()
+                                  if path.suffix == ".json")
+            self.assertEqual(report_names, sorted(
+                f"localstorage-complicated.{name}.json" for name in commands))
@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pagegraph.commands.requests
+import pagegraph.commands.scripts
+import pagegraph.graph
+import pagegraph.pgcache
+import pagegraph.tests.util.paths as PG_PATHS
+
+
+GRAPH_NAME = "script-js_calls.graphml"
+
+
+class PGCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.graph_path = Path(self.tmp_dir.name) / GRAPH_NAME
+        shutil.copy(PG_PATHS.generated_graphs() / GRAPH_NAME, self.graph_path)
+        self.cache_path = pagegraph.pgcache.cache_path_for(self.graph_path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def load(self) -> pagegraph.graph.PageGraph:
+        return pagegraph.graph.from_path(self.graph_path, use_cache=True)
+
+    def test_snapshot_matches_graphml(self) -> None:
+        parsed_pg = self.load()
+        self.assertTrue(self.cache_path.is_file())
+        cached_pg = self.load()
+        self.assertIsNotNone(cached_pg.store.mapping)
+
+        for pg in (parsed_pg, cached_pg):
+            self.assertEqual(str(pg.graph_version), "0.7.3")
+            self.assertEqual(pg.url, "http://[::]:8000/script-js_calls.html")
+
+        graphml_pg = pagegraph.graph.from_path(self.graph_path, use_cache=False)
+        commands = [
+            pagegraph.commands.scripts.Command(
+                self.graph_path, None, None, False, False, False),
+            pagegraph.commands.requests.Command(self.graph_path, None),
+        ]
+        for command in commands:
+            command.pg = graphml_pg
+            expected = command.execute().to_json()
+            command.pg = cached_pg
+            self.assertEqual(command.execute().to_json(), expected)
+
+    def test_snapshot_invalidation(self) -> None:
+        self.load()
+        stat = self.graph_path.stat()
+
+        # Only touching the file doesn't invalidate the snapshot, since the
+        # content hash still matches.
+        os.utime(self.graph_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10))
+        self.assertIsNotNone(
+            pagegraph.pgcache.read(self.cache_path, self.graph_path))
+
+        with self.graph_path.open("a", encoding="utf8") as handle:
+            handle.write("\n")
+        self.assertIsNone(
+            pagegraph.pgcache.read(self.cache_path, self.graph_path))
+
+    def test_close_releases_snapshot(self) -> None:
+        self.load()
+        with self.load() as pg:
+            mapping = pg.store.mapping
+            self.assertIsNotNone(mapping)
+            self.assertNotEqual(len(pg.script_local_nodes()), 0)
+        self.assertIsNone(pg.store.mapping)
+        self.assertTrue(mapping is not None and mapping.closed)
+
+    def test_invalid_snapshot_closes_mapping(self) -> None:
+        self.load()
+        snapshot = self.cache_path.read_bytes()
+        # Renaming a section (keeping the header's length) makes the
+        # snapshot fail part way through reading it, and truncating it
+        # makes it fail before the header is even found.
+        self.assertIn(b'"strings_data"', snapshot)
+        invalid_snapshots = [
+            snapshot.replace(b'"strings_data"', b'"strings_dat_"'),
+            snapshot[:4],
+        ]
+        real_mmap = pagegraph.pgcache.mmap.mmap
+        for invalid_snapshot in invalid_snapshots:
+            self.cache_path.write_bytes(invalid_snapshot)
+            mappings = []
+
+            def record_mmap(*args: object, **kwargs: object) -> object:
+                mappings.append(real_mmap(*args, **kwargs))  # type: ignore
+                return mappings[-1]
+
+            with mock.patch.object(pagegraph.pgcache.mmap, "mmap",
+                                   record_mmap):
+                self.assertIsNone(
+                    pagegraph.pgcache.read(self.cache_path, self.graph_path))
+            self.assertEqual(len(mappings), 1)
+            self.assertTrue(mappings[0].closed)
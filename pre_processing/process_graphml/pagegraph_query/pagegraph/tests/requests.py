@@ -0,0 +1,116 @@
+import unittest
+
+import pagegraph.commands.requests
+import pagegraph.commands.requests_with_initiator
+import pagegraph.graph
+from pagegraph.tests import ModifiedGraphTestClass
+import pagegraph.tests.util.paths as PG_PATHS
+from pagegraph.types import StoreType
+
+
+GRAPH_NAME = "attrs-basic.graphml"
+
+# Replaces the only request in the graph (a fetch of favicon.ico that
+# completes with edge e92) with one that is redirected to a second resource,
+# and then back to the favicon resource, before completing.
+ORIGINAL_COMPLETE_EDGE = '<edge id="e92" source="n90" target="n48">'
+REDIRECTED_COMPLETE_EDGE = '<edge id="e302" source="n90" target="n48">'
+REDIRECT_ELEMENTS = (
+    '<node id="n200"><data key="d23">resource</data><data key="d25">200</data>'
+    '<data key="d27">89</data>'
+    '<data key="d43">http://[::]:8000/moved.ico</data></node>'
+    '<edge id="e300" source="n90" target="n200">'
+    '<data key="d9">request redirect</data><data key="d24">300</data>'
+    '<data key="d26">90</data><data key="d30">2</data>'
+    '<data key="d11">9</data><data key="d31">Resource</data></edge>'
+    '<edge id="e301" source="n200" target="n90">'
+    '<data key="d9">request redirect</data><data key="d24">301</data>'
+    '<data key="d26">90</data><data key="d30">2</data>'
+    '<data key="d11">9</data><data key="d31">Resource</data></edge>')
+
+
+class RequestChainTestCase(ModifiedGraphTestClass):
+    GRAPH_NAME = GRAPH_NAME
+    REPLACEMENTS = {
+        ORIGINAL_COMPLETE_EDGE: REDIRECT_ELEMENTS + REDIRECTED_COMPLETE_EDGE,
+    }
+
+    def test_redirect_back_to_resource(self) -> None:
+        for store_type in StoreType:
+            pg = pagegraph.graph.from_path(
+                self.graph_path, True, store_type=store_type)
+            chain = pg.request_chain_for_id(2)
+            self.assertEqual(chain.request.pg_id(), "e91")
+            self.assertEqual([e.pg_id() for e in chain.redirects],
+                             ["e300", "e301"])
+            assert chain.result is not None
+            self.assertEqual(chain.result.pg_id(), "e302")
+            self.assertEqual(chain.redirects[0].url(),
+                             "http://[::]:8000/moved.ico")
+            self.assertEqual(chain.final_url(),
+                             "http://[::]:8000/favicon.ico")
+
+
+class LazyIndexTestCase(unittest.TestCase):
+    def test_indexes_built_on_first_use(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / GRAPH_NAME
+        pg = pagegraph.graph.from_path(graph_path)
+        self.assertEqual(pg.index_build_counts, {})
+
+        pg.script_local_nodes()[0].calls()
+        self.assertEqual(pg.index_build_counts, {})
+
+        request_id = pg.request_start_edges()[0].request_id()
+        for _ in range(2):
+            pg.request_chain_for_id(request_id)
+        self.assertEqual(pg.index_build_counts, {"request chains": 1})
+
+    def test_request_chains_for_hash(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / GRAPH_NAME
+        pg = pagegraph.graph.from_path(graph_path)
+        request_chains = pg.unattributed_requests()
+        self.assertNotEqual(len(request_chains), 0)
+        for request_chain in request_chains:
+            response_hash = request_chain.hash()
+            assert response_hash is not None
+            self.assertIn(request_chain,
+                          pg.request_chains_for_hash(response_hash))
+        self.assertEqual(pg.request_chains_for_hash("not a hash"), [])
+        self.assertEqual(pg.index_build_counts["response hashes"], 1)
+
+
+class RequestInitiatorTestCase(ModifiedGraphTestClass):
+    GRAPH_NAME = "script-js_calls.graphml"
+    # Attributes the parser's request for the favicon to an inline script
+    # instead, so that one of the requests has a script initiator.
+    REPLACEMENTS = {
+        '<edge id="e227" source="n48" target="n226">':
+            '<edge id="e227" source="n195" target="n226">',
+    }
+
+    def test_initiators(self) -> None:
+        pg = pagegraph.graph.from_path(self.graph_path)
+        command = pagegraph.commands.requests_with_initiator.Command(
+            self.graph_path, None)
+        command.pg = pg
+        reports = command.execute().report
+        initiators = {
+            report.request.request.id: (report.initiator.id,
+                                        report.initiator.type,
+                                        report.initiator.hash)
+            for report in reports}
+        script_node = pg.node("n195").as_script_local_node()
+        assert script_node is not None
+        self.assertEqual(initiators, {
+            "e227": ("n195", "script", script_node.hash()),
+            "e105": ("n100", "HTML element", None),
+            "e130": ("n124", "HTML element", None),
+        })
+
+        requests_command = pagegraph.commands.requests.Command(
+            self.graph_path, None)
+        requests_command.pg = pg
+        self.assertEqual(
+            [(report.request, report.frame) for report in reports],
+            [(report.request, report.frame)
+             for report in requests_command.execute().report])
@@ -1,4 +1,16 @@
+import json
+from pathlib import Path
+import random
+import unittest
+
+import pagegraph.commands.fingerprinting
+import pagegraph.commands.js_calls
+import pagegraph.commands.script_tree
+from pagegraph.graph.js import pair_calls_and_results
+from pagegraph.graph.js import pair_calls_and_results_python
+from pagegraph.tests import ModifiedGraphTestClass
 from pagegraph.tests import PageGraphBaseTestClass
+import pagegraph.tests.util.paths as PG_PATHS
 
 
 # pylint: disable=too-few-public-methods
@@ -64,3 +76,149 @@ class ScriptJsCallsTestCase(PageGraphBaseTestClass):
             for js_call_result in script.calls("Performance.now"):
                 attr_sets.add(js_call_result.pretty_print())
         self.assertEqual(len(attr_sets), 5)
+
+    def test_call_results(self) -> None:
+        for js_node in self.graph.js_structure_nodes():
+            call_results = js_node.call_results()
+            call_ids = [result.call.id() for result in call_results]
+            self.assertEqual(call_ids, sorted(call_ids))
+            for call_result in call_results:
+                self.assertIs(call_result.call.call_result(), call_result)
+                if call_result.result:
+                    self.assertGreater(call_result.result.id(),
+                                       call_result.call.id())
+
+    def test_js_call_counts(self) -> None:
+        command = pagegraph.commands.js_calls.Command(
+            Path(), None, False, None, None)
+        command.pg = self.graph
+        output = json.loads(command.execute().to_json())
+        call_counts = output["meta"]["js call counts"]
+        self.assertEqual(sum(call_counts.values()),
+                         len(self.graph.js_call_edges()))
+        self.assertEqual(call_counts["Performance.now"], 5)
+
+
+class ScriptTreeTestCase(PageGraphBaseTestClass):
+    NAME = "gen/localstorage-complicated"
+
+    def test_loader_chains(self) -> None:
+        command = pagegraph.commands.script_tree.Command(Path())
+        command.pg = self.graph
+        reports = command.execute().report
+        self.assertEqual(len(reports), len(self.graph.script_local_nodes()))
+        chains = {report.script.id: report.loaders for report in reports}
+        self.assertEqual({report.execute_edge_type for report in reports},
+                         {"execute"})
+
+        # An eval'ed script, run by an external script, whose <script>
+        # element was inserted by an inline script.
+        self.assertEqual(
+            [(loader.id, loader.type) for loader in chains["n299"]],
+            [("n286", "script"), ("n279", "HTML element"),
+             ("n233", "script"), ("n227", "HTML element"),
+             ("n48", "parser")])
+        self.assertEqual(chains["n299"][1:], chains["n286"])
+        self.assertEqual(chains["n299"][0].script_type, "external file")
+        self.assertEqual(chains["n299"][1].tag_name, "SCRIPT")
+
+        for script_node in self.graph.script_local_nodes():
+            loaders = chains[script_node.pg_id()]
+            self.assertEqual(loaders[0].id,
+                             script_node.executor_node().pg_id())
+            self.assertEqual(loaders[-1].type, "parser")
+
+
+class FingerprintingTestCase(ModifiedGraphTestClass):
+    GRAPH_NAME = "script-js_calls.graphml"
+    # Each script in the graph calls both of these once, so renaming them
+    # to WebRTC methods makes every script look like it's fingerprinting.
+    REPLACEMENTS = {
+        ">Window.performance.get<": ">RTCPeerConnection.createOffer<",
+        ">Performance.now<": ">RTCPeerConnection.localDescription.get<",
+    }
+
+    def test_webrtc(self) -> None:
+        reports = pagegraph.commands.fingerprinting.Command(
+            self.graph_path).execute().report
+        self.assertEqual(
+            [(report.caller_id, report.techniques) for report in reports],
+            [(script_id, ["webrtc"])
+             for script_id in ["n83", "n107", "n160", "n195", "n212"]])
+        for report in reports:
+            self.assertEqual(report.calls, {
+                "RTCPeerConnection.createOffer": 1,
+                "RTCPeerConnection.localDescription.get": 1,
+            })
+            assert report.caller is not None
+            self.assertEqual(report.caller.id, report.caller_id)
+
+        # Only loading part of the graph shouldn't change the results.
+        full_reports = pagegraph.commands.fingerprinting.Command(
+            self.graph_path, True).execute().report
+        self.assertEqual(reports, full_reports)
+
+    def test_no_fingerprinting(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / self.GRAPH_NAME
+        reports = pagegraph.commands.fingerprinting.Command(
+            graph_path).execute().report
+        self.assertEqual(reports, [])
+
+    def test_detect_techniques(self) -> None:
+        fingerprinting = pagegraph.commands.fingerprinting
+        usage = fingerprinting.ScriptUsage()
+        usage.counts.update([
+            "CanvasRenderingContext2D.fillText",
+            "CanvasRenderingContext2D.fillStyle.set",
+            "HTMLCanvasElement.toDataURL",
+            "OfflineAudioContext.startRendering",
+        ])
+        self.assertEqual(fingerprinting.detect_techniques(usage),
+                         ["canvas image", "audio"])
+
+        usage.counts["CanvasRenderingContext2D.save"] += 1
+        usage.counts[fingerprinting.CANVAS_MEASURE_METHOD] += 21
+        usage.fonts.update(f"{size}px serif" for size in range(20))
+        self.assertEqual(fingerprinting.detect_techniques(usage), ["audio"])
+        usage.fonts.add("12px monospace")
+        self.assertEqual(fingerprinting.detect_techniques(usage),
+                         ["canvas font", "audio"])
+
+
+class ReservoirSampleTestCase(unittest.TestCase):
+    def test_sample(self) -> None:
+        sample, count = pagegraph.commands.js_calls.reservoir_sample(
+            range(100), 10, random.Random(1))
+        self.assertEqual(count, 100)
+        self.assertEqual(len(sample), 10)
+        self.assertEqual(sample, sorted(set(sample)))
+
+        same_sample, _ = pagegraph.commands.js_calls.reservoir_sample(
+            range(100), 10, random.Random(1))
+        self.assertEqual(sample, same_sample)
+
+    def test_fewer_items_than_sample_size(self) -> None:
+        sample, count = pagegraph.commands.js_calls.reservoir_sample(
+            iter("abc"), 10, random.Random(1))
+        self.assertEqual(sample, ["a", "b", "c"])
+        self.assertEqual(count, 3)
+
+
+class PairCallsAndResultsTestCase(unittest.TestCase):
+    def test_pairing(self) -> None:
+        # Calls e9, e3, e5 and e7, where e5 has no result.
+        call_ids = [9, 3, 5, 7]
+        result_ids = [10, 8, 4]
+        expected = ([1, 2, 3, 0], [2, -1, 1, 0])
+        self.assertEqual(pair_calls_and_results(call_ids, result_ids),
+                         expected)
+        self.assertEqual(pair_calls_and_results_python(call_ids, result_ids),
+                         expected)
+
+    def test_invalid_results(self) -> None:
+        for pair_func in (pair_calls_and_results,
+                          pair_calls_and_results_python):
+            with self.assertRaisesRegex(ValueError, "before any call"):
+                pair_func([3], [2])
+            with self.assertRaisesRegex(ValueError, "e4 and e5"):
+                pair_func([3], [5, 4])
@@ -0,0 +1,69 @@
+from dataclasses import fields
+import io
+import json
+from typing import Any
+import unittest
+
+import pagegraph.commands.js_calls
+import pagegraph.commands.requests
+import pagegraph.commands.scripts
+import pagegraph.graph
+import pagegraph.serialize
+from pagegraph.serialize import FrameReport, JSCallResultReport, ReportBase
+import pagegraph.tests.util.paths as PG_PATHS
+
+
+def reference_jsonable(data: Any) -> Any:
+    # The original, straightforward conversion, which the serializer must
+    # match exactly.
+    if isinstance(data, list):
+        return [reference_jsonable(x) for x in data if x is not None]
+    if isinstance(data, dict):
+        return {k.replace("_", " "): reference_jsonable(v)
+                for k, v in data.items() if v is not None}
+    if isinstance(data, ReportBase):
+        return {field.name.replace("_", " "): reference_jsonable(
+                    getattr(data, field.name))
+                for field in fields(data)
+                if getattr(data, field.name) is not None}
+    return data
+
+
+class SerializeTestCase(unittest.TestCase):
+    def assert_serializes_like_reference(self, data: Any) -> None:
+        expected = json.dumps(reference_jsonable(data))
+        self.assertEqual(json.dumps(pagegraph.serialize.to_jsonable(data)),
+                         expected)
+        stream = io.StringIO()
+        pagegraph.serialize.write_json(data, stream)
+        self.assertEqual(stream.getvalue(), expected)
+
+    def test_shared_reports(self) -> None:
+        frame = FrameReport("n1", True, "https://a.test/é", None, 3)
+        empty_frame = FrameReport("n2", False, None, None, 4)
+        calls = [
+            JSCallResultReport(
+                "Date_now", [1, None, {"a_b": None, "c_d": 1.5}],
+                {"nested": [frame]}, frame, frame if i % 2 else None)
+            for i in range(pagegraph.serialize.WRITE_BATCH_SIZE * 2 + 1)
+        ]
+        data: list[Any] = [None, *calls, empty_frame, None]
+        self.assert_serializes_like_reference(data)
+        self.assert_serializes_like_reference([])
+        self.assert_serializes_like_reference(frame)
+        self.assert_serializes_like_reference({"a_b": [frame, None]})
+
+    def test_command_output(self) -> None:
+        graph_path = PG_PATHS.generated_graphs() / "script-js_calls.graphml"
+        pg = pagegraph.graph.from_path(graph_path)
+        commands = [
+            pagegraph.commands.js_calls.Command(
+                graph_path, None, False, None, None),
+            pagegraph.commands.requests.Command(graph_path, None),
+            pagegraph.commands.scripts.Command(
+                graph_path, None, None, False, False, False),
+        ]
+        for command in commands:
+            command.pg = pg
+            result = command.execute()
+            self.assert_serializes_like_reference(result.report)
@@ -6,7 +6,6 @@ from typing import Set, Optional, TYPE_CHECKING, Union
 
 
 if TYPE_CHECKING:
-    import networkx as NWX
     from packaging.version import Version
 
     from pagegraph.graph.edge import Edge
@@ -28,6 +27,7 @@ if TYPE_CHECKING:
     from pagegraph.graph.node.text import TextNode
     from pagegraph.graph.node.unknown import UnknownNode
     from pagegraph.serialize import DOMElementReport, FrameReport, JSONAble
+    from pagegraph.store import GraphStore
 
 
 NetworkXNodeId = str
@@ -121,8 +121,25 @@ class FrameSummary:
 class PageGraphInput:
     url: Url
     version: Version
-    graph: NWX.MultiDiGraph
-    reverse_graph: NWX.MultiDiGraph
+    store: GraphStore
+
+
+class StoreType(StrEnum):
+    NETWORKX = "networkx"
+    COMPACT = "compact"
+
+
+@dataclass(frozen=True)
+class ElementTypes:
+    """The node and edge types (as recorded in the "node type" and
+    "edge type" GraphML attributes) a query needs, so that the rest of the
+    graph can be skipped when loading it."""
+    node_types: frozenset[str]
+    edge_types: frozenset[str]
+
+    def union(self, other: ElementTypes) -> ElementTypes:
+        return ElementTypes(self.node_types | other.node_types,
+                            self.edge_types | other.edge_types)
 
 
 class PartyFilterOption(StrEnum):
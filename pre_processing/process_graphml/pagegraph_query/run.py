@@ -2,19 +2,26 @@
 from __future__ import annotations
 
 import argparse
+import os
 import pathlib
 import sys
 
 import pagegraph.commands
 import pagegraph.commands.element
+import pagegraph.commands.fingerprinting
 import pagegraph.commands.html
 import pagegraph.commands.js_calls
+import pagegraph.commands.multi
 import pagegraph.commands.requests
+import pagegraph.commands.requests_with_initiator
+import pagegraph.commands.script_tree
 import pagegraph.commands.scripts
 import pagegraph.commands.cookies
+import pagegraph.commands.storage
 import pagegraph.commands.subframes
 import pagegraph.commands.unknown
 import pagegraph.commands.validate
+import pagegraph.daemon
 import pagegraph.serialize
 import pagegraph.types
 from pagegraph import __version__
@@ -31,30 +38,91 @@ def get_command(args: argparse.Namespace) -> pagegraph.commands.Base:
         case "requests":
             return pagegraph.commands.requests.Command(
                 args.input, args.frame, args.debug)
+        case "requests_with_initiator":
+            return pagegraph.commands.requests_with_initiator.Command(
+                args.input, args.frame, args.debug)
         case "scripts":
             return pagegraph.commands.scripts.Command(
                 args.input, args.frame, args.id, args.source,
                 args.omit_executors, args.debug)
+        case "script_tree":
+            return pagegraph.commands.script_tree.Command(
+                args.input, args.debug)
         case "js_calls":
             return pagegraph.commands.js_calls.Command(
                 args.input, args.frame, args.cross, args.method, args.id,
-                args.debug)
+                args.seed, args.debug)
+        case "fingerprinting":
+            return pagegraph.commands.fingerprinting.Command(
+                args.input, args.debug)
         case "element":
+            # A single positional id keeps the original, single report
+            # output. Anything else is a batch, with one line per id.
+            if len(args.id) == 1 and not args.ids_file:
+                return pagegraph.commands.element.Command(
+                    args.input, args.id[0], args.depth, args.graphml,
+                    args.debug)
+            pg_ids = list(args.id)
+            if args.ids_file:
+                pg_ids += pagegraph.commands.element.read_ids(args.ids_file)
             return pagegraph.commands.element.Command(
-                args.input, args.id, args.depth, args.graphml, args.debug)
+                args.input, pg_ids, args.depth, args.graphml, args.debug)
         case "html":
             return pagegraph.commands.html.Command(
                 args.input, args.frame, args.at_serialization,
-                args.body_content, args.debug)
+                args.body_content, args.debug, tags=args.tags,
+                include_creators=args.creators)
         case "cookies":
             return pagegraph.commands.cookies.Command(
                 args.input, args.frame, args.id, args.debug)
+        case "storage":
+            return pagegraph.commands.storage.Command(args.input, args.debug)
         case "unknown":
             return pagegraph.commands.unknown.Command(args.input)
+        case "multi":
+            return pagegraph.commands.multi.Command(
+                args.input, get_sub_commands(args), args.out_dir, args.debug)
         case _:
             raise ValueError(f"Unknown command name: {args.command_name}")
 
 
+def get_sub_commands(
+        args: argparse.Namespace) -> dict[str, pagegraph.commands.Base]:
+    """Builds each command requested by the 'multi' command, using the
+    default options for each command."""
+    sub_commands: dict[str, pagegraph.commands.Base] = {}
+    for name in args.commands:
+        parser_name = name.replace("_", "-")
+        if parser_name not in SUBPARSERS.choices:
+            raise ValueError(f"Unknown command name for multi: {name}")
+        # These commands require arguments beyond the input graph.
+        if parser_name in ("elm", "multi"):
+            raise ValueError(f"Command cannot be run with multi: {name}")
+        sub_argv = [parser_name, str(args.input)]
+        if args.debug:
+            sub_argv.insert(0, "--debug")
+        sub_commands[name] = get_command(PARSER.parse_args(sub_argv))
+    return sub_commands
+
+
+def get_daemon_command(name: str, input_path: pathlib.Path,
+                       argv: list[str]) -> pagegraph.commands.Base:
+    """Builds a command for the 'serve' daemon, from the same command name
+    and arguments that would be used on the command line."""
+    if name == "serve":
+        raise ValueError(f"Command cannot be run by the daemon: {name}")
+    sub_argv = [name, str(input_path)] + argv
+    if ARGS.debug:
+        sub_argv.insert(0, "--debug")
+    args = PARSER.parse_args(sub_argv)
+    # The daemon only sends back what a command's execute() returns, so
+    # reports that are written out by format() would be silently dropped.
+    if getattr(args, "out_dir", None) is not None:
+        raise ValueError(
+            f"Command cannot write to --out-dir when run by the daemon: {name}")
+    return get_command(args)
+
+
 PARSER = argparse.ArgumentParser(
     prog="PageGraph Query",
     description="Extracts information about a Web page's execution from "
@@ -66,6 +134,37 @@ PARSER.add_argument(
     action="version",
     version=f"%(prog)s {__version__}")
 PARSER.add_argument("--debug", action="store_true", default=False)
+PARSER.add_argument(
+    "--store",
+    choices=[store_type.value for store_type in pagegraph.types.StoreType],
+    default=None,
+    help="How to hold the graph in memory. 'compact' uses much less "
+         "memory than the default 'networkx' store. Can also be set with "
+         "the PAGEGRAPH_STORE environment variable.")
+PARSER.add_argument(
+    "--cache",
+    action="store_true",
+    default=False,
+    help="Read the graph from a binary snapshot ('<input>.pgcache') if an "
+         "up to date one exists, and otherwise write one for later runs. "
+         "Implies '--store compact'. Can also be enabled by setting "
+         "PAGEGRAPH_CACHE=1.")
+PARSER.add_argument(
+    "--lazy-attrs",
+    action="store_true",
+    default=False,
+    help="Only read large attribute values (script source, JS call "
+         "arguments and results) from the graph file when they're used. "
+         "Can also be enabled by setting PAGEGRAPH_LAZY_ATTRS=1.")
+PARSER.add_argument(
+    "--json",
+    choices=["json", "orjson"],
+    default=None,
+    help="How to write JSON output. 'orjson' is much faster for large "
+         "reports, but requires the 'orjson' package, and its output "
+         "differs in whitespace and in escaping non-ASCII characters "
+         "(though it decodes to the same values). Can also be set with the "
+         "PAGEGRAPH_JSON environment variable.")
 PARSER.set_defaults(command_name="")
 
 SUBPARSERS = PARSER.add_subparsers(required=True)
@@ -114,6 +213,22 @@ REQUEST_PARSER.add_argument(
          "(as described by PageGraph node ids, in the format 'n##').")
 REQUEST_PARSER.set_defaults(command_name="requests")
 
+REQUEST_INITIATOR_PARSER = SUBPARSERS.add_parser(
+    "requests-with-initiator",
+    help="Print information about requests made during page execution, "
+         "along with the node (e.g., script or HTML element) that started "
+         "each request.")
+REQUEST_INITIATOR_PARSER.add_argument(
+    "input",
+    type=pathlib.Path,
+    help="Path to PageGraph recording.")
+REQUEST_INITIATOR_PARSER.add_argument(
+    "-f", "--frame",
+    default=None,
+    help="Only print information about requests made in a specific frame "
+         "(as described by PageGraph node ids, in the format 'n##').")
+REQUEST_INITIATOR_PARSER.set_defaults(command_name="requests_with_initiator")
+
 SCRIPTS_PARSER = SUBPARSERS.add_parser(
     "scripts",
     help="Print information about JS units executed during page execution.")
@@ -147,6 +262,17 @@ SCRIPTS_PARSER.add_argument(
          "was executed.")
 SCRIPTS_PARSER.set_defaults(command_name="scripts")
 
+SCRIPT_TREE_PARSER = SUBPARSERS.add_parser(
+    "script-tree",
+    help="Print, for each JS unit executed during page execution, the chain "
+         "of scripts and elements that led to it being loaded, up to the "
+         "parser.")
+SCRIPT_TREE_PARSER.add_argument(
+    "input",
+    type=pathlib.Path,
+    help="Path to PageGraph recording.")
+SCRIPT_TREE_PARSER.set_defaults(command_name="script_tree")
+
 
 COOKIES_PARSER = SUBPARSERS.add_parser(
     "cookies",
@@ -184,6 +310,16 @@ COOKIES_PARSER.add_argument(
          "(only print detailed information about target element).")
 COOKIES_PARSER.set_defaults(command_name="cookies")
 
+STORAGE_PARSER = SUBPARSERS.add_parser(
+    "storage",
+    help="Print information about cookie, localStorage and sessionStorage "
+         "events during page execution, one flat row per event.")
+STORAGE_PARSER.add_argument(
+    "input",
+    type=pathlib.Path,
+    help="Path to PageGraph recording.")
+STORAGE_PARSER.set_defaults(command_name="storage")
+
 
 
 JS_CALLS_PARSER = SUBPARSERS.add_parser(
@@ -218,8 +354,27 @@ JS_CALLS_PARSER.add_argument(
     help="If provided, only print information about JS calls made by the "
          "Script node with the given ID "
          "(as described by PageGraph node ids, in the format 'n##').")
+JS_CALLS_PARSER.add_argument(
+    "-s", "--seed",
+    type=int,
+    default=pagegraph.commands.js_calls.DEFAULT_SAMPLING_SEED,
+    help="Seed used when choosing which calls to include for methods that "
+         "are called more often than the per-method limit, so that repeated "
+         "runs give the same output. The total number of calls to each "
+         "method is included in the output's \"meta\" section.")
 JS_CALLS_PARSER.set_defaults(command_name="js_calls")
 
+FINGERPRINTING_PARSER = SUBPARSERS.add_parser(
+    "fingerprinting",
+    help="Print the scripts whose JS calls match known canvas, canvas font, "
+         "WebRTC or audio fingerprinting patterns, along with the "
+         "techniques each one matched.")
+FINGERPRINTING_PARSER.add_argument(
+    "input",
+    type=pathlib.Path,
+    help="Path to PageGraph recording.")
+FINGERPRINTING_PARSER.set_defaults(command_name="fingerprinting")
+
 ELEMENT_QUERY_PARSER = SUBPARSERS.add_parser(
     "elm",
     help="Print information about a node or edge in the graph.")
@@ -229,8 +384,18 @@ ELEMENT_QUERY_PARSER.add_argument(
     help="Path to PageGraph recording.")
 ELEMENT_QUERY_PARSER.add_argument(
     "id",
-    help="The id of the node to print information about "
-         "(as described by PageGraph node ids, in the format 'n##')")
+    nargs="*",
+    help="The id(s) of the nodes or edges to print information about "
+         "(as described by PageGraph ids, in the format 'n##' or 'e##'). "
+         "When more than one id is given, or ids are read with --ids-file, "
+         "one JSON report (or error) is printed per line, in the order the "
+         "ids were given.")
+ELEMENT_QUERY_PARSER.add_argument(
+    "-i", "--ids-file",
+    default=None,
+    type=pathlib.Path,
+    help="Read additional ids from this file, one per line. Use '-' to "
+         "read ids from STDIN.")
 ELEMENT_QUERY_PARSER.add_argument(
     "-d", "--depth",
     default=1,
@@ -271,6 +436,19 @@ HTML_QUERY_PARSER.add_argument(
     action="store_true",
     help="Only return elements that appear in the body of the document, "
          "meaning elements that are a child of the <body> element.")
+HTML_QUERY_PARSER.add_argument(
+    "-t", "--tags",
+    default=None,
+    type=lambda x: [tag.strip() for tag in x.split(",") if tag.strip()],
+    help="Comma separated list of tag names (e.g., 'SCRIPT,LINK,IMG'). If "
+         "provided, only elements with one of these tag names are included.")
+HTML_QUERY_PARSER.add_argument(
+    "-c", "--creators",
+    default=False,
+    action="store_true",
+    help="Also include, for each element, the id and type of the node that "
+         "created it, and the URL of its 'src' (or 'href') attribute, "
+         "resolved against the URL of the element's document.")
 HTML_QUERY_PARSER.set_defaults(command_name="html")
 
 UNKNOWN_QUERY_PARSER = SUBPARSERS.add_parser(
@@ -285,13 +463,101 @@ UNKNOWN_QUERY_PARSER.add_argument(
     help="Path to PageGraph recording.")
 UNKNOWN_QUERY_PARSER.set_defaults(command_name="unknown")
 
+MULTI_PARSER = SUBPARSERS.add_parser(
+    "multi",
+    help="Run several commands against a graph, while only parsing the "
+         "graph once.")
+MULTI_PARSER.add_argument(
+    "input",
+    type=pathlib.Path,
+    help="Path to PageGraph recording.")
+MULTI_PARSER.add_argument(
+    "-c", "--commands",
+    default="cookies,scripts,requests,js-calls",
+    type=lambda x: [name.strip() for name in x.split(",") if name.strip()],
+    help="Comma separated list of commands to run. Each command is run "
+         "with its default options.")
+MULTI_PARSER.add_argument(
+    "-o", "--out-dir",
+    default=None,
+    type=pathlib.Path,
+    help="If provided, write each command's report to "
+         "'<out-dir>/<graph name>.<command>.json' instead of printing a "
+         "single JSON object (keyed by command name) to STDOUT.")
+MULTI_PARSER.set_defaults(command_name="multi")
+
+SERVE_PARSER = SUBPARSERS.add_parser(
+    "serve",
+    help="Run as a long lived process, answering JSON queries (one per "
+         "line) while keeping recently used graphs in memory.")
+SERVE_PARSER.add_argument(
+    "-s", "--socket",
+    default=None,
+    type=pathlib.Path,
+    help="Listen for queries on this unix socket. If not provided, queries "
+         "are read from STDIN and results are written to STDOUT.")
+SERVE_PARSER.add_argument(
+    "--cache-bytes",
+    default=4 * 1024 ** 3,
+    type=int,
+    help="Approximate number of bytes of memory each worker uses for "
+         "keeping parsed graphs in memory.")
+SERVE_PARSER.add_argument(
+    "--max-worker-bytes",
+    default=8 * 1024 ** 3,
+    type=int,
+    help="Restart a worker process after any query that leaves the "
+         "worker using more than this many bytes of memory.")
+SERVE_PARSER.add_argument(
+    "-w", "--workers",
+    default=4,
+    type=int,
+    help="Number of worker processes answering queries at once, when "
+         "listening on a unix socket. Should match the number of clients "
+         "querying in parallel (e.g., NUM_THREADS_PREPROCESSING). Memory "
+         "limits apply to each worker separately.")
+SERVE_PARSER.add_argument(
+    "-t", "--timeout",
+    default=1800,
+    type=float,
+    help="Number of seconds to allow each query to run.")
+SERVE_PARSER.set_defaults(command_name="serve")
+
 
 try:
     ARGS = PARSER.parse_args()
+    if ARGS.store:
+        os.environ["PAGEGRAPH_STORE"] = ARGS.store
+    if ARGS.cache:
+        os.environ["PAGEGRAPH_CACHE"] = "1"
+    if ARGS.lazy_attrs:
+        os.environ["PAGEGRAPH_LAZY_ATTRS"] = "1"
+    if ARGS.json:
+        os.environ["PAGEGRAPH_JSON"] = ARGS.json
+    if ARGS.command_name == "serve":
+        SERVER = pagegraph.daemon.Server(
+            get_daemon_command, ARGS.cache_bytes, ARGS.max_worker_bytes,
+            ARGS.timeout, ARGS.debug,
+            ARGS.workers if ARGS.socket else 1)
+        try:
+            if ARGS.socket:
+                SERVER.serve_unix_socket(ARGS.socket)
+            else:
+                SERVER.serve_stream(sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            SERVER.close()
+        sys.exit(0)
     command = get_command(ARGS)
     command.validate()
     RESULT = command.execute()
-    print(command.format(RESULT))
+    OUTPUT = command.format(RESULT)
+    if OUTPUT is not None:
+        print(OUTPUT)
+    if ARGS.debug and command.pg is not None:
+        for INDEX_NAME, COUNT in command.pg.index_build_counts.items():
+            print(f"built index: {INDEX_NAME} ({COUNT}x)", file=sys.stderr)
 except ValueError as e:
     print(f"Invalid argument: {e}", file=sys.stderr)
     sys.exit(1)
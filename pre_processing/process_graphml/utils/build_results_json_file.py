@@ -5,6 +5,9 @@ from collections import defaultdict
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 
+from utils.graphml_files import select_graphml_files
+
+
 def process_single_etld(etld_dir, base_directory, output_file_name):
 
     
@@ -21,7 +24,7 @@ def process_single_etld(etld_dir, base_directory, output_file_name):
 
         
     # validate number of files ---
-    graphml_files = [f for f in os.listdir(etld_path) if f.endswith('.graphml')]
+    graphml_files = select_graphml_files(os.listdir(etld_path))
     num_graphml = len(graphml_files)
 
     for measure in required_measures:
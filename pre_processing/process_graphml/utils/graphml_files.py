@@ -0,0 +1,37 @@
+import os
+
+
+# pagegraph_query reads compressed graphs directly, so the crawler's
+# .graphml.gz files don't need to be extracted first.
+GRAPHML_SUFFIXES = (".graphml", ".graphml.gz", ".graphml.zst")
+
+
+def strip_graphml_suffix(path):
+    """Removes the .graphml (or .graphml.gz, ...) suffix from `path`."""
+    for suffix in GRAPHML_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def select_graphml_files(names):
+    """
+    Returns the names of graph files in `names`. If a graph is there both
+    compressed and extracted (e.g., from an interrupted extraction), only
+    the extracted one is returned.
+    """
+    graphml_names = [name for name in names if name.endswith(GRAPHML_SUFFIXES)]
+    by_base = {}
+    for name in graphml_names:
+        base = strip_graphml_suffix(name)
+        if base not in by_base or name.endswith(".graphml"):
+            by_base[base] = name
+    return [name for name in graphml_names if by_base[strip_graphml_suffix(name)] == name]
+
+
+def list_graphml_in_dir(path):
+    """Only graph files directly inside `path` (non-recursive)."""
+    if not os.path.isdir(path):
+        return []
+    names = select_graphml_files(os.listdir(path))
+    return sorted(os.path.join(path, name) for name in names)
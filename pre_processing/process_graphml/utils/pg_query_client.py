@@ -0,0 +1,44 @@
+import os
+import json
+import socket
+from dotenv import load_dotenv
+
+
+load_dotenv()
+# Path to the unix socket of a running `pagegraph_query/run.py serve --socket ...`
+# process. If unset, queries fall back to running run.py once per query.
+# Start the daemon with `--workers` at least NUM_THREADS_PREPROCESSING, or
+# parallel preprocessing workers will wait on each other's queries.
+PG_QUERY_SOCKET = os.getenv("PG_QUERY_SOCKET", "")
+
+
+def daemon_enabled():
+    return bool(PG_QUERY_SOCKET)
+
+
+def query_daemon(command, graphml_path, args=None):
+    """
+    Sends a single query to the pagegraph query daemon, and returns the
+    command's report as JSON text (i.e., what run.py would print to stdout).
+    Raises RuntimeError if the daemon reports an error.
+    """
+    request = {
+        "graph": os.path.abspath(graphml_path),
+        "command": command,
+        "args": args or [],
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(PG_QUERY_SOCKET)
+        with sock.makefile("rwb") as stream:
+            stream.write((json.dumps(request) + "\n").encode("utf8"))
+            stream.flush()
+            line = stream.readline()
+
+    if not line:
+        raise RuntimeError(f"No response from pagegraph daemon for {graphml_path}")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(
+            f"pagegraph daemon failed '{command}' on {graphml_path}: {response.get('error')}"
+        )
+    return json.dumps(response["result"])